@@ -2,150 +2,151 @@
 Create sample data files for testing the system.
 """
 
-import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from src.core import fastjson
 
-def create_sample_trucking_data():
-    """Create sample trucking data."""
-    data = [
+
+SAMPLES_DIR = Path("data/samples")
+
+# Sample records are built once at import time
+_TRUCKING_SAMPLES = [
+    {
+        "row_number": 1,
+        "date": "1404/10/14",
+        "truck_number": "14978",
+        "receipt_number": "RCP-001",
+        "tonnage_kg": 25000,
+        "destination": "رباط سفید",
+        "cost_per_ton": 7000000,
+        "driver_name": "محمد احمدآبادی",
+        "notes": ""
+    },
+    {
+        "row_number": 2,
+        "date": "1404/10/14",
+        "truck_number": "14979",
+        "receipt_number": "RCP-002",
+        "tonnage_kg": 28000,
+        "destination": "شن بتن مشهد",
+        "cost_per_ton": 8500000,
+        "driver_name": "محمدرضا احمد آبادی",
+        "notes": ""
+    },
+    {
+        "row_number": 3,
+        "date": "1404/10/15",
+        "truck_number": "14978",
+        "receipt_number": "RCP-003",
+        "tonnage_kg": 26500,
+        "destination": "شهرک کاویان",
+        "cost_per_ton": 8500000,
+        "driver_name": "کریم ابادی",
+        "notes": ""
+    }
+]
+
+_BUNKER_SAMPLES = {
+    "رباط سفید": [
+        {
+            "row_number": 1,
+            "تاریخ": "1404/10/14",
+            "tonnage_kg": 24500,
+            "cumulative_tonnage": 24500,
+            "driver": "محمد احمدآبادی"
+        }
+    ],
+    "شن بتن": [
+        {
+            "row_number": 1,
+            "تاریخ": "1404/10/14",
+            "tonnage_kg": 27800,
+            "cumulative_tonnage": 27800,
+            "driver": "محمدرضا احمدآبادی"
+        }
+    ],
+    "مس کاویان": [
         {
             "row_number": 1,
-            "date": "1404/10/14",
-            "truck_number": "14978",
-            "receipt_number": "RCP-001",
-            "tonnage_kg": 25000,
-            "destination": "رباط سفید",
-            "cost_per_ton": 7000000,
-            "driver_name": "محمد احمدآبادی",
-            "notes": ""
+            "تاریخ": "1404/10/15",
+            "tonnage_kg": 26000,
+            "cumulative_tonnage": 26000,
+            "driver": "ابوالفضل کریم آبادی"
+        }
+    ]
+}
+
+_LAB_SAMPLES = {
+    "Solutions": [
+        {
+            "sample_code": "A 1404 10 14 L1",
+            "au_ppm": 0.285
         },
         {
-            "row_number": 2,
-            "date": "1404/10/14",
-            "truck_number": "14979",
-            "receipt_number": "RCP-002",
-            "tonnage_kg": 28000,
-            "destination": "شن بتن مشهد",
-            "cost_per_ton": 8500000,
-            "driver_name": "محمدرضا احمد آبادی",
-            "notes": ""
+            "sample_code": "B 1404 10 14 L1",
+            "au_ppm": 0.312
+        }
+    ],
+    "Solids": [
+        {
+            "sample_code": "A 1404 10 14 K1",
+            "au_ppm": 1.234
+        },
+        {
+            "sample_code": "A 1404 10 14 T1",
+            "au_ppm": 0.087
         },
         {
-            "row_number": 3,
-            "date": "1404/10/15",
-            "truck_number": "14978",
-            "receipt_number": "RCP-003",
-            "tonnage_kg": 26500,
-            "destination": "شهرک کاویان",
-            "cost_per_ton": 8500000,
-            "driver_name": "کریم ابادی",
-            "notes": ""
+            "sample_code": "C 1404 10 15 K1",
+            "au_ppm": 2.156
+        },
+        {
+            "sample_code": "C 1404 10 15 T1",
+            "au_ppm": 0.125
+        }
+    ],
+    "Carbon": [
+        {
+            "sample_code": "A 1404 10 14 CR1",
+            "au_ppm": 425.5
         }
     ]
-    return data
+}
+
+
+def create_sample_trucking_data():
+    """Create sample trucking data."""
+    return _TRUCKING_SAMPLES
 
 
 def create_sample_bunker_data():
     """Create sample bunker data."""
-    data = {
-        "رباط سفید": [
-            {
-                "row_number": 1,
-                "تاریخ": "1404/10/14",
-                "tonnage_kg": 24500,
-                "cumulative_tonnage": 24500,
-                "driver": "محمد احمدآبادی"
-            }
-        ],
-        "شن بتن": [
-            {
-                "row_number": 1,
-                "تاریخ": "1404/10/14",
-                "tonnage_kg": 27800,
-                "cumulative_tonnage": 27800,
-                "driver": "محمدرضا احمدآبادی"
-            }
-        ],
-        "مس کاویان": [
-            {
-                "row_number": 1,
-                "تاریخ": "1404/10/15",
-                "tonnage_kg": 26000,
-                "cumulative_tonnage": 26000,
-                "driver": "ابوالفضل کریم آبادی"
-            }
-        ]
-    }
-    return data
+    return _BUNKER_SAMPLES
 
 
 def create_sample_lab_data():
     """Create sample lab data."""
-    data = {
-        "Solutions": [
-            {
-                "sample_code": "A 1404 10 14 L1",
-                "au_ppm": 0.285
-            },
-            {
-                "sample_code": "B 1404 10 14 L1",
-                "au_ppm": 0.312
-            }
-        ],
-        "Solids": [
-            {
-                "sample_code": "A 1404 10 14 K1",
-                "au_ppm": 1.234
-            },
-            {
-                "sample_code": "A 1404 10 14 T1",
-                "au_ppm": 0.087
-            },
-            {
-                "sample_code": "C 1404 10 15 K1",
-                "au_ppm": 2.156
-            },
-            {
-                "sample_code": "C 1404 10 15 T1",
-                "au_ppm": 0.125
-            }
-        ],
-        "Carbon": [
-            {
-                "sample_code": "A 1404 10 14 CR1",
-                "au_ppm": 425.5
-            }
-        ]
-    }
-    return data
+    return _LAB_SAMPLES
 
 
 def main():
     """Generate sample data files."""
-    samples_dir = Path("data/samples")
-    samples_dir.mkdir(parents=True, exist_ok=True)
+    SAMPLES_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Trucking data
-    trucking_file = samples_dir / "trucking_data_for_llm.json"
-    trucking_data = create_sample_trucking_data()
-    with open(trucking_file, 'w', encoding='utf-8') as f:
-        json.dump(trucking_data, f, ensure_ascii=False, indent=2)
-    print(f"✓ Created: {trucking_file}")
+    files = [
+        (SAMPLES_DIR / "trucking_data_for_llm.json", create_sample_trucking_data()),
+        (SAMPLES_DIR / "data_for_llm_enhanced.json", create_sample_bunker_data()),
+        (SAMPLES_DIR / "lab_data_for_llm.json", create_sample_lab_data())
+    ]
     
-    # Bunker data
-    bunker_file = samples_dir / "data_for_llm_enhanced.json"
-    bunker_data = create_sample_bunker_data()
-    with open(bunker_file, 'w', encoding='utf-8') as f:
-        json.dump(bunker_data, f, ensure_ascii=False, indent=2)
-    print(f"✓ Created: {bunker_file}")
+    # The three files are independent, so write them concurrently
+    with ThreadPoolExecutor(max_workers=len(files)) as executor:
+        futures = [executor.submit(fastjson.dump_file, path, data) for path, data in files]
     
-    # Lab data
-    lab_file = samples_dir / "lab_data_for_llm.json"
-    lab_data = create_sample_lab_data()
-    with open(lab_file, 'w', encoding='utf-8') as f:
-        json.dump(lab_data, f, ensure_ascii=False, indent=2)
-    print(f"✓ Created: {lab_file}")
+    for (path, _), future in zip(files, futures):
+        future.result()
+        print(f"✓ Created: {path}")
     
     print("\n✓ Sample data files created successfully!")
     print("You can now test the ingestion pipeline with these files.")
@@ -3,53 +3,79 @@
 Generate specific reports.
 """
 
-import sys
-import json
+import pickle
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 import argparse
 
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
-
 from src.reports.daily_ops import DailyOpsReport
 from src.reports.grade_report import GradeReport
+from src.core import fastjson
+from src.core.console import buffer_stdout
 
+# Processed data locations, relative to the working directory
+DATA_PROCESSED = Path("data/processed")
+SHIPMENTS_FILE = DATA_PROCESSED / "truck_shipments_standardized.json"
+BUNKER_LOADS_FILE = DATA_PROCESSED / "bunker_loads_standardized.json"
+LAB_SAMPLES_FILE = DATA_PROCESSED / "lab_samples_standardized.json"
 
-def load_processed_data():
-    """Load processed data files."""
-    processed_dir = Path("data/processed")
+
+def load_cached_json(json_file: Path):
+    """
+    Load a processed JSON file through an mtime-keyed pickle cache.
     
-    data = {
-        'shipments': [],
-        'bunker_loads': [],
-        'lab_samples': []
-    }
+    The pickle is stored next to the JSON file and reused as long as the
+    JSON file's modification time has not changed.
     
-    # Load shipments
-    shipments_file = processed_dir / "truck_shipments_standardized.json"
-    if shipments_file.exists():
-        with open(shipments_file, 'r', encoding='utf-8') as f:
-            shipments_data = json.load(f)
-            data['shipments'] = shipments_data.get('shipments', [])
-    
-    # Load bunker loads
-    bunker_file = processed_dir / "bunker_loads_standardized.json"
-    if bunker_file.exists():
-        with open(bunker_file, 'r', encoding='utf-8') as f:
-            bunker_data = json.load(f)
-            data['bunker_loads'] = bunker_data.get('loads', [])
-    
-    # Load lab samples
-    lab_file = processed_dir / "lab_samples_standardized.json"
-    if lab_file.exists():
-        with open(lab_file, 'r', encoding='utf-8') as f:
-            lab_data = json.load(f)
-            data['lab_samples'] = lab_data.get('samples', [])
+    Args:
+        json_file: Path to processed JSON file
+        
+    Returns:
+        Parsed JSON data
+    """
+    cache_file = json_file.with_suffix('.pkl')
+    mtime_ns = json_file.stat().st_mtime_ns
+    
+    if cache_file.exists():
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+            if isinstance(cached, dict) and cached.get('mtime_ns') == mtime_ns:
+                return cached['data']
+        except (OSError, EOFError, pickle.UnpicklingError,
+                AttributeError, ImportError, KeyError, TypeError, ValueError):
+            # Unreadable, truncated or foreign cache; rebuilt from the JSON below
+            pass
+    
+    data = fastjson.load_file(json_file)
+    
+    try:
+        with open(cache_file, 'wb') as f:
+            pickle.dump({'mtime_ns': mtime_ns, 'data': data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"Warning: Could not write cache {cache_file}: {e}")
     
     return data
 
 
+def _load_list(json_file: Path, key: str) -> list:
+    """Load the record list stored under key in a processed JSON file."""
+    if not json_file.exists():
+        return []
+    return load_cached_json(json_file).get(key, [])
+
+
+@lru_cache(maxsize=1)
+def load_processed_data():
+    """Load processed data files (parsed once per process)."""
+    return {
+        'shipments': _load_list(SHIPMENTS_FILE, 'shipments'),
+        'bunker_loads': _load_list(BUNKER_LOADS_FILE, 'loads'),
+        'lab_samples': _load_list(LAB_SAMPLES_FILE, 'samples')
+    }
+
+
 def generate_daily_ops(date: str):
     """Generate daily operations report."""
     print(f"\nGenerating Daily Operations Report for {date}...")
@@ -98,6 +124,7 @@ def main():
                        help='Facility code for grade report')
     
     args = parser.parse_args()
+    buffer_stdout()
     
     print("=" * 60)
     print("Gold Mining Operations - Report Generator")
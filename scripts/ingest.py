@@ -4,13 +4,10 @@ Run full data ingestion pipeline.
 Converts Excel/JSON data, validates, generates alerts, and loads into database.
 """
 
-import sys
-import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
-
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 
 from src.converters.bunker_converter import BunkerConverter
 from src.converters.assay_converter import AssayConverter
@@ -20,21 +17,119 @@ from src.database.connection import get_db
 from src.database.ingestion import DataIngestion
 from src.alerts.alert_engine import AlertEngine
 from src.alerts.log_notifier import LogNotifier
-from src.alerts.telegram_notifier import TelegramNotifier
-from src.alerts.email_notifier import EmailNotifier
+from src.core import fastjson
+from src.core.console import buffer_stdout
+
+# Pipeline locations, relative to the working directory
+DATA_INCOMING = Path("data/incoming")
+DATA_PROCESSED = Path("data/processed")
+CONFIG_DIR = Path("config")
+
+BUNKER_INPUT = DATA_INCOMING / "data_for_llm_enhanced.json"
+LAB_INPUT = DATA_INCOMING / "lab_data_for_llm.json"
+TRUCKING_INPUT = DATA_INCOMING / "trucking_data_for_llm.json"
+BUNKER_OUTPUT = DATA_PROCESSED / "bunker_loads_standardized.json"
+LAB_OUTPUT = DATA_PROCESSED / "lab_samples_standardized.json"
+TRUCKING_OUTPUT = DATA_PROCESSED / "truck_shipments_standardized.json"
+ALERTS_OUTPUT = DATA_PROCESSED / "alerts.jsonl"
+
+
+def iter_input_sheets(filepath: Path) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Stream (sheet name, records) pairs from an incoming file.
+    
+    Reads both the nested {"sheets": [{"sheet_name", "data"}]} format that
+    extract_sheets() unwraps and flat {sheet name: records} files. With
+    ijson installed only one sheet is held in memory at a time.
+    
+    Args:
+        filepath: Incoming JSON file
+        
+    Yields:
+        (sheet name, list of records) pairs in file order
+    """
+    if not fastjson.has_root_array(filepath, "sheets"):
+        yield from fastjson.iter_load_items(filepath)
+        return
+    
+    for sheet in fastjson.iter_load_prefix(filepath, "sheets.item"):
+        if isinstance(sheet, dict):
+            name = sheet.get("sheet_name", "")
+            data = sheet.get("data", [])
+            if name and isinstance(data, list):
+                yield name, data
+
+
+def iter_input_records(filepath: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the raw records of a single-table incoming file (trucking).
+    
+    Args:
+        filepath: Incoming JSON file, a top-level array or the nested
+            sheets format
+        
+    Yields:
+        Raw records in file order
+    """
+    if not fastjson.has_root_array(filepath, "sheets"):
+        yield from fastjson.iter_load_array(filepath)
+        return
+    
+    for _, records in iter_input_sheets(filepath):
+        yield from records
 
 
-def load_json_file(filepath: Path) -> Any:
-    """Load JSON file with UTF-8 encoding."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+def read_lab_sheets(filepath: Path) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Collect all sheets of the lab file.
+    
+    AssayConverter spreads the sheets across worker processes, so it
+    takes them together rather than one at a time.
+    
+    Args:
+        filepath: Incoming JSON file
+        
+    Returns:
+        Dictionary of {sheet_name: [records]}
+    """
+    return dict(iter_input_sheets(filepath))
+
+
+def check_notifier_enabled(*env_vars: str) -> bool:
+    """
+    Check whether a notifier's required environment variables are set.
+    
+    Lets main() skip importing a notifier module (and its requests/smtplib
+    dependencies) when that notifier could not be enabled anyway.
+    
+    Args:
+        env_vars: Names of the required environment variables
+        
+    Returns:
+        True if every variable is set and non-empty
+    """
+    return all(os.getenv(var) for var in env_vars)
 
 
-def save_json_file(filepath: Path, data: Any):
-    """Save JSON file with UTF-8 encoding."""
-    filepath.parent.mkdir(parents=True, exist_ok=True)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def convert_file(input_file: Path, converter, output_file: Path,
+                 read_input: Callable[[Path], Any]) -> Dict[str, Any]:
+    """
+    Stream a single incoming data file through its converter to disk.
+    
+    The converted records are written as they are produced and not kept;
+    read them back from output_file with fastjson.iter_load_prefix().
+    
+    Args:
+        input_file: Incoming JSON file
+        converter: Converter instance with a stream_to_file() method
+        output_file: Destination for the standardized JSON
+        read_input: Reads input_file into what stream_to_file() takes,
+            e.g. iter_input_sheets
+        
+    Returns:
+        Converter result without the records ("statistics" and "metadata")
+    """
+    return converter.stream_to_file(read_input(input_file), output_file)
 
 
 def extract_sheets(raw_data):
@@ -67,144 +162,155 @@ def extract_sheets(raw_data):
 
 def main():
     """Run full ingestion pipeline."""
+    buffer_stdout()
+    
     print("=" * 60)
     print("Gold Mining Operations - Data Ingestion Pipeline")
     print("=" * 60)
     
-    # Paths
-    incoming_dir = Path("data/incoming")
-    processed_dir = Path("data/processed")
-    config_dir = Path("config")
+    config_dir = str(CONFIG_DIR)
     
     # Initialize converters
     print("\n1. Initializing converters...")
-    bunker_converter = BunkerConverter(str(config_dir))
-    assay_converter = AssayConverter(str(config_dir))
-    trucking_converter = TruckingConverter(str(config_dir))
-    finance_converter = FinanceConverter(str(config_dir))
+    bunker_converter = BunkerConverter(config_dir)
+    assay_converter = AssayConverter(config_dir)
+    trucking_converter = TruckingConverter(config_dir)
+    finance_converter = FinanceConverter(config_dir)
     print("✓ Converters initialized")
     
     # Initialize alert engine
     print("\n2. Initializing alert system...")
-    alert_engine = AlertEngine(str(config_dir))
+    alert_engine = AlertEngine(config_dir)
     alert_engine.add_notifier(LogNotifier())
     
-    # Add Telegram notifier if configured
-    telegram = TelegramNotifier()
-    if telegram.enabled:
-        alert_engine.add_notifier(telegram)
-        print("✓ Telegram notifications enabled")
+    # Add Telegram notifier if configured (imported only when needed)
+    if check_notifier_enabled('TELEGRAM_BOT_TOKEN', 'TELEGRAM_CHAT_ID'):
+        from src.alerts.telegram_notifier import TelegramNotifier
+        telegram = TelegramNotifier()
+        if telegram.enabled:
+            alert_engine.add_notifier(telegram)
+            print("✓ Telegram notifications enabled")
+    else:
+        print("  Telegram not configured, skipping")
     
-    # Add Email notifier if configured
-    email = EmailNotifier()
-    if email.enabled:
-        alert_engine.add_notifier(email)
-        print("✓ Email notifications enabled")
+    # Add Email notifier if configured (imported only when needed)
+    if check_notifier_enabled('SMTP_USERNAME', 'SMTP_PASSWORD', 'EMAIL_FROM', 'EMAIL_TO'):
+        from src.alerts.email_notifier import EmailNotifier
+        email = EmailNotifier()
+        if email.enabled:
+            alert_engine.add_notifier(email)
+            print("✓ Email notifications enabled")
+    else:
+        print("  Email not configured, skipping")
     
     print("✓ Alert system initialized")
     
-    # Process data files
-    results = {
-        'bunker_loads': None,
-        'lab_samples': None,
-        'truck_shipments': None
-    }
-    
-    # Process bunker data
-    bunker_file = incoming_dir / "data_for_llm_enhanced.json"
-    if bunker_file.exists():
-        print(f"\n3. Processing bunker data from {bunker_file}...")
-        input_data = load_json_file(bunker_file)
-        input_data = extract_sheets(input_data)
-        results['bunker_loads'] = bunker_converter.convert(input_data)
-        
-        output_file = processed_dir / "bunker_loads_standardized.json"
-        save_json_file(output_file, results['bunker_loads'])
+    # Process data files - the three conversions are independent, so run them concurrently
+    bunker_file, bunker_output = BUNKER_INPUT, BUNKER_OUTPUT
+    lab_file, lab_output = LAB_INPUT, LAB_OUTPUT
+    trucking_file, trucking_output = TRUCKING_INPUT, TRUCKING_OUTPUT
+    
+    tasks = [
+        ('bunker_loads', bunker_file, bunker_converter, bunker_output, iter_input_sheets),
+        ('lab_samples', lab_file, assay_converter, lab_output, read_lab_sheets),
+        ('truck_shipments', trucking_file, trucking_converter, trucking_output, iter_input_records)
+    ]
+    
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = {
+            key: executor.submit(convert_file, input_file, converter, output_file, read_input)
+            for key, input_file, converter, output_file, read_input in tasks
+            if input_file.exists()
+        }
+        results = {key: futures[key].result() if key in futures else None for key, *_ in tasks}
+    
+    # Report bunker data
+    if results['bunker_loads']:
+        print(f"\n3. Processed bunker data from {bunker_file}")
         print(f"✓ Converted {results['bunker_loads']['statistics']['total_loads']} bunker loads")
-        print(f"✓ Output: {output_file}")
+        print(f"✓ Output: {bunker_output}")
     else:
         print(f"\n3. Bunker data file not found: {bunker_file}")
     
-    # Process lab data
-    lab_file = incoming_dir / "lab_data_for_llm.json"
-    if lab_file.exists():
-        print(f"\n4. Processing lab data from {lab_file}...")
-        input_data = load_json_file(lab_file)
-        input_data = extract_sheets(input_data)
-        results['lab_samples'] = assay_converter.convert(input_data)
-        
-        output_file = processed_dir / "lab_samples_standardized.json"
-        save_json_file(output_file, results['lab_samples'])
+    # Report lab data
+    if results['lab_samples']:
+        print(f"\n4. Processed lab data from {lab_file}")
         print(f"✓ Converted {results['lab_samples']['statistics']['total_samples']} lab samples")
         print(f"✓ Detection rate: {results['lab_samples']['statistics']['detection_rate']:.1%}")
-        print(f"✓ Output: {output_file}")
+        print(f"✓ Output: {lab_output}")
     else:
         print(f"\n4. Lab data file not found: {lab_file}")
     
-    # Process trucking data
-    trucking_file = incoming_dir / "trucking_data_for_llm.json"
-    if trucking_file.exists():
-        print(f"\n5. Processing trucking data from {trucking_file}...")
-        input_data = load_json_file(trucking_file)
-        input_data = extract_sheets(input_data)
-        results['truck_shipments'] = trucking_converter.convert(input_data)
-        
-        output_file = processed_dir / "truck_shipments_standardized.json"
-        save_json_file(output_file, results['truck_shipments'])
+    # Report trucking data
+    if results['truck_shipments']:
+        print(f"\n5. Processed trucking data from {trucking_file}")
         print(f"✓ Converted {results['truck_shipments']['statistics']['total_shipments']} truck shipments")
         print(f"✓ Total tonnage: {results['truck_shipments']['statistics']['total_tonnage_kg']:,.0f} kg")
-        print(f"✓ Output: {output_file}")
+        print(f"✓ Output: {trucking_output}")
     else:
         print(f"\n5. Trucking data file not found: {trucking_file}")
     
     # Validate and generate alerts
     print("\n6. Validating data and generating alerts...")
-    shipments = results['truck_shipments']['shipments'] if results['truck_shipments'] else []
-    samples = results['lab_samples']['samples'] if results['lab_samples'] else []
+    # Validation needs the whole lists, so these two are read back in full;
+    # bunker loads are streamed from their output file into the database
+    shipments = (
+        list(fastjson.iter_load_prefix(trucking_output, 'shipments.item'))
+        if results['truck_shipments'] else []
+    )
+    samples = (
+        list(fastjson.iter_load_prefix(lab_output, 'samples.item'))
+        if results['lab_samples'] else []
+    )
     
     alert_summary = alert_engine.process_and_send(
         shipments=shipments,
         samples=samples
     )
+    alert_engine.close()
     
     print(f"✓ Generated {alert_summary['total_alerts']} alerts")
     if alert_summary['by_level']:
         for level, count in alert_summary['by_level'].items():
             print(f"  - {level}: {count}")
     
+    # Convert ValidationAlert objects once; the same dicts are written next
+    # to the converter output and loaded into the database below
+    alert_dicts = [alert.to_dict() for alert in alert_summary['alerts']]
+    DATA_PROCESSED.mkdir(parents=True, exist_ok=True)
+    fastjson.dump_jsonl_file(ALERTS_OUTPUT, alert_dicts)
+    print(f"✓ Output: {ALERTS_OUTPUT}")
+    
     # Load into database
     print("\n7. Loading data into database...")
     db = get_db()
     ingestion = DataIngestion(db)
     
-    if results['truck_shipments']:
-        count = ingestion.ingest_shipments(shipments)
-        print(f"✓ Loaded {count} shipments into database")
-    
-    if results['bunker_loads']:
-        loads = results['bunker_loads']['loads']
-        count = ingestion.ingest_bunker_loads(loads)
-        print(f"✓ Loaded {count} bunker loads into database")
-    
-    if results['lab_samples']:
-        count = ingestion.ingest_lab_samples(samples)
-        print(f"✓ Loaded {count} lab samples into database")
-    
-    # Store alerts
-    if alert_summary['total_alerts'] > 0:
-        # Convert ValidationAlert objects to dicts
-        alert_dicts = []
-        for alert in alert_engine.process_shipments(shipments) + alert_engine.process_lab_samples(samples):
-            alert_dicts.append(alert.to_dict())
+    # All inserts share one transaction, committed once at the end
+    with db.get_session() as session:
+        if results['truck_shipments']:
+            count = ingestion.ingest_shipments(shipments, session=session)
+            print(f"✓ Loaded {count} shipments into database")
+        
+        if results['bunker_loads']:
+            loads = fastjson.iter_load_prefix(bunker_output, 'loads.item')
+            count = ingestion.ingest_bunker_loads(loads, session=session)
+            print(f"✓ Loaded {count} bunker loads into database")
+        
+        if results['lab_samples']:
+            count = ingestion.ingest_lab_samples(samples, session=session)
+            print(f"✓ Loaded {count} lab samples into database")
         
-        count = ingestion.ingest_alerts(alert_dicts)
-        print(f"✓ Stored {count} alerts in database")
+        # Store alerts
+        if alert_dicts:
+            count = ingestion.ingest_alerts(alert_dicts, session=session)
+            print(f"✓ Stored {count} alerts in database")
     
     print("\n" + "=" * 60)
     print("✓ Ingestion pipeline complete!")
     print("=" * 60)
     print("\nNext steps:")
-    print("1. Generate reports: python scripts/generate_report.py")
+    print("1. Generate reports: generate-report")
     print("2. View dashboard: http://localhost:3000 (Metabase)")
 
 
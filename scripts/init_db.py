@@ -3,19 +3,18 @@
 Initialize database schema and load configuration data.
 """
 
-import sys
 import json
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
-
 from src.database.connection import init_database
 from src.database.ingestion import DataIngestion
+from src.core.console import buffer_stdout
 
 
 def main():
     """Initialize database and load initial configuration."""
+    buffer_stdout()
+    
     print("Initializing database...")
     
     # Initialize database (drop and recreate tables to apply schema changes)
@@ -55,7 +54,7 @@ def main():
     print("\n✓ Database initialization complete!")
     print("\nNext steps:")
     print("1. Place data files in data/incoming/")
-    print("2. Run: python scripts/ingest.py")
+    print("2. Run: ingest")
 
 
 if __name__ == "__main__":
@@ -3,10 +3,13 @@ Alert engine - processes validation alerts and triggers notifications.
 """
 
 import json
+import sys
+from collections import Counter
+from itertools import chain
 from typing import Any, Dict, List
 from pathlib import Path
 
-from src.core.validator import DataValidator, ValidationAlert
+from src.core.validator import AlertLevel, DataValidator, ValidationAlert
 
 
 class AlertEngine:
@@ -17,6 +20,8 @@ class AlertEngine:
         self.config_dir = Path(config_dir)
         self.validator = DataValidator(config_dir)
         self.notifiers = []
+        # Interned summary keys, so counting skips the Enum.value lookup
+        self._level_keys = {level: sys.intern(level.value) for level in AlertLevel}
     
     def add_notifier(self, notifier):
         """
@@ -27,6 +32,12 @@ class AlertEngine:
         """
         self.notifiers.append(notifier)
     
+    def close(self):
+        """Release notifier resources, e.g. open SMTP connections."""
+        for notifier in self.notifiers:
+            if hasattr(notifier, 'close'):
+                notifier.close()
+    
     def process_shipments(self, shipments: List[Dict[str, Any]]) -> List[ValidationAlert]:
         """
         Process shipments and generate alerts.
@@ -37,13 +48,8 @@ class AlertEngine:
         Returns:
             List of validation alerts
         """
-        all_alerts = []
-        
-        for shipment in shipments:
-            alerts = self.validator.validate_shipment(shipment)
-            all_alerts.extend(alerts)
-        
-        return all_alerts
+        validate = self.validator.validate_shipment
+        return list(chain.from_iterable(map(validate, shipments)))
     
     def process_lab_samples(self, samples: List[Dict[str, Any]]) -> List[ValidationAlert]:
         """
@@ -55,13 +61,7 @@ class AlertEngine:
         Returns:
             List of validation alerts
         """
-        all_alerts = []
-        
-        for sample in samples:
-            alerts = self.validator.validate_lab_sample(sample)
-            all_alerts.extend(alerts)
-        
-        return all_alerts
+        return list(chain.from_iterable(self.validator.validate_lab_samples_batch(samples)))
     
     def send_alerts(self, alerts: List[ValidationAlert]):
         """
@@ -90,8 +90,13 @@ class AlertEngine:
             samples: Optional list of samples
             
         Returns:
-            Summary of alerts generated
+            Summary of alerts generated, including the alert objects
+            themselves under "alerts"
         """
+        # Nothing to validate: skip notifier summaries (network I/O) entirely
+        if not shipments and not samples:
+            return {"total_alerts": 0, "by_level": {}, "by_rule": {}, "alerts": []}
+        
         all_alerts = []
         
         if shipments:
@@ -111,17 +116,12 @@ class AlertEngine:
                 notifier.send_summary()
         
         # Generate summary
+        level_keys = self._level_keys
         summary = {
             "total_alerts": len(all_alerts),
-            "by_level": {},
-            "by_rule": {}
+            "by_level": dict(Counter(level_keys[alert.level] for alert in all_alerts)),
+            "by_rule": dict(Counter(alert.rule for alert in all_alerts)),
+            "alerts": all_alerts
         }
         
-        for alert in all_alerts:
-            level = alert.level.value
-            rule = alert.rule
-            
-            summary["by_level"][level] = summary["by_level"].get(level, 0) + 1
-            summary["by_rule"][rule] = summary["by_rule"].get(rule, 0) + 1
-        
         return summary
@@ -4,12 +4,27 @@ Email notification system for alerts.
 
 import os
 import smtplib
+from collections import defaultdict
+from html import escape
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import List
+from typing import List, Optional
 
 from src.core.validator import ValidationAlert, AlertLevel
 
+# Heading colour per alert level
+_LEVEL_COLOR = {
+    AlertLevel.CRITICAL: '#dc3545',
+    AlertLevel.WARNING: '#ffc107',
+    AlertLevel.INFO: '#17a2b8'
+}
+
+# Severity order used for min_level filtering
+_LEVEL_RANK = {
+    AlertLevel.INFO: 0,
+    AlertLevel.WARNING: 1,
+    AlertLevel.CRITICAL: 2
+}
+
 
 class EmailNotifier:
     """Sends alerts via email."""
@@ -21,7 +36,8 @@ class EmailNotifier:
         username: str = None,
         password: str = None,
         from_addr: str = None,
-        to_addrs: List[str] = None
+        to_addrs: List[str] = None,
+        min_level: AlertLevel = AlertLevel.WARNING
     ):
         """
         Initialize email notifier.
@@ -33,6 +49,7 @@ class EmailNotifier:
             password: SMTP password
             from_addr: From email address
             to_addrs: List of recipient addresses
+            min_level: Lowest alert level included in digests
         """
         self.smtp_host = smtp_host or os.getenv('SMTP_HOST', 'smtp.gmail.com')
         self.smtp_port = smtp_port or int(os.getenv('SMTP_PORT', '587'))
@@ -40,6 +57,7 @@ class EmailNotifier:
         self.password = password or os.getenv('SMTP_PASSWORD')
         self.from_addr = from_addr or os.getenv('EMAIL_FROM')
         self.to_addrs = to_addrs or os.getenv('EMAIL_TO', '').split(',')
+        self.min_level = min_level
         
         # Check if configured
         if not all([self.username, self.password, self.from_addr, self.to_addrs[0]]):
@@ -47,6 +65,27 @@ class EmailNotifier:
             self.enabled = False
         else:
             self.enabled = True
+        
+        # Persistent SMTP connection, opened on first send
+        self._smtp: Optional[smtplib.SMTP] = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Close the SMTP connection if one is open."""
+        if self._smtp is None:
+            return
+        
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        finally:
+            self._smtp = None
     
     def send_alert(self, alert: ValidationAlert):
         """
@@ -70,7 +109,7 @@ class EmailNotifier:
     
     def send_digest(self, alerts: List[ValidationAlert]):
         """
-        Send a digest of multiple alerts.
+        Send a digest of the alerts at or above min_level.
         
         Args:
             alerts: List of validation alerts
@@ -78,6 +117,12 @@ class EmailNotifier:
         if not self.enabled or not alerts:
             return
         
+        # Drop alerts below min_level; nothing left means no email at all
+        min_rank = _LEVEL_RANK[self.min_level]
+        alerts = [a for a in alerts if _LEVEL_RANK[a.level] >= min_rank]
+        if not alerts:
+            return
+        
         subject = f"Mining Operations Daily Digest - {len(alerts)} alerts"
         body = self._format_digest(alerts)
         
@@ -91,22 +136,45 @@ class EmailNotifier:
             subject: Email subject
             body: Email body (HTML)
         """
-        msg = MIMEMultipart('alternative')
+        # Single HTML body, so no multipart wrapper is needed
+        msg = MIMEText(body, 'html', 'utf-8')
         msg['Subject'] = subject
         msg['From'] = self.from_addr
         msg['To'] = ', '.join(self.to_addrs)
         
-        # Attach HTML body
-        html_part = MIMEText(body, 'html')
-        msg.attach(html_part)
-        
         try:
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.username, self.password)
-                server.send_message(msg)
+            self._ensure_connection().send_message(msg)
         except Exception as e:
             print(f"Error sending email: {e}")
+            # Reconnect from scratch on the next send
+            self.close()
+    
+    def _ensure_connection(self) -> smtplib.SMTP:
+        """
+        Return a live, authenticated SMTP connection.
+        
+        The connection is opened once (EHLO, STARTTLS, AUTH) and reused for
+        later sends; a NOOP checks it is still alive before each reuse.
+        
+        Returns:
+            Connected smtplib.SMTP instance
+        """
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+        
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port)
+        server.ehlo()
+        server.starttls()
+        server.ehlo()
+        server.login(self.username, self.password)
+        
+        self._smtp = server
+        return server
     
     @staticmethod
     def _format_message(alert: ValidationAlert) -> str:
@@ -119,35 +187,33 @@ class EmailNotifier:
         Returns:
             HTML formatted message
         """
-        color = {
-            AlertLevel.CRITICAL: '#dc3545',
-            AlertLevel.WARNING: '#ffc107',
-            AlertLevel.INFO: '#17a2b8'
-        }.get(alert.level, '#6c757d')
+        color = _LEVEL_COLOR.get(alert.level, '#6c757d')
         
-        html = f"""
+        parts = [f"""
         <html>
         <body>
             <div style="font-family: Arial, sans-serif;">
                 <h2 style="color: {color};">{alert.level.value.upper()} Alert</h2>
-                <p><strong>Rule:</strong> {alert.rule}</p>
-                <p><strong>Message:</strong> {alert.message}</p>
+                <p><strong>Rule:</strong> {escape(alert.rule)}</p>
+                <p><strong>Message:</strong> {escape(alert.message)}</p>
                 
                 <h3>Details:</h3>
                 <ul>
-        """
+        """]
         
-        for key, value in alert.data.items():
-            html += f"<li><strong>{key}:</strong> {value}</li>"
+        parts.extend(
+            f"<li><strong>{escape(str(key))}:</strong> {escape(str(value))}</li>"
+            for key, value in alert.data.items()
+        )
         
-        html += """
+        parts.append("""
                 </ul>
             </div>
         </body>
         </html>
-        """
+        """)
         
-        return html
+        return "".join(parts)
     
     @staticmethod
     def _format_digest(alerts: List[ValidationAlert]) -> str:
@@ -160,29 +226,28 @@ class EmailNotifier:
         Returns:
             HTML formatted digest
         """
-        html = """
+        parts = ["""
         <html>
         <body style="font-family: Arial, sans-serif;">
             <h1>Mining Operations Daily Digest</h1>
-        """
+        """]
         
         # Group by level
-        by_level = {}
+        by_level = defaultdict(list)
         for alert in alerts:
-            level = alert.level.value
-            if level not in by_level:
-                by_level[level] = []
-            by_level[level].append(alert)
+            by_level[alert.level.value].append(alert)
+        
+        append = parts.append
         
         for level, level_alerts in by_level.items():
-            html += f"<h2>{level.upper()} ({len(level_alerts)})</h2><ul>"
+            append(f"<h2>{level.upper()} ({len(level_alerts)})</h2><ul>")
             for alert in level_alerts:
-                html += f"<li><strong>{alert.rule}:</strong> {alert.message}</li>"
-            html += "</ul>"
+                append(f"<li><strong>{escape(alert.rule)}:</strong> {escape(alert.message)}</li>")
+            append("</ul>")
         
-        html += """
+        parts.append("""
         </body>
         </html>
-        """
+        """)
         
-        return html
+        return "".join(parts)
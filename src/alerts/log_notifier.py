@@ -2,27 +2,62 @@
 Log file notifier for persistent alert records.
 """
 
-import json
+import atexit
+import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Iterable, Iterator, Optional
 
+from src.core import fastjson
 from src.core.validator import ValidationAlert
 
 
 class LogNotifier:
     """Writes alerts to a log file."""
     
-    def __init__(self, log_file: str = "logs/alerts.log"):
+    BUFFER_SIZE = 1 << 16
+    FLUSH_EVERY = 256
+    
+    def __init__(self, log_file: str = "logs/alerts.log", flush_interval: float = 5.0):
         """
         Initialize log notifier.
         
         Args:
             log_file: Path to log file
+            flush_interval: Maximum seconds between flushes of buffered entries
         """
         self.log_file = Path(log_file)
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
         self.enabled = True
+        self.flush_interval = flush_interval
+        
+        # Append handle, opened on first alert and kept for the notifier's life
+        self._fh: Optional[BinaryIO] = None
+        self._pending = 0
+        self._last_flush = time.monotonic()
+    
+    def _handle(self) -> BinaryIO:
+        """Return the buffered append handle, opening it on first use."""
+        if self._fh is None:
+            self._fh = open(self.log_file, 'ab', buffering=self.BUFFER_SIZE)
+            atexit.register(self.close)
+        return self._fh
+    
+    def flush(self):
+        """Write buffered entries to the log file."""
+        if self._fh is not None:
+            self._fh.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+    
+    def close(self):
+        """Flush and close the log file."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+            atexit.unregister(self.close)
+        self._pending = 0
     
     def send_alert(self, alert: ValidationAlert):
         """
@@ -43,9 +78,14 @@ class LogNotifier:
             "data": alert.data
         }
         
-        # Append to log file
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + '\n')
+        # Append to the buffered log file, flushing every FLUSH_EVERY entries
+        # or flush_interval seconds
+        self._handle().write(fastjson.dumps_line(log_entry) + b'\n')
+        self._pending += 1
+        
+        if (self._pending >= self.FLUSH_EVERY
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
     
     def read_alerts(self, limit: Optional[int] = None) -> list:
         """
@@ -57,19 +97,40 @@ class LogNotifier:
         Returns:
             List of alert dictionaries
         """
+        # Make this notifier's own buffered entries visible
+        self.flush()
+        
         if not self.log_file.exists():
             return []
         
-        alerts = []
-        with open(self.log_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    alert = json.loads(line)
-                    alerts.append(alert)
-                except json.JSONDecodeError:
-                    continue
-        
-        if limit:
-            alerts = alerts[-limit:]
+        with open(self.log_file, 'rb') as f:
+            if not limit:
+                return list(self._parse_lines(f))
+            
+            # Parse only the last lines, widening the window while blank or
+            # corrupt lines leave fewer than limit alerts in it
+            window = limit
+            while True:
+                tail = deque(f, maxlen=window)
+                alerts = list(self._parse_lines(tail))
+                if len(alerts) >= limit or len(tail) < window:
+                    return alerts[-limit:]
+                window *= 2
+                f.seek(0)
+    
+    @staticmethod
+    def _parse_lines(lines: Iterable[bytes]) -> Iterator[dict]:
+        """
+        Decode JSON log lines, skipping blank or corrupt ones.
         
-        return alerts
+        Args:
+            lines: Raw log file lines
+            
+        Yields:
+            Alert dictionaries
+        """
+        for line in lines:
+            try:
+                yield fastjson.loads(line)
+            except ValueError:
+                continue
@@ -5,6 +5,8 @@ Uses direct HTTP API calls for reliability (no async complexity).
 
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Optional
 
 from src.core.validator import ValidationAlert, AlertLevel
@@ -14,6 +16,8 @@ class TelegramNotifier:
     """Sends alerts via Telegram bot using HTTP API."""
     
     TELEGRAM_API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+    MAX_MESSAGE_LENGTH = 4096
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
     
     def __init__(self, bot_token: str = None, chat_id: str = None):
         self.bot_token = bot_token or os.getenv('TELEGRAM_BOT_TOKEN')
@@ -27,6 +31,26 @@ class TelegramNotifier:
         
         self.enabled = True
         self.api_url = self.TELEGRAM_API_URL.format(token=self.bot_token)
+        
+        # One pooled connection, so TCP/TLS setup is paid once per run;
+        # transient failures and rate limits are retried with backoff
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset(["POST"]),
+            raise_on_status=False
+        )
+        self._session = requests.Session()
+        self._session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retry)
+        )
+    
+    def close(self):
+        """Close the HTTP session."""
+        if self.enabled:
+            self._session.close()
     
     def send_alert(self, alert: ValidationAlert):
         """Buffer an alert for the summary message."""
@@ -39,29 +63,44 @@ class TelegramNotifier:
         if not self.enabled or not self.alerts_buffer:
             return
         
-        # Count by level
-        critical_count = sum(1 for a in self.alerts_buffer if a.level == AlertLevel.CRITICAL)
-        warning_count = sum(1 for a in self.alerts_buffer if a.level == AlertLevel.WARNING)
-        info_count = len(self.alerts_buffer) - critical_count - warning_count
+        # Count by level and collect critical alerts in one pass
+        critical_alerts = []
+        warning_count = info_count = 0
+        for alert in self.alerts_buffer:
+            level = alert.level
+            if level == AlertLevel.CRITICAL:
+                critical_alerts.append(alert)
+            elif level == AlertLevel.WARNING:
+                warning_count += 1
+            else:
+                info_count += 1
+        critical_count = len(critical_alerts)
+        
+        # An INFO-only summary isn't worth a message
+        if not critical_count and not warning_count:
+            self.alerts_buffer.clear()
+            return
         
         # Build summary message
-        message = "📊 *Mining Ops — Alert Summary*\n\n"
-        message += f"Total alerts: *{len(self.alerts_buffer)}*\n"
+        lines = [
+            "📊 *Mining Ops — Alert Summary*\n\n",
+            f"Total alerts: *{len(self.alerts_buffer)}*\n"
+        ]
         if critical_count:
-            message += f"🚨 Critical: *{critical_count}*\n"
+            lines.append(f"🚨 Critical: *{critical_count}*\n")
         if warning_count:
-            message += f"⚠️ Warning: *{warning_count}*\n"
+            lines.append(f"⚠️ Warning: *{warning_count}*\n")
         if info_count:
-            message += f"ℹ️ Info: *{info_count}*\n"
+            lines.append(f"ℹ️ Info: *{info_count}*\n")
         
         # Add top 5 critical alerts as details
-        critical_alerts = [a for a in self.alerts_buffer if a.level == AlertLevel.CRITICAL]
         if critical_alerts:
-            message += "\n*Top Critical Alerts:*\n"
-            for alert in critical_alerts[:5]:
-                message += f"• {alert.message}\n"
+            lines.append("\n*Top Critical Alerts:*\n")
+            lines.extend(f"• {alert.message}\n" for alert in critical_alerts[:5])
             if len(critical_alerts) > 5:
-                message += f"_...and {len(critical_alerts) - 5} more_\n"
+                lines.append(f"_...and {len(critical_alerts) - 5} more_\n")
+        
+        message = "".join(lines)
         
         # Send via HTTP
         self._send_message(message)
@@ -69,24 +108,60 @@ class TelegramNotifier:
         # Clear buffer
         self.alerts_buffer.clear()
     
+    @classmethod
+    def _split_message(cls, text: str) -> List[str]:
+        """
+        Split text into chunks within Telegram's message length limit.
+        
+        Splits on line boundaries; a single over-long line is cut hard.
+        
+        Args:
+            text: Message text
+            
+        Returns:
+            List of message chunks
+        """
+        limit = cls.MAX_MESSAGE_LENGTH
+        if len(text) <= limit:
+            return [text]
+        
+        chunks = []
+        current = ""
+        for line in text.splitlines(keepends=True):
+            while len(line) > limit:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(line[:limit])
+                line = line[limit:]
+            if len(current) + len(line) > limit:
+                chunks.append(current)
+                current = ""
+            current += line
+        if current:
+            chunks.append(current)
+        
+        return chunks
+    
     def _send_message(self, text: str):
-        """Send a message to Telegram via HTTP POST."""
+        """Send a message to Telegram via HTTP POST on the pooled session."""
         if not self.enabled:
             return
         
-        try:
-            response = requests.post(
-                self.api_url,
-                json={
-                    "chat_id": self.chat_id,
-                    "text": text,
-                    "parse_mode": "Markdown"
-                },
-                timeout=10
-            )
-            if response.status_code == 200:
-                print("✓ Telegram summary sent successfully")
-            else:
-                print(f"Warning: Telegram API returned status {response.status_code}: {response.text}")
-        except Exception as e:
-            print(f"Warning: Failed to send Telegram message: {e}")
+        for chunk in self._split_message(text):
+            try:
+                response = self._session.post(
+                    self.api_url,
+                    json={
+                        "chat_id": self.chat_id,
+                        "text": chunk,
+                        "parse_mode": "Markdown"
+                    },
+                    timeout=10
+                )
+                if response.status_code == 200:
+                    print("✓ Telegram summary sent successfully")
+                else:
+                    print(f"Warning: Telegram API returned status {response.status_code}: {response.text}")
+            except Exception as e:
+                print(f"Warning: Failed to send Telegram message: {e}")
@@ -3,16 +3,249 @@ Assay converter - converts lab analysis data to standardized format.
 Handles sample code parsing and detection limit processing.
 """
 
+import os
 import re
-from typing import Any, Dict, List, Optional
-from pathlib import Path
 import sys
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from pathlib import Path
 
-# Add parent directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent.parent))
-
+from src.core import fastjson
+from src.core.parallel import process_pool
 from src.core.base_converter import BaseConverter
 
+# Fields of a standardized sample record, in output order
+SAMPLE_FIELDS = (
+    "sample_code", "sheet_name", "au_ppm", "au_detected", "below_detection_limit",
+    "sample_type", "facility_code", "date", "year", "month", "day",
+    "sample_number", "is_special"
+)
+
+# Below this many records in total, sheets are converted in-process: worker
+# start-up and pickling would cost more than the parallel parsing saves
+PARALLEL_MIN_RECORDS = 50_000
+
+# Metadata attached to every converted assay document
+ASSAY_METADATA = {
+    "source": "lab_analysis",
+    "detection_limit_ppm": 0.05
+}
+
+# Distinct sample codes remembered by the parse cache
+SAMPLE_CODE_CACHE_SIZE = 100_000
+
+# Column name typos seen in lab sheets
+COLUMN_TYPOS = {
+    "Samole": "Sample",  # English typo
+}
+
+# Sample code patterns, compiled once at import and matched against the
+# whole stripped code with fullmatch
+SPECIAL_SAMPLE_CODES = frozenset({"F2(T3)", "SR2"})
+# Spaced: C 1404 10 14 K2
+_SPACED_RE = re.compile(r'([A-C])\s+(\d{4})\s+(\d{1,2})\s+(\d{1,2})\s+([A-Z]{1,2})(\d*)')
+# Letter+digit prefix (T1, F2, etc.) + date, no suffix
+_LETTER_DIGIT_PREFIX_RE = re.compile(r'([A-Z]\d)(\d{4})(\d{2})(\d{1,2})')
+# Two-letter prefix (RC, LC, etc.) + date, no suffix
+_TWO_LETTER_PREFIX_RE = re.compile(r'([A-Z]{2})(\d{4})(\d{2})(\d{1,2})')
+# Single letter prefix + date + suffix
+_LETTER_PREFIX_SUFFIX_RE = re.compile(r'([A-Z])(\d{4})(\d{2})(\d{1,2})([A-Z]+\d*)')
+# No prefix + date + suffix
+_DATE_SUFFIX_RE = re.compile(r'(\d{4})(\d{2})(\d{1,2})([A-Z]+\d*)')
+
+
+@lru_cache(maxsize=SAMPLE_CODE_CACHE_SIZE)
+def _parse_sample_code_cached(sample_code: str) -> Dict[str, Any]:
+    """
+    Parse sample code to extract metadata, memoized per code string.
+    
+    The same physical sample recurs across the Solutions/Solids/Carbon
+    sheets, so each distinct code is matched against the patterns once.
+    The returned dict is shared between calls and must not be mutated.
+    Parsed sample types are interned: the handful of distinct types are
+    then shared objects whose hash is computed once, which speeds up the
+    statistics and validation lookups keyed on them.
+    
+    Args:
+        sample_code: Sample code string
+        
+    Returns:
+        Dictionary with parsed fields
+    """
+    sample_code = sample_code.strip() if sample_code else ""
+    if not sample_code:
+        return {}
+    
+    # Special codes
+    if sample_code in SPECIAL_SAMPLE_CODES:
+        return {
+            "facility": None,
+            "date": None,
+            "sample_type": sample_code[:50],
+            "is_special": True,
+            "year": "",
+            "month": "",
+            "day": "",
+            "sample_number": ""
+        }
+    
+    # Try spaced pattern first (backward compatibility)
+    match = _SPACED_RE.fullmatch(sample_code)
+    
+    if match:
+        facility, year, month, day, sample_type, sample_num = match.groups()
+        date_str = f"{year}/{month.zfill(2)}/{day.zfill(2)}"
+        
+        return {
+            "facility": facility,
+            "year": year,
+            "month": month.zfill(2),
+            "day": day.zfill(2),
+            "date": date_str,
+            "sample_type": sys.intern(sample_type[:50]),
+            "sample_number": sample_num if sample_num else "",
+            "is_special": False
+        }
+    
+    # Try concatenated patterns in order of specificity
+    
+    # Pattern 1: Letter+digit prefix (T1, F2, etc.) + date (no suffix expected)
+    match = _LETTER_DIGIT_PREFIX_RE.fullmatch(sample_code)
+    if match:
+        prefix, year, month, day = match.groups()
+        date_str = f"{year}/{month}/{day.zfill(2)}"
+        return {
+            "facility": None,
+            "prefix": prefix,
+            "year": year,
+            "month": month,
+            "day": day.zfill(2),
+            "date": date_str,
+            "sample_type": "",  # No suffix in this pattern
+            "sample_number": "",
+            "is_special": False
+        }
+    
+    # Pattern 2: Two-letter prefix (RC, LC, etc.) + date (no suffix expected)
+    match = _TWO_LETTER_PREFIX_RE.fullmatch(sample_code)
+    if match:
+        prefix, year, month, day = match.groups()
+        facility = prefix if prefix in ("A", "B", "C") else None
+        date_str = f"{year}/{month}/{day.zfill(2)}"
+        return {
+            "facility": facility,
+            "prefix": prefix,
+            "year": year,
+            "month": month,
+            "day": day.zfill(2),
+            "date": date_str,
+            "sample_type": "",  # No suffix in this pattern
+            "sample_number": "",
+            "is_special": False
+        }
+    
+    # Pattern 3: Single letter prefix + date + suffix
+    match = _LETTER_PREFIX_SUFFIX_RE.fullmatch(sample_code)
+    if match:
+        prefix, year, month, day, suffix = match.groups()
+        facility = prefix if prefix in ("A", "B", "C") else None
+        date_str = f"{year}/{month}/{day.zfill(2)}"
+        return {
+            "facility": facility,
+            "prefix": prefix,
+            "year": year,
+            "month": month,
+            "day": day.zfill(2),
+            "date": date_str,
+            "sample_type": sys.intern(suffix[:50]),
+            "sample_number": "",
+            "is_special": False
+        }
+    
+    # Pattern 4: No prefix + date + suffix
+    match = _DATE_SUFFIX_RE.fullmatch(sample_code)
+    if match:
+        year, month, day, suffix = match.groups()
+        date_str = f"{year}/{month}/{day.zfill(2)}"
+        return {
+            "facility": None,
+            "year": year,
+            "month": month,
+            "day": day.zfill(2),
+            "date": date_str,
+            "sample_type": sys.intern(suffix[:50]),
+            "sample_number": "",
+            "is_special": False
+        }
+    
+    # Fallback - couldn't parse
+    return {
+        "sample_type": sample_code[:50],
+        "is_special": False,
+        "parse_error": True,
+        "year": "",
+        "month": "",
+        "day": "",
+        "sample_number": ""
+    }
+
+
+class _SampleStatistics:
+    """Running per-sample-type statistics, updated one sample at a time."""
+    
+    def __init__(self):
+        self.total = 0
+        self.detected = 0
+        # sample_type -> [count, detected, au_sum, au_count, au_max, au_min]
+        self.by_type: Dict[str, List[Any]] = {}
+    
+    def add(self, sample: Dict[str, Any]):
+        """Fold one standardized sample into the running statistics."""
+        sample_type = sample.get("sample_type", "Unknown")
+        stats = self.by_type.get(sample_type)
+        if stats is None:
+            stats = self.by_type[sample_type] = [0, 0, 0, 0, None, None]
+        
+        self.total += 1
+        stats[0] += 1
+        
+        if sample.get("au_detected"):
+            self.detected += 1
+            stats[1] += 1
+            au = sample.get("au_ppm")
+            if au is not None:
+                stats[2] += au
+                stats[3] += 1
+                if stats[4] is None or au > stats[4]:
+                    stats[4] = au
+                if stats[5] is None or au < stats[5]:
+                    stats[5] = au
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Build the statistics dictionary.
+        
+        Returns:
+            Statistics with totals, per-type breakdown and detection rate
+        """
+        by_type = {}
+        for sample_type, (count, detected, au_sum, au_count, au_max, au_min) in self.by_type.items():
+            by_type[sample_type] = {
+                "count": count,
+                "detected": detected,
+                "detection_rate": detected / count,
+                "average_au_ppm": au_sum / au_count if au_count else 0,
+                "max_au_ppm": au_max if au_count else 0,
+                "min_au_ppm": au_min if au_count else 0
+            }
+        
+        return {
+            "total_samples": self.total,
+            "by_type": by_type,
+            "detection_rate": self.detected / self.total if self.total else 0,
+            "average_au_ppm": {}
+        }
+
 
 class AssayConverter(BaseConverter):
     """Converts lab assay data to standardized format."""
@@ -34,62 +267,149 @@ class AssayConverter(BaseConverter):
         Returns:
             Standardized assay data with metadata
         """
-        all_samples = []
-        statistics = {
-            "total_samples": 0,
-            "by_type": {},
-            "detection_rate": 0,
-            "average_au_ppm": {}
+        samples = list(self.iter_samples(input_data))
+        
+        return {
+            "samples": samples,
+            "statistics": self.compute_statistics(samples),
+            "metadata": dict(ASSAY_METADATA)
         }
+    
+    def iter_samples(self, input_data: Dict[str, List[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield standardized samples sheet by sheet.
         
-        for sheet_name, records in input_data.items():
-            sheet_samples = self._convert_sheet_records(records, sheet_name)
-            all_samples.extend(sheet_samples)
-        
-        # Calculate statistics
-        statistics["total_samples"] = len(all_samples)
-        
-        # Group by sample type
-        type_groups = {}
-        for sample in all_samples:
-            sample_type = sample.get("sample_type", "Unknown")
-            if sample_type not in type_groups:
-                type_groups[sample_type] = []
-            type_groups[sample_type].append(sample)
-        
-        # Calculate stats per type
-        detected_count = 0
-        for sample_type, samples in type_groups.items():
-            au_values = [s["au_ppm"] for s in samples if s.get("au_detected") and s.get("au_ppm") is not None]
-            detected = sum(1 for s in samples if s.get("au_detected"))
+        Args:
+            input_data: Dictionary with sheet names as keys, list of records as values
             
-            statistics["by_type"][sample_type] = {
-                "count": len(samples),
-                "detected": detected,
-                "detection_rate": detected / len(samples) if samples else 0,
-                "average_au_ppm": sum(au_values) / len(au_values) if au_values else 0,
-                "max_au_ppm": max(au_values) if au_values else 0,
-                "min_au_ppm": min(au_values) if au_values else 0
-            }
+        Yields:
+            Standardized sample records
+        """
+        for sheet_columns in self._convert_sheets(input_data):
+            yield from self._columns_to_records(sheet_columns)
+    
+    @staticmethod
+    def compute_statistics(samples: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Compute assay statistics in a single pass over the samples.
+        
+        Args:
+            samples: Standardized sample records (any iterable)
             
-            detected_count += detected
+        Returns:
+            Statistics dictionary
+        """
+        statistics = _SampleStatistics()
+        for sample in samples:
+            statistics.add(sample)
+        return statistics.summary()
+    
+    def stream_to_file(self, input_data: Dict[str, List[Dict[str, Any]]], output_path: str) -> Dict[str, Any]:
+        """
+        Convert lab assay data writing each sample to disk as it is produced.
         
-        statistics["detection_rate"] = detected_count / len(all_samples) if all_samples else 0
+        Statistics are accumulated while the samples are written, so the full
+        sample list is never held in memory. Use convert_to_file() instead
+        when the samples are needed afterwards.
         
-        return {
-            "samples": all_samples,
-            "statistics": statistics,
-            "metadata": {
-                "source": "lab_analysis",
-                "detection_limit_ppm": 0.05
+        Args:
+            input_data: Dictionary with sheet names as keys, list of records as values
+            output_path: Output file path
+            
+        Returns:
+            Converted data without the samples ("statistics" and "metadata")
+        """
+        statistics = _SampleStatistics()
+        result = {}
+        
+        def tracked_samples():
+            for sample in self.iter_samples(input_data):
+                statistics.add(sample)
+                yield sample
+        
+        def items():
+            yield "samples", tracked_samples()
+            # Only pulled once every sample has been written
+            result["statistics"] = statistics.summary()
+            yield "statistics", result["statistics"]
+            result["metadata"] = dict(ASSAY_METADATA)
+            yield "metadata", result["metadata"]
+        
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        fastjson.stream_write_file(output_file, fastjson.iter_dumps_items(items()))
+        
+        return result
+    
+    def _convert_sheets(
+        self,
+        input_data: Dict[str, List[Dict[str, Any]]]
+    ) -> List[Dict[str, List[Any]]]:
+        """
+        Convert every sheet, in parallel worker processes for large inputs.
+        
+        Sheets are independent and parsing them is CPU-bound, so threads
+        would serialize on the GIL.
+        
+        Args:
+            input_data: Dictionary with sheet names as keys, list of records as values
+            
+        Returns:
+            Sample columns per sheet, in input order
+        """
+        total_records = sum(len(records) for records in input_data.values())
+        workers = min(len(input_data), os.cpu_count() or 1)
+        
+        if workers < 2 or total_records < PARALLEL_MIN_RECORDS:
+            return [
+                self._convert_sheet_records(records, sheet_name)
+                for sheet_name, records in input_data.items()
+            ]
+        
+        with process_pool(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._convert_sheet_records, records, sheet_name)
+                for sheet_name, records in input_data.items()
+            ]
+            return [future.result() for future in futures]
+    
+    @staticmethod
+    def _columns_to_records(columns: Dict[str, List[Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Turn sample columns into the sample records used downstream.
+        
+        Args:
+            columns: Dictionary of equal-length lists keyed by SAMPLE_FIELDS
+            
+        Returns:
+            Iterator of standardized sample records
+        """
+        return (
+            {
+                "sample_code": code,
+                "sheet_name": sheet,
+                "au_ppm": au,
+                "au_detected": detected,
+                "below_detection_limit": below,
+                "sample_type": sample_type,
+                "facility_code": facility,
+                "date": date,
+                "year": year,
+                "month": month,
+                "day": day,
+                "sample_number": number,
+                "is_special": special
             }
-        }
+            for (code, sheet, au, detected, below, sample_type, facility,
+                 date, year, month, day, number, special)
+            in zip(*(columns[field] for field in SAMPLE_FIELDS))
+        )
     
     def _convert_sheet_records(
         self,
         records: List[Dict[str, Any]],
         sheet_name: str
-    ) -> List[Dict[str, Any]]:
+    ) -> Dict[str, List[Any]]:
         """
         Convert records from a single sheet.
         
@@ -98,47 +418,53 @@ class AssayConverter(BaseConverter):
             sheet_name: Sheet name (Solutions, Solids, Carbon)
             
         Returns:
-            List of standardized sample records
+            Standardized samples as columns: one list per SAMPLE_FIELDS entry
         """
-        samples = []
+        columns = {field: [] for field in SAMPLE_FIELDS}
+        (add_code, add_sheet, add_au, add_detected, add_below, add_type, add_facility,
+         add_date, add_year, add_month, add_day, add_number, add_special) = (
+            columns[field].append for field in SAMPLE_FIELDS
+        )
+        # Bound once, outside the per-record loop
+        is_null_row = self.is_null_row
+        normalize_column_names = self._normalize_column_names
+        parse_au_value = self._parse_au_value
         
         for record in records:
             # Skip null rows
-            if self.is_null_row(record):
+            if is_null_row(record):
                 continue
             
             # Fix column name typos
-            normalized_record = self._normalize_column_names(record)
+            normalized_record = normalize_column_names(record)
             
             # Extract fields
             sample_code = normalized_record.get("sample_code") or normalized_record.get("Sample")
             au_raw = normalized_record.get("au_ppm") or normalized_record.get("Au (ppm)")
             
-            # Parse sample code
-            parsed_code = self._parse_sample_code(str(sample_code)) if sample_code else {}
+            # Parse sample code (coerced to str once; parsing strips it).
+            # The cached result is shared, so it is only read here
+            code_str = str(sample_code) if sample_code else ""
+            parsed_code = _parse_sample_code_cached(code_str) if code_str else {}
             
             # Handle detection limit
-            au_result = self._parse_au_value(au_raw)
+            au_result = parse_au_value(au_raw)
             
-            sample = {
-                "sample_code": str(sample_code) if sample_code else "",
-                "sheet_name": sheet_name,
-                "au_ppm": au_result["value"],
-                "au_detected": au_result["detected"],
-                "below_detection_limit": au_result["below_limit"],
-                "sample_type": parsed_code.get("sample_type", ""),
-                "facility_code": parsed_code.get("facility", ""),
-                "date": parsed_code.get("date", ""),
-                "year": parsed_code.get("year", ""),
-                "month": parsed_code.get("month", ""),
-                "day": parsed_code.get("day", ""),
-                "sample_number": parsed_code.get("sample_number", ""),
-                "is_special": parsed_code.get("is_special", False)
-            }
-            
-            samples.append(sample)
-        
-        return samples
+            add_code(code_str)
+            add_sheet(sheet_name)
+            add_au(au_result["value"])
+            add_detected(au_result["detected"])
+            add_below(au_result["below_limit"])
+            add_type(parsed_code.get("sample_type", ""))
+            add_facility(parsed_code.get("facility", ""))
+            add_date(parsed_code.get("date", ""))
+            add_year(parsed_code.get("year", ""))
+            add_month(parsed_code.get("month", ""))
+            add_day(parsed_code.get("day", ""))
+            add_number(parsed_code.get("sample_number", ""))
+            add_special(parsed_code.get("is_special", False))
+        
+        return columns
     
     @staticmethod
     def _parse_sample_code(sample_code: str) -> Dict[str, Any]:
@@ -153,131 +479,11 @@ class AssayConverter(BaseConverter):
             sample_code: Sample code string
             
         Returns:
-            Dictionary with parsed fields
+            Dictionary with parsed fields (a copy the caller may modify)
         """
-        if not sample_code or sample_code.strip() == "":
+        if not sample_code:
             return {}
-        
-        sample_code = sample_code.strip()
-        
-        # Special codes
-        special_codes = {"F2(T3)", "SR2"}
-        if sample_code in special_codes:
-            return {
-                "facility": None,
-                "date": None,
-                "sample_type": sample_code[:50],
-                "is_special": True,
-                "year": "",
-                "month": "",
-                "day": "",
-                "sample_number": ""
-            }
-        
-        # Try spaced pattern first (backward compatibility)
-        pattern_spaced = r'^([A-C])\s+(\d{4})\s+(\d{1,2})\s+(\d{1,2})\s+([A-Z]{1,2})(\d*)$'
-        match = re.match(pattern_spaced, sample_code)
-        
-        if match:
-            facility, year, month, day, sample_type, sample_num = match.groups()
-            date_str = f"{year}/{month.zfill(2)}/{day.zfill(2)}"
-            
-            return {
-                "facility": facility,
-                "year": year,
-                "month": month.zfill(2),
-                "day": day.zfill(2),
-                "date": date_str,
-                "sample_type": sample_type[:50],
-                "sample_number": sample_num if sample_num else "",
-                "is_special": False
-            }
-        
-        # Try concatenated patterns in order of specificity
-        
-        # Pattern 1: Letter+digit prefix (T1, F2, etc.) + date (no suffix expected)
-        pattern1 = r'^([A-Z]\d)(\d{4})(\d{2})(\d{1,2})$'
-        match = re.match(pattern1, sample_code)
-        if match:
-            prefix, year, month, day = match.groups()
-            date_str = f"{year}/{month}/{day.zfill(2)}"
-            return {
-                "facility": None,
-                "prefix": prefix,
-                "year": year,
-                "month": month,
-                "day": day.zfill(2),
-                "date": date_str,
-                "sample_type": "",  # No suffix in this pattern
-                "sample_number": "",
-                "is_special": False
-            }
-        
-        # Pattern 2: Two-letter prefix (RC, LC, etc.) + date (no suffix expected)
-        pattern2 = r'^([A-Z]{2})(\d{4})(\d{2})(\d{1,2})$'
-        match = re.match(pattern2, sample_code)
-        if match:
-            prefix, year, month, day = match.groups()
-            facility = prefix if prefix in ("A", "B", "C") else None
-            date_str = f"{year}/{month}/{day.zfill(2)}"
-            return {
-                "facility": facility,
-                "prefix": prefix,
-                "year": year,
-                "month": month,
-                "day": day.zfill(2),
-                "date": date_str,
-                "sample_type": "",  # No suffix in this pattern
-                "sample_number": "",
-                "is_special": False
-            }
-        
-        # Pattern 3: Single letter prefix + date + suffix
-        pattern3 = r'^([A-Z])(\d{4})(\d{2})(\d{1,2})([A-Z]+\d*)$'
-        match = re.match(pattern3, sample_code)
-        if match:
-            prefix, year, month, day, suffix = match.groups()
-            facility = prefix if prefix in ("A", "B", "C") else None
-            date_str = f"{year}/{month}/{day.zfill(2)}"
-            return {
-                "facility": facility,
-                "prefix": prefix,
-                "year": year,
-                "month": month,
-                "day": day.zfill(2),
-                "date": date_str,
-                "sample_type": suffix[:50],
-                "sample_number": "",
-                "is_special": False
-            }
-        
-        # Pattern 4: No prefix + date + suffix
-        pattern4 = r'^(\d{4})(\d{2})(\d{1,2})([A-Z]+\d*)$'
-        match = re.match(pattern4, sample_code)
-        if match:
-            year, month, day, suffix = match.groups()
-            date_str = f"{year}/{month}/{day.zfill(2)}"
-            return {
-                "facility": None,
-                "year": year,
-                "month": month,
-                "day": day.zfill(2),
-                "date": date_str,
-                "sample_type": suffix[:50],
-                "sample_number": "",
-                "is_special": False
-            }
-        
-        # Fallback - couldn't parse
-        return {
-            "sample_type": sample_code[:50],
-            "is_special": False,
-            "parse_error": True,
-            "year": "",
-            "month": "",
-            "day": "",
-            "sample_number": ""
-        }
+        return dict(_parse_sample_code_cached(sample_code))
     
     @staticmethod
     def _parse_au_value(au_raw: Any) -> Dict[str, Any]:
@@ -290,6 +496,14 @@ class AssayConverter(BaseConverter):
         Returns:
             Dictionary with value, detected flag, and below_limit flag
         """
+        # Numeric values (the common case) need no string parsing
+        if isinstance(au_raw, (int, float)) and not isinstance(au_raw, bool):
+            return {
+                "value": float(au_raw),
+                "detected": True,
+                "below_limit": False
+            }
+        
         if au_raw is None or au_raw == "":
             return {
                 "value": None,
@@ -341,17 +555,16 @@ class AssayConverter(BaseConverter):
             record: Raw record dictionary
             
         Returns:
-            Record with normalized column names
+            Record with normalized column names (the record itself when it
+            has no typo columns)
         """
-        normalized = {}
-        
-        typo_map = {
-            "Samole": "Sample",  # English typo
-        }
+        # Almost no rows carry a typo column, so don't copy those
+        if COLUMN_TYPOS.keys().isdisjoint(record):
+            return record
         
+        normalized = {}
         for key, value in record.items():
-            normalized_key = typo_map.get(key, key)
-            normalized[normalized_key] = value
+            normalized[COLUMN_TYPOS.get(key, key)] = value
         
         return normalized
 
@@ -368,11 +581,9 @@ def main():
         with open(input_file, 'r', encoding='utf-8') as f:
             input_data = json.load(f)
         
-        result = converter.convert(input_data)
-        
-        # Write output
+        # Write output, streaming samples straight to disk
         output_file = "data/processed/lab_samples_standardized.json"
-        converter.write_json(result, output_file)
+        result = converter.stream_to_file(input_data, output_file)
         print(f"Converted {result['statistics']['total_samples']} lab samples")
         print(f"Detection rate: {result['statistics']['detection_rate']:.1%}")
         print(f"Output written to: {output_file}")
@@ -3,15 +3,26 @@ Bunker converter - converts bunker load data from Excel/JSON to standardized for
 Handles grinding facility → factory transport data.
 """
 
-from typing import Any, Dict, List
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 from pathlib import Path
-import sys
 
-# Add parent directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent.parent))
+import numpy as np
+import pandas as pd
 
+from src.core import fastjson
 from src.core.base_converter import BaseConverter
 
+# Grinding facility -> factory haulage rate
+TRANSPORT_COST_PER_TON_RIAL = 3200000
+
+# Metadata attached to every converted bunker document
+BUNKER_METADATA = {
+    "source": "bunker_transport",
+    "transport_cost_per_ton_rial": 3200000,
+    "transport_cost_per_ton_toman": 320000
+}
+
 
 class BunkerConverter(BaseConverter):
     """Converts bunker transport data to standardized format."""
@@ -26,6 +37,9 @@ class BunkerConverter(BaseConverter):
             "شن بتن": "B",
             "مس کاویان": "C"
         }
+        
+        # Partial sheet-name matching in one regex scan
+        self._sheet_re = re.compile("|".join(re.escape(name) for name in self.sheet_to_facility))
     
     def convert(self, input_data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
         """
@@ -38,49 +52,156 @@ class BunkerConverter(BaseConverter):
             Standardized bunker data with metadata
         """
         all_loads = []
-        statistics = {
-            "total_loads": 0,
-            "by_facility": {},
-            "total_tonnage_kg": 0
+        facility_codes = []
+        
+        for facility_code, loads in self._iter_sheet_loads(input_data.items()):
+            all_loads.extend(loads)
+            if facility_code not in facility_codes:
+                facility_codes.append(facility_code)
+        
+        statistics = self._load_statistics(
+            [load["facility_code"] for load in all_loads],
+            [load["tonnage_kg"] for load in all_loads],
+            facility_codes
+        )
+        
+        return {
+            "loads": all_loads,
+            "statistics": statistics,
+            "metadata": dict(BUNKER_METADATA)
         }
+    
+    def convert_iter(self, sheets: Iterable[Tuple[str, List[Dict[str, Any]]]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield standardized loads sheet by sheet.
         
-        for sheet_name, records in input_data.items():
+        Args:
+            sheets: (sheet name, list of records) pairs, e.g. from
+                fastjson.iter_load_items()
+            
+        Yields:
+            Standardized load records
+        """
+        for _, loads in self._iter_sheet_loads(sheets):
+            yield from loads
+    
+    def stream_to_file(self, sheets: Iterable[Tuple[str, List[Dict[str, Any]]]], output_path: str) -> Dict[str, Any]:
+        """
+        Convert bunker load data writing each sheet's loads as it is converted.
+        
+        Only one input sheet and the two statistics columns are held in
+        memory, so a streamed input (fastjson.iter_load_items()) is never
+        loaded whole.
+        
+        Args:
+            sheets: (sheet name, list of records) pairs
+            output_path: Output file path
+            
+        Returns:
+            Converted data without the loads ("statistics" and "metadata")
+        """
+        load_facilities = []
+        tonnages = []
+        facility_codes = []
+        result = {}
+        
+        def tracked_loads():
+            for facility_code, loads in self._iter_sheet_loads(sheets):
+                if facility_code not in facility_codes:
+                    facility_codes.append(facility_code)
+                load_facilities.extend(load["facility_code"] for load in loads)
+                tonnages.extend(load["tonnage_kg"] for load in loads)
+                yield from loads
+        
+        def items():
+            yield "loads", tracked_loads()
+            # Only pulled once every load has been written
+            result["statistics"] = self._load_statistics(load_facilities, tonnages, facility_codes)
+            yield "statistics", result["statistics"]
+            result["metadata"] = dict(BUNKER_METADATA)
+            yield "metadata", result["metadata"]
+        
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        fastjson.stream_write_file(output_file, fastjson.iter_dumps_items(items()))
+        
+        return result
+    
+    def _iter_sheet_loads(
+        self,
+        sheets: Iterable[Tuple[str, List[Dict[str, Any]]]]
+    ) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Convert sheets one at a time, skipping unknown sheet names.
+        
+        Args:
+            sheets: (sheet name, list of records) pairs
+            
+        Yields:
+            (facility code, standardized loads) per known sheet
+        """
+        for sheet_name, records in sheets:
             facility_code = self.sheet_to_facility.get(sheet_name)
             
             if not facility_code:
                 # Try to match partial names
-                for known_sheet, code in self.sheet_to_facility.items():
-                    if known_sheet in sheet_name:
-                        facility_code = code
-                        break
+                match = self._sheet_re.search(sheet_name)
+                if match:
+                    facility_code = self.sheet_to_facility[match.group(0)]
             
             if not facility_code:
                 print(f"Warning: Unknown sheet name: {sheet_name}")
                 continue
             
-            facility_loads = self._convert_facility_records(records, facility_code, sheet_name)
-            all_loads.extend(facility_loads)
+            yield facility_code, self._convert_facility_records(records, facility_code, sheet_name)
+    
+    def _load_statistics(
+        self,
+        load_facilities: List[str],
+        tonnages: List[float],
+        facility_codes: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Aggregate load statistics, grouping by facility in pandas.
+        
+        Args:
+            load_facilities: Facility code of each load
+            tonnages: Tonnage of each load in kg
+            facility_codes: Facilities of the converted sheets, in sheet order
             
-            # Update statistics
-            facility_tonnage = sum(load.get("tonnage_kg", 0) for load in facility_loads)
-            statistics["by_facility"][facility_code] = {
-                "facility_name": self.facilities.get(facility_code, {}).get("name_en", "Unknown"),
-                "load_count": len(facility_loads),
-                "total_tonnage_kg": facility_tonnage
-            }
-            statistics["total_tonnage_kg"] += facility_tonnage
+        Returns:
+            Statistics dictionary
+        """
+        statistics = {
+            "total_loads": len(load_facilities),
+            "by_facility": {},
+            "total_tonnage_kg": 0
+        }
+        if not facility_codes:
+            return statistics
         
-        statistics["total_loads"] = len(all_loads)
+        frame = pd.DataFrame({
+            "facility_code": pd.Series(load_facilities, dtype=object),
+            "tonnage_kg": np.asarray(tonnages, dtype=np.float64)
+        })
+        # Reindexed so a facility whose sheet had no loads still reports zeros
+        by_facility = (
+            frame.groupby("facility_code", sort=False)["tonnage_kg"]
+            .agg(["size", "sum"])
+            .reindex(facility_codes, fill_value=0)
+        )
         
-        return {
-            "loads": all_loads,
-            "statistics": statistics,
-            "metadata": {
-                "source": "bunker_transport",
-                "transport_cost_per_ton_rial": 3200000,
-                "transport_cost_per_ton_toman": 320000
+        statistics["by_facility"] = {
+            facility_code: {
+                "facility_name": self._facility_name_en.get(facility_code, "Unknown"),
+                "load_count": int(count),
+                "total_tonnage_kg": float(tonnage)
             }
+            for facility_code, count, tonnage in by_facility.itertuples()
         }
+        statistics["total_tonnage_kg"] = float(frame["tonnage_kg"].sum())
+        
+        return statistics
     
     def _convert_facility_records(
         self,
@@ -99,55 +220,63 @@ class BunkerConverter(BaseConverter):
         Returns:
             List of standardized load records
         """
-        loads = []
+        # Drop summary and null rows, fixing column name typos on the rest
+        normalize_column_names = self._normalize_column_names
+        rows = [
+            normalize_column_names(record)
+            for record in self.filter_data_rows(records)
+        ]
+        if not rows:
+            return []
         
-        for record in records:
-            # Skip summary and null rows
-            if self.is_summary_row(record) or self.is_null_row(record):
-                continue
-            
-            # Fix column name typos before processing
-            normalized_record = self._normalize_column_names(record)
-            
-            # Extract and clean fields
-            row_number = normalized_record.get("row_number") or normalized_record.get("ردیف")
-            date_raw = normalized_record.get("date") or normalized_record.get("تاریخ")
-            tonnage_raw = normalized_record.get("tonnage_kg") or normalized_record.get("تناژ") or normalized_record.get("tonnage")
-            cumulative_raw = normalized_record.get("cumulative_tonnage") or normalized_record.get("جمع تناژ")
-            driver_raw = normalized_record.get("driver") or normalized_record.get("راننده")
-            
-            # Clean and process
-            date = self.normalize_date(str(date_raw)) if date_raw else ""
-            tonnage_kg = float(self.clean_persian_number(tonnage_raw)) if tonnage_raw else 0
-            cumulative_tonnage = float(self.clean_persian_number(cumulative_raw)) if cumulative_raw else 0
-            
-            driver_info = self.canonicalize_driver_name(str(driver_raw)) if driver_raw else {
+        # Extract raw columns
+        row_numbers = [r.get("row_number") or r.get("ردیف") for r in rows]
+        dates_raw = [r.get("date") or r.get("تاریخ") for r in rows]
+        tonnage_raw = [r.get("tonnage_kg") or r.get("تناژ") or r.get("tonnage") for r in rows]
+        cumulative_raw = [r.get("cumulative_tonnage") or r.get("جمع تناژ") for r in rows]
+        drivers_raw = [r.get("driver") or r.get("راننده") for r in rows]
+        
+        # Clean and process whole columns
+        dates = self.normalize_date_column(dates_raw)
+        tonnages = self.parse_number_column(tonnage_raw)
+        cumulative_tonnages = self.parse_number_column(cumulative_raw)
+        
+        canonicalize = self.canonicalize_driver_name
+        driver_infos = [
+            canonicalize(str(d)) if d else {
                 "original": "",
                 "canonical": "",
                 "is_known": False,
                 "status": "pending_review"
             }
-            
-            # Calculate transport cost
-            transport_cost_rial = self.calculate_cost(tonnage_kg, 3200000)
-            
-            load = {
+            for d in drivers_raw
+        ]
+        
+        # Calculate transport cost (vectorized over the sheet)
+        cost_rial = self.calculate_cost_column(tonnages, TRANSPORT_COST_PER_TON_RIAL)
+        cost_toman = cost_rial / 10
+        
+        facility_name = self._facility_name_en.get(facility_code, "Unknown")
+        facility_name_fa = self._facility_name_fa.get(facility_code, "")
+        
+        return [
+            {
                 "row_number": row_number,
                 "date": date,
                 "facility_code": facility_code,
-                "facility_name": self.facilities.get(facility_code, {}).get("name_en", "Unknown"),
-                "facility_name_fa": self.facilities.get(facility_code, {}).get("name_fa", ""),
+                "facility_name": facility_name,
+                "facility_name_fa": facility_name_fa,
                 "sheet_name": sheet_name,
                 "tonnage_kg": tonnage_kg,
                 "cumulative_tonnage_kg": cumulative_tonnage,
                 "driver_info": driver_info,
-                "transport_cost_rial": transport_cost_rial,
-                "transport_cost_toman": transport_cost_rial / 10
+                "transport_cost_rial": rial,
+                "transport_cost_toman": toman
             }
-            
-            loads.append(load)
-        
-        return loads
+            for (row_number, date, tonnage_kg, cumulative_tonnage, driver_info, rial, toman)
+            in zip(row_numbers, dates, tonnages, cumulative_tonnages, driver_infos,
+                   cost_rial.tolist(), cost_toman.tolist())
+        ]
     
     @staticmethod
     def _normalize_column_names(record: Dict[str, Any]) -> Dict[str, Any]:
@@ -177,21 +306,14 @@ class BunkerConverter(BaseConverter):
 
 def main():
     """Example usage."""
-    import json
-    
     converter = BunkerConverter()
     
-    # Example: Load from JSON file
+    # Example: Stream from JSON file one sheet at a time
     input_file = "data/samples/data_for_llm_enhanced.json"
     if Path(input_file).exists():
-        with open(input_file, 'r', encoding='utf-8') as f:
-            input_data = json.load(f)
-        
-        result = converter.convert(input_data)
-        
-        # Write output
         output_file = "data/processed/bunker_loads_standardized.json"
-        converter.write_json(result, output_file)
+        result = converter.stream_to_file(fastjson.iter_load_items(input_file), output_file)
+        
         print(f"Converted {result['statistics']['total_loads']} bunker loads")
         print(f"Output written to: {output_file}")
 
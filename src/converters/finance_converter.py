@@ -2,12 +2,10 @@
 Finance converter - handles financial records and driver payment tracking.
 """
 
-from typing import Any, Dict, List, Optional
-from pathlib import Path
-import sys
+from typing import Any, Dict, List
 
-# Add parent directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent.parent))
+import numpy as np
+import pandas as pd
 
 from src.core.base_converter import BaseConverter
 
@@ -32,90 +30,113 @@ class FinanceConverter(BaseConverter):
         Returns:
             Standardized payment data
         """
-        payments = []
-        driver_balances = {}
+        is_null_row = self.is_null_row
+        rows = [record for record in payment_records if not is_null_row(record)]
         
-        for record in payment_records:
-            if self.is_null_row(record):
-                continue
-            
-            payment = self._convert_payment_record(record)
-            if payment:
-                payments.append(payment)
-                
-                # Update driver balance
-                driver_canonical = payment.get("driver_info", {}).get("canonical")
-                if driver_canonical:
-                    if driver_canonical not in driver_balances:
-                        driver_balances[driver_canonical] = {
-                            "total_owed": 0,
-                            "total_paid": 0,
-                            "balance": 0
-                        }
-                    
-                    balance = driver_balances[driver_canonical]
-                    amount = payment.get("amount_rial", 0)
-                    
-                    if payment.get("type") == "owed":
-                        balance["total_owed"] += amount
-                    elif payment.get("type") == "paid":
-                        balance["total_paid"] += amount
-                    
-                    balance["balance"] = balance["total_owed"] - balance["total_paid"]
+        payments = self._convert_payment_rows(rows)
         
         return {
             "payments": payments,
-            "driver_balances": driver_balances,
-            "statistics": {
-                "total_payments": len(payments),
-                "total_owed_rial": sum(p.get("amount_rial", 0) for p in payments if p.get("type") == "owed"),
-                "total_paid_rial": sum(p.get("amount_rial", 0) for p in payments if p.get("type") == "paid")
-            }
+            **self._payment_balances(payments)
         }
     
-    def _convert_payment_record(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    def _payment_balances(payments: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        Convert a single payment record.
+        Sum owed and paid amounts per driver and overall with pandas.
         
         Args:
-            record: Raw payment record
+            payments: Standardized payment records
             
         Returns:
-            Standardized payment dictionary
+            {"driver_balances": ..., "statistics": ...}
         """
-        date_raw = record.get("date") or record.get("تاریخ")
-        driver_raw = record.get("driver") or record.get("راننده")
-        amount_raw = record.get("amount") or record.get("مبلغ")
-        payment_type_raw = record.get("type") or record.get("نوع")
-        notes_raw = record.get("notes") or record.get("توضیحات")
-        
-        date = self.normalize_date(str(date_raw)) if date_raw else ""
-        
-        driver_info = self.canonicalize_driver_name(str(driver_raw)) if driver_raw else {
-            "original": "",
-            "canonical": "",
-            "is_known": False,
-            "status": "pending_review"
+        driver_balances = {}
+        statistics = {
+            "total_payments": len(payments),
+            "total_owed_rial": 0,
+            "total_paid_rial": 0
         }
+        if not payments:
+            return {"driver_balances": driver_balances, "statistics": statistics}
         
-        amount_rial = 0
-        if amount_raw:
-            try:
-                amount_rial = float(self.clean_persian_number(amount_raw))
-            except (ValueError, TypeError):
-                amount_rial = 0
+        drivers = [p["driver_info"]["canonical"] or None for p in payments]
+        frame = pd.DataFrame({
+            "driver": pd.Series(drivers, dtype=object),
+            "type": pd.Series([p["type"] for p in payments], dtype=object),
+            "amount_rial": np.asarray([p["amount_rial"] for p in payments], dtype=np.float64)
+        })
         
-        payment_type = str(payment_type_raw).lower() if payment_type_raw else "owed"
-        notes = str(notes_raw).strip() if notes_raw else ""
+        totals = frame.groupby("type", sort=False)["amount_rial"].sum()
+        statistics["total_owed_rial"] = float(totals.get("owed", 0))
+        statistics["total_paid_rial"] = float(totals.get("paid", 0))
         
-        return {
-            "date": date,
-            "driver_info": driver_info,
-            "amount_rial": amount_rial,
-            "amount_toman": amount_rial / 10,
-            "type": payment_type,
-            "notes": notes
-        }
+        # Payments without a known driver only count towards the totals
+        known = [driver for driver in dict.fromkeys(drivers) if driver]
+        if known:
+            pivot = frame.pivot_table(
+                index="driver", columns="type", values="amount_rial",
+                aggfunc="sum", fill_value=0
+            ).reindex(known, fill_value=0)
+            owed = pivot["owed"] if "owed" in pivot else pd.Series(0.0, index=pivot.index)
+            paid = pivot["paid"] if "paid" in pivot else pd.Series(0.0, index=pivot.index)
+            
+            driver_balances = {
+                driver: {
+                    "total_owed": float(total_owed),
+                    "total_paid": float(total_paid),
+                    "balance": float(total_owed - total_paid)
+                }
+                for driver, total_owed, total_paid in zip(known, owed.tolist(), paid.tolist())
+            }
+        
+        return {"driver_balances": driver_balances, "statistics": statistics}
+    
+    def _convert_payment_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Convert payment records column by column.
+        
+        Args:
+            rows: Raw payment records (null rows already dropped)
+            
+        Returns:
+            Standardized payment dictionaries
+        """
+        if not rows:
+            return []
+        
+        # Extract raw columns (support both English and Persian column names)
+        dates = self.normalize_date_column([r.get("date") or r.get("تاریخ") for r in rows])
+        drivers_raw = [r.get("driver") or r.get("راننده") for r in rows]
+        amounts = self.parse_number_column([r.get("amount") or r.get("مبلغ") for r in rows])
+        types_raw = [r.get("type") or r.get("نوع") for r in rows]
+        notes_raw = [r.get("notes") or r.get("توضیحات") for r in rows]
+        
+        canonicalize = self.canonicalize_driver_name
+        driver_infos = [
+            canonicalize(str(d)) if d else {
+                "original": "",
+                "canonical": "",
+                "is_known": False,
+                "status": "pending_review"
+            }
+            for d in drivers_raw
+        ]
+        payment_types = [str(t).lower() if t else "owed" for t in types_raw]
+        notes = [str(n).strip() if n else "" for n in notes_raw]
+        
+        return [
+            {
+                "date": date,
+                "driver_info": driver_info,
+                "amount_rial": amount_rial,
+                "amount_toman": amount_rial / 10,
+                "type": payment_type,
+                "notes": note
+            }
+            for date, driver_info, amount_rial, payment_type, note
+            in zip(dates, driver_infos, amounts, payment_types, notes)
+        ]
     
     def aggregate_transport_costs(
         self,
@@ -133,38 +154,10 @@ class FinanceConverter(BaseConverter):
             Aggregated cost data
         """
         # Mine to grinding costs
-        mine_to_grinding = {
-            "total_cost_rial": sum(s.get("total_cost_rial", 0) for s in shipments),
-            "by_facility": {}
-        }
-        
-        for shipment in shipments:
-            facility = shipment.get("facility_code")
-            if facility:
-                if facility not in mine_to_grinding["by_facility"]:
-                    mine_to_grinding["by_facility"][facility] = {
-                        "shipment_count": 0,
-                        "total_cost_rial": 0
-                    }
-                mine_to_grinding["by_facility"][facility]["shipment_count"] += 1
-                mine_to_grinding["by_facility"][facility]["total_cost_rial"] += shipment.get("total_cost_rial", 0)
+        mine_to_grinding = self._facility_cost_summary(shipments, "total_cost_rial", "shipment_count")
         
         # Grinding to factory costs
-        grinding_to_factory = {
-            "total_cost_rial": sum(b.get("transport_cost_rial", 0) for b in bunker_loads),
-            "by_facility": {}
-        }
-        
-        for load in bunker_loads:
-            facility = load.get("facility_code")
-            if facility:
-                if facility not in grinding_to_factory["by_facility"]:
-                    grinding_to_factory["by_facility"][facility] = {
-                        "load_count": 0,
-                        "total_cost_rial": 0
-                    }
-                grinding_to_factory["by_facility"][facility]["load_count"] += 1
-                grinding_to_factory["by_facility"][facility]["total_cost_rial"] += load.get("transport_cost_rial", 0)
+        grinding_to_factory = self._facility_cost_summary(bunker_loads, "transport_cost_rial", "load_count")
         
         total_transport_cost = mine_to_grinding["total_cost_rial"] + grinding_to_factory["total_cost_rial"]
         
@@ -174,6 +167,50 @@ class FinanceConverter(BaseConverter):
             "total_transport_cost_rial": total_transport_cost,
             "total_transport_cost_toman": total_transport_cost / 10
         }
+    
+    @staticmethod
+    def _facility_cost_summary(
+        records: List[Dict[str, Any]],
+        cost_field: str,
+        count_field: str
+    ) -> Dict[str, Any]:
+        """
+        Total a cost column and break it down by facility in one pandas group-by.
+        
+        Records without a facility code count towards the total only.
+        
+        Args:
+            records: Shipments or bunker loads
+            cost_field: Record field holding the cost in Rial
+            count_field: Name for the per-facility record count
+            
+        Returns:
+            {"total_cost_rial": ..., "by_facility": {code: {count_field, "total_cost_rial"}}}
+        """
+        summary = {
+            "total_cost_rial": 0,
+            "by_facility": {}
+        }
+        if not records:
+            return summary
+        
+        frame = pd.DataFrame({
+            # Empty codes become None so the group-by drops them
+            "facility_code": pd.Series([r.get("facility_code") or None for r in records], dtype=object),
+            "cost": np.asarray([r.get(cost_field, 0) for r in records], dtype=np.float64)
+        })
+        by_facility = frame.groupby("facility_code", sort=False)["cost"].agg(["size", "sum"])
+        
+        summary["total_cost_rial"] = float(frame["cost"].sum())
+        summary["by_facility"] = {
+            facility_code: {
+                count_field: int(count),
+                "total_cost_rial": float(cost)
+            }
+            for facility_code, count, cost in by_facility.itertuples()
+        }
+        
+        return summary
 
 
 def main():
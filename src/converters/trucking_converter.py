@@ -3,15 +3,24 @@ Trucking converter - converts mine to grinding facility truck shipment data.
 Handles driver name canonicalization and cost calculation fixes.
 """
 
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from pathlib import Path
-import sys
 
-# Add parent directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent.parent))
+import numpy as np
+import pandas as pd
 
+from src.core import fastjson
 from src.core.base_converter import BaseConverter
 
+# Records converted per batch when streaming
+STREAM_CHUNK_SIZE = 10_000
+
+# Metadata attached to every converted trucking document
+TRUCKING_METADATA = {
+    "source": "mine_to_grinding_transport"
+}
+
 
 class TruckingConverter(BaseConverter):
     """Converts truck shipment data to standardized format."""
@@ -19,6 +28,13 @@ class TruckingConverter(BaseConverter):
     def __init__(self, config_dir: str = "config"):
         """Initialize trucking converter."""
         super().__init__(config_dir)
+        
+        # (facility code, truck destination name) pairs, in config order
+        self._dest_patterns = [
+            (code, info["truck_dest"])
+            for code, info in self.facilities.items()
+            if info.get("truck_dest")
+        ]
     
     def convert(self, input_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -30,134 +46,273 @@ class TruckingConverter(BaseConverter):
         Returns:
             Standardized trucking data with metadata
         """
-        shipments = []
-        statistics = {
-            "total_shipments": 0,
-            "by_destination": {},
-            "total_tonnage_kg": 0,
-            "total_cost_rial": 0,
-            "unique_trucks": set(),
-            "unique_drivers": set()
+        shipments = self._convert_rows(input_data)
+        
+        return {
+            "shipments": shipments,
+            "statistics": self._shipment_statistics(*self._statistics_columns(shipments)),
+            "metadata": dict(TRUCKING_METADATA)
         }
+    
+    def convert_iter(
+        self,
+        records: Iterable[Dict[str, Any]],
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield standardized shipments, converting records in batches.
         
-        for record in input_data:
-            # Skip summary and null rows
-            if self.is_summary_row(record) or self.is_null_row(record):
-                continue
+        Args:
+            records: Raw shipment records, e.g. from fastjson.iter_load_array()
+            chunk_size: Records converted per batch
             
-            shipment = self._convert_shipment_record(record)
-            if shipment:
-                shipments.append(shipment)
-                
-                # Update statistics
-                destination = shipment.get("destination", "Unknown")
-                if destination not in statistics["by_destination"]:
-                    statistics["by_destination"][destination] = {
-                        "shipment_count": 0,
-                        "total_tonnage_kg": 0,
-                        "total_cost_rial": 0
-                    }
-                
-                dest_stats = statistics["by_destination"][destination]
-                dest_stats["shipment_count"] += 1
-                dest_stats["total_tonnage_kg"] += shipment.get("tonnage_kg", 0)
-                dest_stats["total_cost_rial"] += shipment.get("total_cost_rial", 0)
-                
-                statistics["total_tonnage_kg"] += shipment.get("tonnage_kg", 0)
-                statistics["total_cost_rial"] += shipment.get("total_cost_rial", 0)
-                
-                if shipment.get("truck_number"):
-                    statistics["unique_trucks"].add(shipment["truck_number"])
-                
-                driver_canonical = shipment.get("driver_info", {}).get("canonical")
-                if driver_canonical:
-                    statistics["unique_drivers"].add(driver_canonical)
-        
-        statistics["total_shipments"] = len(shipments)
-        statistics["unique_trucks"] = list(statistics["unique_trucks"])
-        statistics["unique_drivers"] = list(statistics["unique_drivers"])
+        Yields:
+            Standardized shipment records
+        """
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            yield from self._convert_rows(chunk)
+    
+    def stream_to_file(
+        self,
+        records: Iterable[Dict[str, Any]],
+        output_path: str,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Convert truck shipment data writing each batch as it is converted.
         
-        return {
-            "shipments": shipments,
-            "statistics": statistics,
-            "metadata": {
-                "source": "mine_to_grinding_transport"
+        Only one batch of records and the statistics columns are held in
+        memory, so a streamed input (fastjson.iter_load_array()) is never
+        loaded whole.
+        
+        Args:
+            records: Raw shipment records
+            output_path: Output file path
+            chunk_size: Records converted per batch
+            
+        Returns:
+            Converted data without the shipments ("statistics" and "metadata")
+        """
+        columns = ([], [], [], [], [])
+        result = {}
+        
+        def tracked_shipments():
+            statistics_row = self._statistics_row
+            for shipment in self.convert_iter(records, chunk_size):
+                for column, value in zip(columns, statistics_row(shipment)):
+                    column.append(value)
+                yield shipment
+        
+        def items():
+            yield "shipments", tracked_shipments()
+            # Only pulled once every shipment has been written
+            result["statistics"] = self._shipment_statistics(*columns)
+            yield "statistics", result["statistics"]
+            result["metadata"] = dict(TRUCKING_METADATA)
+            yield "metadata", result["metadata"]
+        
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        fastjson.stream_write_file(output_file, fastjson.iter_dumps_items(items()))
+        
+        return result
+    
+    def _convert_rows(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Convert a batch of raw shipment records.
+        
+        Args:
+            records: Raw shipment records
+            
+        Returns:
+            Standardized shipment records
+        """
+        # Skip summary and null rows
+        rows = self.filter_data_rows(records)
+        if not rows:
+            return []
+        
+        # Extract raw columns (support both English and Persian column names)
+        row_numbers = [r.get("row_number") or r.get("ردیف") for r in rows]
+        trucks_raw = [r.get("truck_number") or r.get("شماره کامیون") for r in rows]
+        receipts_raw = [r.get("receipt_number") or r.get("شماره رسید") for r in rows]
+        drivers_raw = [r.get("driver_name") or r.get("نام راننده") for r in rows]
+        notes_raw = [r.get("notes") or r.get("توضیحات") for r in rows]
+        
+        # Clean the date, destination and numeric columns in one batch each
+        dates = self.normalize_date_column(
+            [r.get("date") or r.get("تاریخ") for r in rows]
+        )
+        destinations = [
+            str(d).strip() if d else ""
+            for d in (r.get("destination") or r.get("مقصد") for r in rows)
+        ]
+        facility_codes = self._destination_facility_column(destinations)
+        tonnages = self.parse_number_column(
+            [r.get("tonnage_kg") or r.get("tonnage") or r.get("تناژ") for r in rows]
+        )
+        costs_per_ton = self.parse_number_column(
+            [r.get("cost_per_ton") or r.get("هزینه به ازای هر تن") for r in rows]
+        )
+        
+        # Clean the text columns
+        clean_truck = self.clean_truck_number
+        truck_numbers = [clean_truck(t) if t else "" for t in trucks_raw]
+        receipt_numbers = [
+            receipt if r and (receipt := str(r)).strip() != "" else None for r in receipts_raw
+        ]
+        notes = [str(n).strip() if n else "" for n in notes_raw]
+        
+        canonicalize = self.canonicalize_driver_name
+        driver_infos = [
+            canonicalize(str(d)) if d else {
+                "original": "",
+                "canonical": "",
+                "is_known": False,
+                "status": "pending_review"
             }
-        }
+            for d in drivers_raw
+        ]
+        
+        # Calculate total costs (FIXED: cost_per_ton is per TON, not per kg)
+        total_costs = self.calculate_cost_column(tonnages, costs_per_ton)
+        total_costs_toman = total_costs / 10
+        
+        # Records are only materialized here, one dict per shipment
+        return [
+            {
+                "row_number": row_number,
+                "date": date,
+                "truck_number": truck_number,
+                "receipt_number": receipt_number,
+                "tonnage_kg": tonnage_kg,
+                "destination": destination,
+                "facility_code": facility_code,
+                "cost_per_ton_rial": cost_per_ton,
+                "total_cost_rial": total_cost_rial,
+                "total_cost_toman": total_cost_toman,
+                "driver_info": driver_info,
+                "notes": note
+            }
+            for (row_number, date, truck_number, receipt_number, tonnage_kg, destination,
+                 facility_code, cost_per_ton, total_cost_rial, total_cost_toman, driver_info, note)
+            in zip(row_numbers, dates, truck_numbers, receipt_numbers, tonnages, destinations,
+                   facility_codes, costs_per_ton, total_costs.tolist(), total_costs_toman.tolist(),
+                   driver_infos, notes)
+        ]
     
-    def _convert_shipment_record(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    def _statistics_row(shipment: Dict[str, Any]) -> tuple:
         """
-        Convert a single shipment record.
+        Pick the fields statistics are computed from.
         
         Args:
-            record: Raw shipment record
+            shipment: Standardized shipment record
             
         Returns:
-            Standardized shipment dictionary or None
-        """
-        # Extract fields (support both English and Persian column names)
-        date_raw = record.get("date") or record.get("تاریخ")
-        truck_raw = record.get("truck_number") or record.get("شماره کامیون")
-        receipt_raw = record.get("receipt_number") or record.get("شماره رسید")
-        tonnage_raw = record.get("tonnage_kg") or record.get("tonnage") or record.get("تناژ")
-        destination_raw = record.get("destination") or record.get("مقصد")
-        cost_per_ton_raw = record.get("cost_per_ton") or record.get("هزینه به ازای هر تن")
-        driver_raw = record.get("driver_name") or record.get("نام راننده")
-        notes_raw = record.get("notes") or record.get("توضیحات")
-        row_num = record.get("row_number") or record.get("ردیف")
-        
-        # Clean and process
-        date = self.normalize_date(str(date_raw)) if date_raw else ""
-        truck_number = self.clean_truck_number(truck_raw) if truck_raw else ""
-        receipt_number = str(receipt_raw) if receipt_raw and str(receipt_raw).strip() != "" else None
-        
-        tonnage_kg = 0
-        if tonnage_raw:
-            try:
-                tonnage_kg = float(self.clean_persian_number(tonnage_raw))
-            except (ValueError, TypeError):
-                tonnage_kg = 0
-        
-        cost_per_ton = 0
-        if cost_per_ton_raw:
-            try:
-                cost_per_ton = float(self.clean_persian_number(cost_per_ton_raw))
-            except (ValueError, TypeError):
-                cost_per_ton = 0
-        
-        destination = str(destination_raw).strip() if destination_raw else ""
-        notes = str(notes_raw).strip() if notes_raw else ""
-        
-        # Canonicalize driver name
-        driver_info = self.canonicalize_driver_name(str(driver_raw)) if driver_raw else {
-            "original": "",
-            "canonical": "",
-            "is_known": False,
-            "status": "pending_review"
+            (truck, driver, destination, tonnage_kg, total_cost_rial)
+        """
+        # _convert_rows() always sets these, so index directly
+        return (
+            shipment["truck_number"],
+            shipment["driver_info"]["canonical"],
+            shipment["destination"],
+            shipment["tonnage_kg"],
+            shipment["total_cost_rial"]
+        )
+    
+    @classmethod
+    def _statistics_columns(cls, shipments: List[Dict[str, Any]]) -> tuple:
+        """
+        Split shipments into the columns _shipment_statistics() takes.
+        
+        Args:
+            shipments: Standardized shipment records
+            
+        Returns:
+            Tuple of truck, driver, destination, tonnage and cost lists
+        """
+        if not shipments:
+            return [], [], [], [], []
+        return tuple(map(list, zip(*map(cls._statistics_row, shipments))))
+    
+    @staticmethod
+    def _shipment_statistics(
+        trucks: List[str],
+        drivers: List[str],
+        destinations: List[str],
+        tonnages: List[float],
+        costs: List[float]
+    ) -> Dict[str, Any]:
+        """
+        Aggregate shipment statistics, grouping by destination in pandas.
+        
+        Args:
+            trucks: Truck number of each shipment
+            drivers: Canonical driver name of each shipment
+            destinations: Destination of each shipment
+            tonnages: Tonnage of each shipment in kg
+            costs: Total cost of each shipment in Rial
+            
+        Returns:
+            Statistics dictionary
+        """
+        statistics = {
+            "total_shipments": len(destinations),
+            "by_destination": {},
+            "total_tonnage_kg": 0,
+            "total_cost_rial": 0,
+            # dict.fromkeys dedups in one C-level hash pass, keeping first-seen order
+            "unique_trucks": [truck for truck in dict.fromkeys(trucks) if truck],
+            "unique_drivers": [driver for driver in dict.fromkeys(drivers) if driver]
         }
+        if not destinations:
+            return statistics
+        
+        frame = pd.DataFrame({
+            "destination": pd.Series(destinations, dtype=object),
+            "tonnage_kg": np.asarray(tonnages, dtype=np.float64),
+            "total_cost_rial": np.asarray(costs, dtype=np.float64)
+        })
+        by_destination = frame.groupby("destination", sort=False).agg(
+            shipment_count=("tonnage_kg", "size"),
+            total_tonnage_kg=("tonnage_kg", "sum"),
+            total_cost_rial=("total_cost_rial", "sum")
+        )
         
-        # Calculate total cost (FIXED: cost_per_ton is per TON, not per kg)
-        total_cost_rial = self.calculate_cost(tonnage_kg, cost_per_ton)
-        
-        # Map destination to facility
-        facility_code = self._destination_to_facility(destination)
-        
-        shipment = {
-            "row_number": row_num,
-            "date": date,
-            "truck_number": truck_number,
-            "receipt_number": receipt_number,
-            "tonnage_kg": tonnage_kg,
-            "destination": destination,
-            "facility_code": facility_code,
-            "cost_per_ton_rial": cost_per_ton,
-            "total_cost_rial": total_cost_rial,
-            "total_cost_toman": total_cost_rial / 10,
-            "driver_info": driver_info,
-            "notes": notes
+        statistics["by_destination"] = {
+            destination: {
+                "shipment_count": int(count),
+                "total_tonnage_kg": float(tonnage),
+                "total_cost_rial": float(cost)
+            }
+            for destination, count, tonnage, cost in by_destination.itertuples()
         }
+        statistics["total_tonnage_kg"] = float(frame["tonnage_kg"].sum())
+        statistics["total_cost_rial"] = float(frame["total_cost_rial"].sum())
+        
+        return statistics
+    
+    def _destination_facility_column(self, destinations: List[str]) -> List[Optional[str]]:
+        """
+        Map a column of destinations to facility codes.
         
-        return shipment
+        Each distinct destination is matched once and the results are
+        mapped back, since a batch repeats a handful of destinations.
+        
+        Args:
+            destinations: Cleaned destination names
+            
+        Returns:
+            Facility codes (A/B/C) or None, one per destination
+        """
+        to_facility = self._destination_to_facility
+        facilities = {destination: to_facility(destination) for destination in set(destinations)}
+        return [facilities[destination] for destination in destinations]
     
     def _destination_to_facility(self, destination: str) -> Optional[str]:
         """
@@ -169,9 +324,8 @@ class TruckingConverter(BaseConverter):
         Returns:
             Facility code (A/B/C) or None
         """
-        for code, facility_info in self.facilities.items():
-            truck_dest = facility_info.get("truck_dest", "")
-            if truck_dest and truck_dest in destination:
+        for code, truck_dest in self._dest_patterns:
+            if truck_dest in destination:
                 return code
         
         return None
@@ -179,21 +333,14 @@ class TruckingConverter(BaseConverter):
 
 def main():
     """Example usage."""
-    import json
-    
     converter = TruckingConverter()
     
-    # Example: Load from JSON file
+    # Example: Stream from JSON file in batches of records
     input_file = "data/samples/trucking_data_for_llm.json"
     if Path(input_file).exists():
-        with open(input_file, 'r', encoding='utf-8') as f:
-            input_data = json.load(f)
-        
-        result = converter.convert(input_data)
-        
-        # Write output
         output_file = "data/processed/truck_shipments_standardized.json"
-        converter.write_json(result, output_file)
+        result = converter.stream_to_file(fastjson.iter_load_array(input_file), output_file)
+        
         print(f"Converted {result['statistics']['total_shipments']} truck shipments")
         print(f"Total tonnage: {result['statistics']['total_tonnage_kg']:,.0f} kg")
         print(f"Total cost: {result['statistics']['total_cost_rial']:,.0f} Rial")
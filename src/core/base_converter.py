@@ -3,11 +3,40 @@ Base converter with shared utilities for data processing.
 Handles Persian text, date normalization, and common data cleaning tasks.
 """
 
-import json
-import re
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
+import numpy as np
+
+from src.core import fastjson
+
+# Number cleanup in one pass: drop thousands commas, "/" as decimal point,
+# Persian and Arabic-Indic digits to ASCII
+PERSIAN_NUMBER_TABLE = str.maketrans({
+    ",": "", "/": ".",
+    **{persian: str(digit) for digit, persian in enumerate("۰۱۲۳۴۵۶۷۸۹")},
+    **{arabic: str(digit) for digit, arabic in enumerate("٠١٢٣٤٥٦٧٨٩")}
+})
+
+
+@lru_cache(maxsize=32)
+def _load_json_cached(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """
+    Parse a JSON config file once per (path, modification time).
+    
+    The returned dict is shared between converters and must be treated as
+    read-only.
+    
+    Args:
+        path: Config file path
+        mtime_ns: File modification time, so an edited file is re-read
+        
+    Returns:
+        Parsed configuration
+    """
+    return fastjson.load_file(path)
+
 
 class BaseConverter:
     """Base class for all data converters with shared utilities."""
@@ -18,19 +47,51 @@ class BaseConverter:
         self.facilities = self._load_json_config("facilities.json")
         self.drivers = self._load_json_config("drivers.json")
         self.trucks = self._load_json_config("trucks.json")
+        self._alias_index = self._build_alias_index(self.drivers)
+        
+        # Flat facility name lookups (code -> name)
+        self._facility_name_en = {
+            code: info.get("name_en", "Unknown") for code, info in self.facilities.items()
+        }
+        self._facility_name_fa = {
+            code: info.get("name_fa", "") for code, info in self.facilities.items()
+        }
     
     def _load_json_config(self, filename: str) -> Dict[str, Any]:
-        """Load JSON configuration file with UTF-8 encoding."""
+        """Load JSON configuration file, shared across converter instances."""
         config_path = self.config_dir / filename
-        if config_path.exists():
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+        try:
+            mtime_ns = config_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        return _load_json_cached(str(config_path.resolve()), mtime_ns)
+    
+    @staticmethod
+    def _build_alias_index(drivers: Dict[str, Any]) -> Dict[str, Tuple[str, str]]:
+        """
+        Map every driver alias and canonical name to (canonical name, status).
+        
+        Args:
+            drivers: Driver registry (drivers.json)
+            
+        Returns:
+            Alias index used by canonicalize_driver_name()
+        """
+        alias_index = {}
+        # Reversed so the first registry entry wins when names overlap,
+        # matching the registry's original scan order
+        for canonical_name, driver_info in reversed(list(drivers.get("canonical_drivers", {}).items())):
+            entry = (canonical_name, driver_info.get("status", "active"))
+            for alias in driver_info.get("aliases", []):
+                alias_index[alias] = entry
+            alias_index[canonical_name] = entry
+        return alias_index
     
     @staticmethod
     def clean_persian_number(value: Any) -> str:
         """
-        Clean Persian numbers - remove commas, convert / to . for decimals.
+        Clean Persian numbers - remove commas, convert / to . for decimals
+        and Persian/Arabic-Indic digits to ASCII.
         
         Args:
             value: Number as string, float, or int
@@ -41,16 +102,57 @@ class BaseConverter:
         if value is None or value == "":
             return ""
         
-        # Convert to string
         value_str = str(value)
         
-        # Remove commas (thousands separator)
-        value_str = value_str.replace(',', '')
+        # ASCII input (the common case): two C-level replaces beat translate()
+        if value_str.isascii():
+            return value_str.replace(',', '').replace('/', '.').strip()
+        
+        return value_str.translate(PERSIAN_NUMBER_TABLE).strip()
+    
+    @classmethod
+    def parse_number_column(cls, values: List[Any]) -> List[Any]:
+        """
+        Parse a column of raw numbers in one batch.
+        
+        Values already stored as int/float skip the string cleanup; strings
+        go through clean_persian_number() once per distinct string, since
+        rate and tonnage columns repeat a few values. Empty or unparseable
+        values become 0.
+        
+        Args:
+            values: Raw column values
+            
+        Returns:
+            List of floats (0 for empty or invalid values)
+        """
+        clean = cls.clean_persian_number
+        numeric = (int, float)
+        parsed = []
+        append = parsed.append
+        seen = {}
         
-        # Convert forward slash to decimal point
-        value_str = value_str.replace('/', '.')
+        for value in values:
+            if not value:
+                append(0)
+            elif type(value) in numeric:
+                append(float(value))
+            elif type(value) is str:
+                number = seen.get(value)
+                if number is None:
+                    try:
+                        number = float(clean(value))
+                    except ValueError:
+                        number = 0
+                    seen[value] = number
+                append(number)
+            else:
+                try:
+                    append(float(clean(value)))
+                except (ValueError, TypeError):
+                    append(0)
         
-        return value_str.strip()
+        return parsed
     
     @staticmethod
     def normalize_date(date_str: str) -> str:
@@ -76,6 +178,25 @@ class BaseConverter:
         year, month, day = parts
         return f"{year}/{month.zfill(2)}/{day.zfill(2)}"
     
+    @classmethod
+    def normalize_date_column(cls, values: List[Any]) -> List[str]:
+        """
+        Normalize a column of Jalali dates.
+        
+        A sheet repeats the same few dates many times, so each distinct date
+        string is normalized once and the results are mapped back.
+        
+        Args:
+            values: Raw column values
+            
+        Returns:
+            List of normalized date strings ("" for empty values)
+        """
+        dates = [str(value) if value else "" for value in values]
+        normalize = cls.normalize_date
+        normalized = {date: normalize(date) for date in set(dates)}
+        return [normalized[date] for date in dates]
+    
     @staticmethod
     def clean_truck_number(truck_num: Any) -> str:
         """
@@ -119,18 +240,15 @@ class BaseConverter:
         
         driver_name = driver_name.strip()
         
-        # Check if driver is in canonical list
-        canonical_drivers = self.drivers.get("canonical_drivers", {})
-        
-        for canonical_name, driver_info in canonical_drivers.items():
-            aliases = driver_info.get("aliases", [])
-            if driver_name in aliases or driver_name == canonical_name:
-                return {
-                    "original": driver_name,
-                    "canonical": canonical_name,
-                    "is_known": True,
-                    "status": driver_info.get("status", "active")
-                }
+        # Check if driver is in canonical list (single hash lookup)
+        known = self._alias_index.get(driver_name)
+        if known is not None:
+            return {
+                "original": driver_name,
+                "canonical": known[0],
+                "is_known": True,
+                "status": known[1]
+            }
         
         # Unknown driver
         return {
@@ -199,6 +317,46 @@ class BaseConverter:
                 return False
         return True
     
+    @staticmethod
+    def filter_data_rows(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop summary and null rows in one pass over each row's values.
+        
+        Equivalent to keeping records for which neither is_summary_row()
+        nor is_null_row() holds, without two separate scans per row.
+        
+        Args:
+            records: Raw records
+            
+        Returns:
+            Records that carry data
+        """
+        rows = []
+        append = rows.append
+        
+        for record in records:
+            if not isinstance(record, dict):
+                if record is not None:
+                    append(record)
+                continue
+            
+            has_data = False
+            for value in record.values():
+                if value is None:
+                    continue
+                if isinstance(value, str):
+                    if "جمع" in value:
+                        break
+                    if not has_data and value.strip():
+                        has_data = True
+                elif not has_data and str(value).strip() != "":
+                    has_data = True
+            else:
+                if has_data:
+                    append(record)
+        
+        return rows
+    
     def write_json(self, data: Any, output_path: str) -> None:
         """
         Write data to JSON file with UTF-8 encoding and proper formatting.
@@ -210,8 +368,31 @@ class BaseConverter:
         output_file = Path(output_path)
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        fastjson.dump_file(output_file, data)
+    
+    def convert_to_file(self, input_data: Any, output_path: str) -> Dict[str, Any]:
+        """
+        Convert input data and stream the result straight to a JSON file.
+        
+        The input is released before the output is written, and the output
+        is serialized record by record, so peak memory holds neither the
+        input alongside a fully rendered output document.
+        
+        Args:
+            input_data: Raw input accepted by convert()
+            output_path: Output file path
+            
+        Returns:
+            Converted data (as returned by convert())
+        """
+        result = self.convert(input_data)
+        del input_data
+        
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        fastjson.stream_dump_file(output_file, result)
+        
+        return result
     
     @staticmethod
     def calculate_cost(tonnage_kg: float, cost_per_ton: float) -> float:
@@ -231,3 +412,21 @@ class BaseConverter:
         
         tonnage_tons = tonnage_kg / 1000.0
         return tonnage_tons * cost_per_ton
+    
+    @staticmethod
+    def calculate_cost_column(tonnages_kg: List[float], costs_per_ton: Any) -> np.ndarray:
+        """
+        Calculate transport costs for a whole column at once.
+        
+        Same arithmetic as calculate_cost() (kg / 1000 * cost per ton),
+        evaluated as NumPy array operations.
+        
+        Args:
+            tonnages_kg: Weights in kilograms
+            costs_per_ton: Costs per ton in Rial (a column, or one rate for all)
+            
+        Returns:
+            Array of total costs in Rial
+        """
+        tonnage_tons = np.asarray(tonnages_kg, dtype=np.float64) / 1000.0
+        return tonnage_tons * np.asarray(costs_per_ton, dtype=np.float64)
@@ -0,0 +1,35 @@
+"""
+Console output helpers for the pipeline scripts.
+"""
+
+import atexit
+import sys
+
+STDOUT_BUFFER_SIZE = 64 * 1024
+
+
+def buffer_stdout(buffer_size: int = STDOUT_BUFFER_SIZE) -> None:
+    """
+    Replace sys.stdout with a block-buffered UTF-8 stream.
+    
+    Progress messages are then written out in large chunks (and once more
+    at exit) instead of one write per line when stdout is a TTY or a
+    docker-compose log pipe.
+    
+    Args:
+        buffer_size: Size of the output buffer in bytes
+    """
+    try:
+        fileno = sys.stdout.fileno()
+    except (AttributeError, OSError, ValueError):
+        # Captured or replaced stdout (e.g. under pytest) - leave it alone
+        return
+    
+    sys.stdout.flush()
+    sys.stdout = open(
+        fileno, 'w',
+        buffering=buffer_size,
+        encoding='utf-8',
+        closefd=False
+    )
+    atexit.register(sys.stdout.flush)
@@ -0,0 +1,292 @@
+"""
+Fast JSON helpers backed by orjson, with a stdlib json fallback.
+Handles UTF-8 Persian text natively in both directions.
+"""
+
+import json
+from pathlib import Path
+from types import GeneratorType
+from typing import Any, Iterable, Iterator, List, Tuple, Union
+
+STREAM_BUFFER_SIZE = 1 << 20
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse JSON from bytes or str.
+
+    Args:
+        data: UTF-8 encoded JSON document
+
+    Returns:
+        Parsed Python object
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize object to indented UTF-8 JSON bytes.
+
+    Args:
+        obj: Object to serialize
+
+    Returns:
+        UTF-8 encoded JSON (2-space indent, non-ASCII kept as-is)
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def dumps_line(obj: Any) -> bytes:
+    """
+    Serialize object to compact single-line UTF-8 JSON bytes.
+    
+    Args:
+        obj: Object to serialize
+        
+    Returns:
+        UTF-8 encoded JSON without a trailing newline
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def load_file(filepath: Union[str, Path]) -> Any:
+    """
+    Load a JSON file.
+
+    Args:
+        filepath: Path to JSON file
+
+    Returns:
+        Parsed Python object
+    """
+    with open(filepath, 'rb') as f:
+        return loads(f.read())
+
+
+def iter_load_items(filepath: Union[str, Path]) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream the (key, value) pairs of a top-level JSON object.
+    
+    With ijson, only one value (e.g. one sheet of records) is held in
+    memory at a time; otherwise the whole file is loaded.
+    
+    Args:
+        filepath: Path to JSON file
+        
+    Yields:
+        (key, parsed value) pairs in file order
+    """
+    if not IJSON_AVAILABLE:
+        yield from load_file(filepath).items()
+        return
+    with open(filepath, 'rb') as f:
+        yield from ijson.kvitems(f, '', use_float=True)
+
+
+def iter_load_array(filepath: Union[str, Path]) -> Iterator[Any]:
+    """
+    Stream the elements of a top-level JSON array.
+    
+    Args:
+        filepath: Path to JSON file
+        
+    Yields:
+        Parsed elements in file order
+    """
+    if not IJSON_AVAILABLE:
+        yield from load_file(filepath)
+        return
+    with open(filepath, 'rb') as f:
+        yield from ijson.items(f, 'item', use_float=True)
+
+
+def iter_load_prefix(filepath: Union[str, Path], prefix: str) -> Iterator[Any]:
+    """
+    Stream the values found under a dotted ijson prefix.
+    
+    "item" steps into array elements, any other part into an object key,
+    e.g. "sheets.item" yields each element of a top-level "sheets" array.
+    
+    Args:
+        filepath: Path to JSON file
+        prefix: ijson prefix
+        
+    Yields:
+        Parsed values in file order
+    """
+    if IJSON_AVAILABLE:
+        with open(filepath, 'rb') as f:
+            yield from ijson.items(f, prefix, use_float=True)
+        return
+    
+    values = [load_file(filepath)]
+    for part in prefix.split('.') if prefix else []:
+        if part == 'item':
+            values = [value for parent in values if isinstance(parent, list) for value in parent]
+        else:
+            values = [parent[part] for parent in values if isinstance(parent, dict) and part in parent]
+    yield from values
+
+
+def has_root_array(filepath: Union[str, Path], key: str) -> bool:
+    """
+    Check whether a file's top-level object holds an array under key.
+    
+    With ijson only parser events are scanned, so nothing is built in
+    memory.
+    
+    Args:
+        filepath: Path to JSON file
+        key: Top-level key to look for
+        
+    Returns:
+        True if the root is an object and root[key] is an array
+    """
+    if not IJSON_AVAILABLE:
+        data = load_file(filepath)
+        return isinstance(data, dict) and isinstance(data.get(key), list)
+    
+    with open(filepath, 'rb') as f:
+        events = ijson.parse(f)
+        if next(events, (None, None, None))[1] != 'start_map':
+            return False
+        for prefix, event, value in events:
+            if prefix == '' and event == 'map_key' and value == key:
+                return next(events)[1] == 'start_array'
+    return False
+
+
+def dump_file(filepath: Union[str, Path], obj: Any) -> None:
+    """
+    Write object to a JSON file.
+
+    The document is rendered to a single bytes object first and written
+    with one write() call, instead of letting the encoder issue a write
+    per token through a text file.
+
+    Args:
+        filepath: Output file path
+        obj: Object to serialize
+    """
+    Path(filepath).write_bytes(dumps(obj))
+
+
+def dump_jsonl_file(filepath: Union[str, Path], records: List[Any]) -> None:
+    """
+    Write records to a JSON Lines file, one compact record per line.
+    
+    Args:
+        filepath: Output file path
+        records: Records to serialize
+    """
+    Path(filepath).write_bytes(b''.join(dumps_line(record) + b'\n' for record in records))
+
+
+def _indent(data: bytes, indent: bytes) -> bytes:
+    """Shift every line after the first of a serialized value by indent."""
+    return data.replace(b'\n', b'\n' + indent)
+
+
+def _iter_list(items: Iterable[Any], indent: bytes) -> Iterator[bytes]:
+    """Serialize a list (or any iterable) one element at a time."""
+    separator = b'[\n' + indent + b'  '
+    empty = True
+    for item in items:
+        yield separator + _indent(dumps(item), indent + b'  ')
+        separator = b',\n' + indent + b'  '
+        empty = False
+    yield b'[]' if empty else b'\n' + indent + b']'
+
+
+def iter_dumps_items(items: Iterable[Tuple[str, Any]]) -> Iterator[bytes]:
+    """
+    Serialize (key, value) pairs as a JSON object, one chunk at a time.
+    
+    Pairs are pulled lazily, only once the previous value is fully
+    serialized, so a later value (e.g. statistics) may be computed while an
+    earlier generator value (e.g. records) is consumed. List and generator
+    values are emitted one element at a time.
+    
+    Args:
+        items: Iterable of (str key, value) pairs
+        
+    Yields:
+        Chunks of UTF-8 encoded JSON
+    """
+    separator = b'{\n  '
+    for key, value in items:
+        yield separator + dumps(key) + b': '
+        if isinstance(value, (list, GeneratorType)):
+            yield from _iter_list(value, b'  ')
+        else:
+            yield _indent(dumps(value), b'  ')
+        separator = b',\n  '
+    yield b'{}' if separator == b'{\n  ' else b'\n}'
+
+
+def iter_dumps(obj: Any) -> Iterator[bytes]:
+    """
+    Serialize object as a sequence of byte chunks.
+    
+    A top-level list, and lists that are direct values of a top-level
+    dict (the converters' "loads"/"samples"/"shipments"), are emitted one
+    element at a time. Concatenated, the chunks equal dumps(obj).
+    
+    Args:
+        obj: Object to serialize
+        
+    Yields:
+        Chunks of UTF-8 encoded JSON
+    """
+    if isinstance(obj, list):
+        yield from _iter_list(obj, b'')
+    elif isinstance(obj, dict) and obj and all(isinstance(key, str) for key in obj):
+        yield from iter_dumps_items(obj.items())
+    else:
+        yield dumps(obj)
+
+
+def stream_dump_file(filepath: Union[str, Path], obj: Any) -> None:
+    """
+    Write object to a JSON file record by record.
+    
+    Unlike dump_file(), the full document is never held in memory as a
+    single bytes object; chunks from iter_dumps() go through a 1 MB
+    write buffer.
+    
+    Args:
+        filepath: Output file path
+        obj: Object to serialize
+    """
+    stream_write_file(filepath, iter_dumps(obj))
+
+
+def stream_write_file(filepath: Union[str, Path], chunks: Iterable[bytes]) -> None:
+    """
+    Write byte chunks (e.g. from iter_dumps_items()) through a 1 MB buffer.
+    
+    Args:
+        filepath: Output file path
+        chunks: Chunks of encoded output
+    """
+    with open(filepath, 'wb', buffering=STREAM_BUFFER_SIZE) as f:
+        f.writelines(chunks)
@@ -3,10 +3,299 @@ Data linking engine - traces lab results back to bunker loads and truck shipment
 This is the core feature that connects the entire supply chain.
 """
 
+import os
 import re
-from typing import Any, Dict, List, Optional, Tuple
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 from datetime import datetime, timedelta
 
+from src.core.parallel import process_pool
+
+# All sample code formats as one alternation matched against the whole
+# (stripped) code with fullmatch, tried in order:
+# the spaced format first, then the concatenated ones by specificity.
+# match.lastindex (the last group of the matching branch) tells which
+# format matched.
+_SAMPLE_RE = re.compile(
+    r'(?:([A-C])\s+(\d{4})\s+(\d{1,2})\s+(\d{1,2})\s+([A-Z]{1,2})(\d*)'  # groups 1-6: C 1404 10 14 K2
+    r'|([A-Z]\d)(\d{4})(\d{2})(\d{1,2})'                                # groups 7-10: T1 + date
+    r'|([A-Z]{2})(\d{4})(\d{2})(\d{1,2})'                                # groups 11-14: RC + date
+    r'|([A-Z])(\d{4})(\d{2})(\d{1,2})([A-Z]+\d*)'                        # groups 15-19: A + date + suffix
+    r'|(\d{4})(\d{2})(\d{1,2})([A-Z]+\d*))'                              # groups 20-23: date + suffix
+)
+_SPACED, _DIGIT_PREFIX, _TWO_LETTER_PREFIX, _LETTER_PREFIX = 6, 10, 14, 19
+
+# Cheap pre-check before the regex: the shortest format (date + suffix,
+# e.g. 14041011K) has 8 characters and every format starts with a capital
+# letter or digit
+_MIN_CODE_LENGTH = 8
+_VALID_FIRST_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+
+# Distinct sample codes remembered by the parse cache
+SAMPLE_CODE_CACHE_SIZE = 8192
+
+# Below this many distinct sample codes, trace reports parse them
+# in-process: worker start-up and pickling would cost more than the
+# parallel parsing saves
+PARALLEL_MIN_CODES = 50_000
+
+# Codes that don't follow any date format
+SPECIAL_SAMPLE_CODES = {
+    "F2(T3)": {"facility": None, "date": None, "sample_type": "F", "is_special": True},
+    "SR2": {"facility": None, "date": None, "sample_type": "SR", "is_special": True}
+}
+
+
+class ParsedCode(NamedTuple):
+    """Fields of a parsed sample code, as stored in the parse cache."""
+    
+    facility: Optional[str]
+    year: Optional[str]
+    month: Optional[str]
+    day: Optional[str]
+    date: Optional[str]
+    sample_type: str
+    sample_number: Optional[str]
+    is_special: bool
+    prefix: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to the dictionary returned by SampleCodeParser.parse().
+        
+        Returns:
+            Parsed fields; special codes only carry facility, date,
+            sample_type and is_special, and "prefix" is only present for
+            the prefixed concatenated formats
+        """
+        if self.is_special:
+            return {
+                "facility": self.facility,
+                "date": self.date,
+                "sample_type": self.sample_type,
+                "is_special": True
+            }
+        
+        parsed = {"facility": self.facility}
+        if self.prefix is not None:
+            parsed["prefix"] = self.prefix
+        parsed.update(
+            year=self.year,
+            month=self.month,
+            day=self.day,
+            date=self.date,
+            sample_type=self.sample_type,
+            sample_number=self.sample_number,
+            is_special=False
+        )
+        return parsed
+
+
+_SPECIAL_PARSED = {
+    sample_code: ParsedCode(
+        facility=fields["facility"],
+        year=None,
+        month=None,
+        day=None,
+        date=fields["date"],
+        sample_type=fields["sample_type"],
+        sample_number=None,
+        is_special=True
+    )
+    for sample_code, fields in SPECIAL_SAMPLE_CODES.items()
+}
+
+
+@lru_cache(maxsize=SAMPLE_CODE_CACHE_SIZE)
+def _parse_sample_code_cached(sample_code: str) -> Optional[ParsedCode]:
+    """
+    Parse a non-empty sample code, memoized per code string.
+    
+    Trace reports parse the same codes again for every run and every
+    sheet, so each distinct code is matched against the patterns once.
+    Results are immutable tuples, so the cache can hand them out as is;
+    SampleCodeParser.parse() converts them to dictionaries.
+    
+    Args:
+        sample_code: Sample code string
+        
+    Returns:
+        Parsed fields or None if invalid
+    """
+    sample_code = sample_code.strip()
+    
+    # Special codes
+    if sample_code in _SPECIAL_PARSED:
+        return _SPECIAL_PARSED[sample_code]
+    
+    if len(sample_code) < _MIN_CODE_LENGTH or sample_code[0] not in _VALID_FIRST_CHARS:
+        return None
+    
+    match = _SAMPLE_RE.fullmatch(sample_code)
+    if not match:
+        return None
+    pattern = match.lastindex
+    
+    # Spaced format (backward compatibility)
+    if pattern == _SPACED:
+        facility, year, month, day, sample_type, sample_num = match.group(1, 2, 3, 4, 5, 6)
+        date_str = f"{year}/{month.zfill(2)}/{day.zfill(2)}"
+        
+        return ParsedCode(
+            facility=facility,
+            year=year,
+            month=month.zfill(2),
+            day=day.zfill(2),
+            date=date_str,
+            sample_type=sample_type,
+            sample_number=sample_num if sample_num else None,
+            is_special=False
+        )
+    
+    # Concatenated formats
+    
+    # Pattern 1: Letter+digit prefix (T1, F2, etc.) + date (no suffix expected)
+    if pattern == _DIGIT_PREFIX:
+        prefix, year, month, day = match.group(7, 8, 9, 10)
+        date_str = f"{year}/{month}/{day.zfill(2)}"
+        return ParsedCode(
+            facility=None,
+            prefix=prefix,
+            year=year,
+            month=month,
+            day=day.zfill(2),
+            date=date_str,
+            sample_type="",  # No suffix in this pattern
+            sample_number=None,
+            is_special=False
+        )
+    
+    # Pattern 2: Two-letter prefix (RC, LC, etc.) + date (no suffix expected)
+    if pattern == _TWO_LETTER_PREFIX:
+        prefix, year, month, day = match.group(11, 12, 13, 14)
+        facility = prefix if prefix in ("A", "B", "C") else None
+        date_str = f"{year}/{month}/{day.zfill(2)}"
+        return ParsedCode(
+            facility=facility,
+            prefix=prefix,
+            year=year,
+            month=month,
+            day=day.zfill(2),
+            date=date_str,
+            sample_type="",  # No suffix in this pattern
+            sample_number=None,
+            is_special=False
+        )
+    
+    # Pattern 3: Single letter prefix + date + suffix
+    if pattern == _LETTER_PREFIX:
+        prefix, year, month, day, suffix = match.group(15, 16, 17, 18, 19)
+        facility = prefix if prefix in ("A", "B", "C") else None
+        date_str = f"{year}/{month}/{day.zfill(2)}"
+        return ParsedCode(
+            facility=facility,
+            prefix=prefix,
+            year=year,
+            month=month,
+            day=day.zfill(2),
+            date=date_str,
+            sample_type=suffix,
+            sample_number=None,
+            is_special=False
+        )
+    
+    # Pattern 4: No prefix + date + suffix (groups 20-23)
+    year, month, day, suffix = match.group(20, 21, 22, 23)
+    date_str = f"{year}/{month}/{day.zfill(2)}"
+    return ParsedCode(
+        facility=None,
+        year=year,
+        month=month,
+        day=day.zfill(2),
+        date=date_str,
+        sample_type=suffix,
+        sample_number=None,
+        is_special=False
+    )
+
+
+def _date_key(date: Any) -> Optional[int]:
+    """
+    Convert a zero-padded YYYY/MM/DD date to a sortable YYYYMMDD int.
+    
+    Only this exact layout is converted, so comparing keys always agrees
+    with comparing the date strings.
+    
+    Args:
+        date: Date string
+        
+    Returns:
+        Integer date key, or None for any other value
+    """
+    if type(date) is not str or len(date) != 10 or date[4] != "/" or date[7] != "/":
+        return None
+    digits = date[:4] + date[5:7] + date[8:]
+    return int(digits) if digits.isdigit() and digits.isascii() else None
+
+
+def _bunker_key(sample_code: str) -> Optional[Tuple[Any, Any]]:
+    """
+    (facility, date) bunker index key of a sample code.
+    
+    Args:
+        sample_code: Sample code string
+        
+    Returns:
+        Key into the bunker index, or None if the code can't be linked
+        (empty, unparsable or special)
+    """
+    parsed = _parse_sample_code_cached(sample_code) if sample_code else None
+    if not parsed or parsed.is_special:
+        return None
+    return parsed.facility, parsed.date
+
+
+def _bunker_keys(sample_codes: List[str]) -> List[Optional[Tuple[Any, Any]]]:
+    """
+    _bunker_key() of each code; run in worker processes for large reports.
+    
+    Only the codes and these small tuples cross the process boundary, so
+    pickling stays far cheaper than the parsing it spreads out.
+    
+    Args:
+        sample_codes: Sample code strings
+        
+    Returns:
+        Bunker index key (or None) per code, in input order
+    """
+    return [_bunker_key(sample_code) for sample_code in sample_codes]
+
+
+def _is_within_date_range(
+    shipment_date: str,
+    bunker_date: str,
+    tolerance_days: int
+) -> bool:
+    """
+    Check if shipment date is within tolerance days before bunker date.
+    
+    Args:
+        shipment_date: Shipment date (YYYY/MM/DD)
+        bunker_date: Bunker date (YYYY/MM/DD)
+        tolerance_days: Days of tolerance
+        
+    Returns:
+        True if within range
+    """
+    try:
+        # For Jalali dates, we do simple string comparison
+        # A more robust solution would use jdatetime for actual date math
+        # For now, check if dates are close (same or shipment before bunker)
+        return shipment_date <= bunker_date
+    except Exception:
+        return False
+
 
 class SampleCodeParser:
     """Parse sample codes to extract metadata."""
@@ -34,113 +323,8 @@ class SampleCodeParser:
         """
         if not sample_code:
             return None
-        
-        sample_code = sample_code.strip()
-        
-        # Special codes
-        special_codes = {
-            "F2(T3)": {"facility": None, "date": None, "sample_type": "F", "is_special": True},
-            "SR2": {"facility": None, "date": None, "sample_type": "SR", "is_special": True}
-        }
-        if sample_code in special_codes:
-            return special_codes[sample_code]
-        
-        # Try spaced pattern first (backward compatibility)
-        pattern_spaced = r'^([A-C])\s+(\d{4})\s+(\d{1,2})\s+(\d{1,2})\s+([A-Z]{1,2})(\d*)$'
-        match = re.match(pattern_spaced, sample_code)
-        
-        if match:
-            facility, year, month, day, sample_type, sample_num = match.groups()
-            date_str = f"{year}/{month.zfill(2)}/{day.zfill(2)}"
-            
-            return {
-                "facility": facility,
-                "year": year,
-                "month": month.zfill(2),
-                "day": day.zfill(2),
-                "date": date_str,
-                "sample_type": sample_type,
-                "sample_number": sample_num if sample_num else None,
-                "is_special": False
-            }
-        
-        # Try concatenated patterns in order of specificity
-        
-        # Pattern 1: Letter+digit prefix (T1, F2, etc.) + date (no suffix expected)
-        pattern1 = r'^([A-Z]\d)(\d{4})(\d{2})(\d{1,2})$'
-        match = re.match(pattern1, sample_code)
-        if match:
-            prefix, year, month, day = match.groups()
-            date_str = f"{year}/{month}/{day.zfill(2)}"
-            return {
-                "facility": None,
-                "prefix": prefix,
-                "year": year,
-                "month": month,
-                "day": day.zfill(2),
-                "date": date_str,
-                "sample_type": "",  # No suffix in this pattern
-                "sample_number": None,
-                "is_special": False
-            }
-        
-        # Pattern 2: Two-letter prefix (RC, LC, etc.) + date (no suffix expected)
-        pattern2 = r'^([A-Z]{2})(\d{4})(\d{2})(\d{1,2})$'
-        match = re.match(pattern2, sample_code)
-        if match:
-            prefix, year, month, day = match.groups()
-            facility = prefix if prefix in ("A", "B", "C") else None
-            date_str = f"{year}/{month}/{day.zfill(2)}"
-            return {
-                "facility": facility,
-                "prefix": prefix,
-                "year": year,
-                "month": month,
-                "day": day.zfill(2),
-                "date": date_str,
-                "sample_type": "",  # No suffix in this pattern
-                "sample_number": None,
-                "is_special": False
-            }
-        
-        # Pattern 3: Single letter prefix + date + suffix
-        pattern3 = r'^([A-Z])(\d{4})(\d{2})(\d{1,2})([A-Z]+\d*)$'
-        match = re.match(pattern3, sample_code)
-        if match:
-            prefix, year, month, day, suffix = match.groups()
-            facility = prefix if prefix in ("A", "B", "C") else None
-            date_str = f"{year}/{month}/{day.zfill(2)}"
-            return {
-                "facility": facility,
-                "prefix": prefix,
-                "year": year,
-                "month": month,
-                "day": day.zfill(2),
-                "date": date_str,
-                "sample_type": suffix,
-                "sample_number": None,
-                "is_special": False
-            }
-        
-        # Pattern 4: No prefix + date + suffix
-        pattern4 = r'^(\d{4})(\d{2})(\d{1,2})([A-Z]+\d*)$'
-        match = re.match(pattern4, sample_code)
-        if match:
-            year, month, day, suffix = match.groups()
-            date_str = f"{year}/{month}/{day.zfill(2)}"
-            return {
-                "facility": None,
-                "year": year,
-                "month": month,
-                "day": day.zfill(2),
-                "date": date_str,
-                "sample_type": suffix,
-                "sample_number": None,
-                "is_special": False
-            }
-        
-        # Fallback - couldn't parse
-        return None
+        parsed = _parse_sample_code_cached(sample_code)
+        return parsed.to_dict() if parsed is not None else None
 
 
 class DataLinker:
@@ -172,21 +356,20 @@ class DataLinker:
             Matching bunker load or None
         """
         sample_code = sample.get("sample_code", "")
-        parsed = self.parser.parse(sample_code)
+        # Cached parse result; only read here
+        parsed = _parse_sample_code_cached(sample_code) if sample_code else None
         
-        if not parsed or parsed.get("is_special"):
+        if not parsed or parsed.is_special:
             return None
         
-        facility = parsed.get("facility")
-        sample_date = parsed.get("date")
+        facility = parsed.facility
+        sample_date = parsed.date
         
         # Find bunker loads from same facility on same date
+        # The date is only read for loads of the right facility
         matches = []
         for load in bunker_loads:
-            load_facility = load.get("facility_code")
-            load_date = load.get("date")
-            
-            if load_facility == facility and load_date == sample_date:
+            if load.get("facility_code") == facility and load.get("date") == sample_date:
                 matches.append(load)
         
         # If multiple matches, return the first (could be improved with time matching)
@@ -229,13 +412,10 @@ class DataLinker:
         matches = []
         
         for shipment in shipments:
-            shipment_dest = shipment.get("destination")
-            shipment_date = shipment.get("date")
-            
-            if shipment_dest == truck_dest:
+            if shipment.get("destination") == truck_dest:
                 # Check if shipment is within tolerance before bunker date
-                if self._is_within_date_range(
-                    shipment_date, bunker_date, date_tolerance_days
+                if _is_within_date_range(
+                    shipment.get("date"), bunker_date, date_tolerance_days
                 ):
                     matches.append(shipment)
         
@@ -282,29 +462,175 @@ class DataLinker:
         return result
     
     @staticmethod
-    def _is_within_date_range(
-        shipment_date: str,
-        bunker_date: str,
-        tolerance_days: int
-    ) -> bool:
+    def build_indices(
+        bunker_loads: List[Dict[str, Any]],
+        shipments: List[Dict[str, Any]]
+    ) -> Tuple[Dict[Tuple[Any, Any], Dict[str, Any]], Dict[Any, Tuple[List[str], Optional[List[int]], List[Dict[str, Any]], bool]]]:
         """
-        Check if shipment date is within tolerance days before bunker date.
+        Index bunker loads and shipments for repeated linking.
         
         Args:
-            shipment_date: Shipment date (YYYY/MM/DD)
-            bunker_date: Bunker date (YYYY/MM/DD)
-            tolerance_days: Days of tolerance
+            bunker_loads: List of bunker loads
+            shipments: List of truck shipments
             
         Returns:
-            True if within range
+            (bunker_idx, shipment_idx): bunker_idx maps (facility_code, date)
+            to the first such load; shipment_idx maps a destination to its
+            shipment dates, their integer keys (None unless every date is
+            YYYY/MM/DD), the shipments, and whether the dates are sorted
         """
-        try:
-            # For Jalali dates, we do simple string comparison
-            # A more robust solution would use jdatetime for actual date math
-            # For now, check if dates are close (same or shipment before bunker)
-            return shipment_date <= bunker_date
-        except Exception:
-            return False
+        bunker_idx = {}
+        for load in bunker_loads:
+            bunker_idx.setdefault((load.get("facility_code"), load.get("date")), load)
+        
+        by_destination = {}
+        for shipment in shipments:
+            shipment_date = shipment.get("date")
+            # A missing date never compares as within range
+            if shipment_date is None:
+                continue
+            by_destination.setdefault(shipment.get("destination"), []).append((shipment_date, shipment))
+        
+        shipment_idx = {}
+        for destination, entries in by_destination.items():
+            dates = [shipment_date for shipment_date, _ in entries]
+            # Integer keys compare faster; kept only if every date converts
+            keys = [_date_key(shipment_date) for shipment_date in dates]
+            shipment_idx[destination] = (
+                dates,
+                None if None in keys else keys,
+                [shipment for _, shipment in entries],
+                all(earlier <= later for earlier, later in zip(dates, dates[1:]))
+            )
+        
+        return bunker_idx, shipment_idx
+    
+    def _link_sample_fast(
+        self,
+        sample: Dict[str, Any],
+        bunker_idx: Dict[Tuple[Any, Any], Dict[str, Any]],
+        shipment_idx: Dict[Any, Tuple[List[str], Optional[List[int]], List[Dict[str, Any]], bool]],
+        bunker_keys: Optional[Dict[str, Optional[Tuple[Any, Any]]]] = None
+    ) -> Dict[str, Any]:
+        """
+        link_sample_to_source() using the lookups from build_indices().
+        
+        Args:
+            sample: Lab sample dictionary
+            bunker_idx: Bunker loads by (facility_code, date)
+            shipment_idx: Shipments by destination
+            bunker_keys: Precomputed _bunker_key() per sample code; codes
+                are parsed here when omitted
+            
+        Returns:
+            Dictionary with linked records
+        """
+        result = {
+            "sample": sample,
+            "bunker_load": None,
+            "shipments": [],
+            "trace_complete": False
+        }
+        
+        # Step 1: Link to bunker
+        sample_code = sample.get("sample_code", "")
+        if bunker_keys is not None:
+            source_key = bunker_keys[sample_code] if sample_code else None
+        else:
+            source_key = _bunker_key(sample_code)
+        if source_key is None:
+            return result
+        
+        bunker = bunker_idx.get(source_key)
+        if not bunker:
+            return result
+        
+        result["bunker_load"] = bunker
+        
+        # Step 2: Link bunker to shipments delivered on or before its date
+        linked_shipments = self.link_bunker_to_shipment_fast(bunker, shipment_idx)
+        result["shipments"] = linked_shipments
+        result["trace_complete"] = len(linked_shipments) > 0
+        
+        return result
+    
+    def link_bunker_to_shipment_fast(
+        self,
+        bunker_load: Dict[str, Any],
+        shipment_idx: Dict[Any, Tuple[List[str], Optional[List[int]], List[Dict[str, Any]], bool]]
+    ) -> List[Dict[str, Any]]:
+        """
+        link_bunker_to_shipment() using the shipment index from build_indices().
+        
+        Date-sorted destinations are cut with one binary search, so linking
+        many bunker loads costs O(log N + K) each instead of a full scan.
+        
+        Args:
+            bunker_load: Bunker load dictionary
+            shipment_idx: Shipments by destination
+            
+        Returns:
+            List of matching shipments, in input order
+        """
+        facility_code = bunker_load.get("facility_code")
+        bunker_date = bunker_load.get("date")
+        
+        if not facility_code or not bunker_date:
+            return []
+        
+        truck_dest = self.facilities.get(facility_code, {}).get("truck_dest")
+        if not truck_dest or truck_dest not in shipment_idx:
+            return []
+        
+        dates, keys, dest_shipments, in_order = shipment_idx[truck_dest]
+        bunker_key = _date_key(bunker_date) if keys is not None else None
+        if bunker_key is None:
+            # Fall back to comparing the date strings
+            keys, bunker_key = dates, bunker_date
+        
+        if in_order:
+            return dest_shipments[:bisect_right(keys, bunker_key)]
+        # Keep input order for unsorted shipments
+        return [
+            shipment for shipment_key, shipment in zip(keys, dest_shipments)
+            if shipment_key <= bunker_key
+        ]
+    
+    @staticmethod
+    def _parse_bunker_keys(samples: List[Dict[str, Any]]) -> Optional[Dict[str, Optional[Tuple[Any, Any]]]]:
+        """
+        Parse the samples' distinct codes in worker processes for large reports.
+        
+        Code parsing is CPU-bound pure Python, so threads would serialize
+        on the GIL.
+        
+        Args:
+            samples: List of lab samples
+            
+        Returns:
+            Bunker index key per distinct sample code, or None when there
+            are too few codes (or CPUs) to be worth a process pool
+        """
+        workers = os.cpu_count() or 1
+        if workers < 2 or len(samples) < PARALLEL_MIN_CODES:
+            return None
+        
+        sample_codes = list(dict.fromkeys(
+            sample_code for sample in samples
+            if (sample_code := sample.get("sample_code", ""))
+        ))
+        if len(sample_codes) < PARALLEL_MIN_CODES:
+            return None
+        
+        chunk_size = -(-len(sample_codes) // workers)
+        chunks = [
+            sample_codes[start:start + chunk_size]
+            for start in range(0, len(sample_codes), chunk_size)
+        ]
+        with process_pool(max_workers=len(chunks)) as executor:
+            keys = [key for chunk_keys in executor.map(_bunker_keys, chunks) for key in chunk_keys]
+        
+        return dict(zip(sample_codes, keys))
     
     def generate_trace_report(
         self,
@@ -326,8 +652,12 @@ class DataLinker:
         linked_samples = []
         unlinked_samples = []
         
+        # Index once instead of scanning both lists for every sample
+        bunker_idx, shipment_idx = self.build_indices(bunker_loads, shipments)
+        bunker_keys = self._parse_bunker_keys(samples)
+        
         for sample in samples:
-            trace = self.link_sample_to_source(sample, bunker_loads, shipments)
+            trace = self._link_sample_fast(sample, bunker_idx, shipment_idx, bunker_keys)
             
             if trace["trace_complete"]:
                 linked_samples.append(trace)
@@ -0,0 +1,28 @@
+"""
+Process pool helper shared by the CPU-bound converters and linker.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Create a process pool whose workers are not forked from this process.
+    
+    The pipeline runs converters on threads, and forking a multithreaded
+    process can deadlock on locks other threads held at fork time, so
+    workers start from a fork server (or are spawned where that is not
+    available).
+    
+    Args:
+        max_workers: Number of worker processes
+        
+    Returns:
+        ProcessPoolExecutor using the forkserver or spawn start method
+    """
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(start_method)
+    )
@@ -3,10 +3,68 @@ Data validation engine for quality checks and alert generation.
 """
 
 import json
+import re
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 from enum import Enum
 
+import numpy as np
+
+# Standard sample code: Letter Space Year Space Month Space Day Space Type+Number
+_VALID_SAMPLE_RE = re.compile(r'^[A-C]\s+\d{4}\s+\d{1,2}\s+\d{1,2}\s+[A-Z]{1,2}\d*$')
+_SPECIAL_SAMPLE_CODES = frozenset({"F2(T3)", "SR2"})
+
+# Distinct sample codes remembered by the validity cache
+SAMPLE_CODE_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=4)
+def _load_rules_cached(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """
+    Parse a validation rules file once per (path, modification time).
+    
+    The returned dict is shared between validators and must be treated as
+    read-only.
+    
+    Args:
+        path: Rules file path
+        mtime_ns: File modification time, so an edited file is re-read
+        
+    Returns:
+        Parsed validation rules
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=SAMPLE_CODE_CACHE_SIZE)
+def _is_valid_sample_code(sample_code: str) -> bool:
+    """
+    Check if sample code matches expected pattern, memoized per code.
+    Pattern: C 1404 10 14 K2 (facility year month day type+number)
+    
+    The same codes recur across the lab sheets, so repeats skip the regex.
+    
+    Args:
+        sample_code: Sample code string
+        
+    Returns:
+        True if valid format
+    """
+    if not sample_code:
+        return False
+    
+    # Special codes that don't follow the pattern
+    if sample_code in _SPECIAL_SAMPLE_CODES:
+        return True
+    
+    # Standard pattern, e.g. C 1404 10 14 K2. Concatenated codes
+    # (A1404105L) fail the cheap length/prefix check without the regex
+    if len(sample_code) < 12 or sample_code[0] not in "ABC" or not sample_code[1].isspace():
+        return False
+    return bool(_VALID_SAMPLE_RE.match(sample_code))
+
 
 class AlertLevel(Enum):
     """Alert severity levels."""
@@ -18,6 +76,8 @@ class AlertLevel(Enum):
 class ValidationAlert:
     """Represents a validation alert."""
     
+    __slots__ = ("level", "rule", "message", "data")
+    
     def __init__(self, level: AlertLevel, rule: str, message: str, data: Dict[str, Any]):
         self.level = level
         self.rule = rule
@@ -41,14 +101,52 @@ class DataValidator:
         """Initialize with configuration directory."""
         self.config_dir = Path(config_dir)
         self.rules = self._load_validation_rules()
+        self._compile_rules()
     
     def _load_validation_rules(self) -> Dict[str, Any]:
-        """Load validation rules from JSON config."""
+        """Load validation rules from JSON config, shared across validator instances."""
         rules_path = self.config_dir / "validation_rules.json"
-        if rules_path.exists():
-            with open(rules_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+        try:
+            mtime_ns = rules_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        return _load_rules_cached(str(rules_path.resolve()), mtime_ns)
+    
+    def _compile_rules(self):
+        """
+        Resolve rule thresholds and message prefixes once.
+        
+        Thresholds are fixed after loading, so validation reads plain
+        attributes instead of nested dict lookups, and per alert only the
+        measured value is converted and concatenated into the message.
+        """
+        ore_rules = self.rules.get("ore_input", {})
+        tonnage_rules = self.rules.get("tonnage", {})
+        
+        self.ore_warn = ore_rules.get("warning_threshold_ppm", 5.0)
+        self.ore_crit = ore_rules.get("critical_threshold_ppm", 20.0)
+        self.tail_crit = self.rules.get("tailings", {}).get("critical_threshold_ppm", 0.2)
+        self.rc_crit = self.rules.get("return_water", {}).get("critical_threshold_ppm", 0.05)
+        self.carbon_warn = self.rules.get("carbon", {}).get("warning_threshold_ppm", 200.0)
+        self.tonnage_min = tonnage_rules.get("min_warning_kg", 15000)
+        self.tonnage_max = tonnage_rules.get("max_warning_kg", 32000)
+        
+        self._ore_critical_prefix = f"Ore input Au > {self.ore_crit} ppm: "
+        self._ore_warning_prefix = f"Ore input Au > {self.ore_warn} ppm: "
+        self._tailings_prefix = f"Tailings Au > {self.tail_crit} ppm: "
+        self._return_water_prefix = f"Return water Au > {self.rc_crit} ppm: "
+        self._carbon_prefix = f"Carbon Au < {self.carbon_warn} ppm: "
+        self._tonnage_suffix = f" kg outside normal range [{self.tonnage_min}, {self.tonnage_max}]"
+        
+        # Threshold check per sample type
+        self._type_handlers = {
+            "K": self._check_ore,
+            "T": self._check_tailings,
+            "RC": self._check_return_water,
+            "CR": self._check_carbon
+        }
+        # Sample type -> small int for the batch masks (0: unchecked type)
+        self._type_index = {"K": 1, "T": 2, "RC": 3, "CR": 4}
     
     def validate_lab_sample(self, sample: Dict[str, Any]) -> List[ValidationAlert]:
         """
@@ -67,11 +165,11 @@ class DataValidator:
         sample_type = sample.get("sample_type", "")
         
         # Check if sample code is valid
-        if not self._is_valid_sample_code(sample_code):
+        if not _is_valid_sample_code(sample_code):
             alerts.append(ValidationAlert(
                 level=AlertLevel.CRITICAL,
                 rule="invalid_sample_code",
-                message=f"Sample code doesn't match expected format: {sample_code}",
+                message="Sample code doesn't match expected format: " + str(sample_code),
                 data={"sample_code": sample_code}
             ))
         
@@ -79,67 +177,117 @@ class DataValidator:
         if au_ppm is None or not isinstance(au_ppm, (int, float)):
             return alerts
         
-        # Check ore input (K) thresholds
-        if sample_type == "K":
-            ore_rules = self.rules.get("ore_input", {})
-            warning_threshold = ore_rules.get("warning_threshold_ppm", 5.0)
-            critical_threshold = ore_rules.get("critical_threshold_ppm", 20.0)
-            
-            if au_ppm > critical_threshold:
-                alerts.append(ValidationAlert(
-                    level=AlertLevel.CRITICAL,
-                    rule="ore_input_critical",
-                    message=f"Ore input Au > {critical_threshold} ppm: {au_ppm} ppm - verify immediately",
-                    data={"sample_code": sample_code, "au_ppm": au_ppm}
-                ))
-            elif au_ppm > warning_threshold:
-                alerts.append(ValidationAlert(
-                    level=AlertLevel.WARNING,
-                    rule="ore_input_warning",
-                    message=f"Ore input Au > {warning_threshold} ppm: {au_ppm} ppm - high grade, verify",
-                    data={"sample_code": sample_code, "au_ppm": au_ppm}
-                ))
+        # One table lookup picks the sample type's threshold check
+        handler = self._type_handlers.get(sample_type)
+        if handler is not None:
+            handler(au_ppm, sample_code, alerts)
         
-        # Check tailings (T) threshold
-        elif sample_type == "T":
-            tailings_rules = self.rules.get("tailings", {})
-            critical_threshold = tailings_rules.get("critical_threshold_ppm", 0.2)
-            
-            if au_ppm > critical_threshold:
-                alerts.append(ValidationAlert(
-                    level=AlertLevel.CRITICAL,
-                    rule="tailings_loss",
-                    message=f"Tailings Au > {critical_threshold} ppm: {au_ppm} ppm - gold loss too high",
-                    data={"sample_code": sample_code, "au_ppm": au_ppm}
-                ))
+        return alerts
+    
+    def validate_lab_samples_batch(self, samples: List[Dict[str, Any]]) -> List[List[ValidationAlert]]:
+        """
+        Validate many lab samples at once.
+        
+        Same alerts as validate_lab_sample() per sample, but the threshold
+        comparisons run as NumPy masks over the whole batch and the
+        per-type checks only run for the rows that raise an alert.
         
-        # Check return water (RC) threshold
-        elif sample_type == "RC":
-            rc_rules = self.rules.get("return_water", {})
-            critical_threshold = rc_rules.get("critical_threshold_ppm", 0.05)
+        Args:
+            samples: List of lab sample dictionaries
             
-            if au_ppm > critical_threshold:
-                alerts.append(ValidationAlert(
+        Returns:
+            List of validation alerts for each sample, in input order
+        """
+        sample_codes = [sample.get("sample_code", "") for sample in samples]
+        values = [sample.get("au_ppm") for sample in samples]
+        sample_types = [sample.get("sample_type", "") for sample in samples]
+        
+        results = [[] for _ in samples]
+        
+        for i, sample_code in enumerate(sample_codes):
+            if not _is_valid_sample_code(sample_code):
+                results[i].append(ValidationAlert(
                     level=AlertLevel.CRITICAL,
-                    rule="return_water_leak",
-                    message=f"Return water Au > {critical_threshold} ppm: {au_ppm} ppm - circuit leak",
-                    data={"sample_code": sample_code, "au_ppm": au_ppm}
+                    rule="invalid_sample_code",
+                    message="Sample code doesn't match expected format: " + str(sample_code),
+                    data={"sample_code": sample_code}
                 ))
         
-        # Check carbon (CR) threshold (below threshold is a warning)
-        elif sample_type == "CR":
-            carbon_rules = self.rules.get("carbon", {})
-            warning_threshold = carbon_rules.get("warning_threshold_ppm", 200.0)
-            
-            if au_ppm < warning_threshold:
-                alerts.append(ValidationAlert(
-                    level=AlertLevel.WARNING,
-                    rule="carbon_exhausted",
-                    message=f"Carbon Au < {warning_threshold} ppm: {au_ppm} ppm - carbon may be exhausted",
-                    data={"sample_code": sample_code, "au_ppm": au_ppm}
-                ))
+        # Non-numeric values become NaN, which fails every comparison
+        try:
+            au = np.array(
+                [v if isinstance(v, (int, float)) else np.nan for v in values],
+                dtype=np.float64
+            )
+        except OverflowError:
+            # An int too large for a float; compare in Python instead
+            return [self.validate_lab_sample(sample) for sample in samples]
+        kind_index = self._type_index
+        kinds = np.fromiter(
+            (kind_index.get(t, 0) for t in sample_types),
+            dtype=np.int8,
+            count=len(sample_types)
+        )
         
-        return alerts
+        flagged = (
+            ((kinds == 1) & (au > min(self.ore_crit, self.ore_warn)))
+            | ((kinds == 2) & (au > self.tail_crit))
+            | ((kinds == 3) & (au > self.rc_crit))
+            | ((kinds == 4) & (au < self.carbon_warn))
+        )
+        
+        handlers = self._type_handlers
+        for i in np.flatnonzero(flagged).tolist():
+            handlers[sample_types[i]](values[i], sample_codes[i], results[i])
+        
+        return results
+    
+    def _check_ore(self, au_ppm: float, sample_code: str, alerts: List[ValidationAlert]):
+        """Check ore input (K) thresholds."""
+        if au_ppm > self.ore_crit:
+            alerts.append(ValidationAlert(
+                level=AlertLevel.CRITICAL,
+                rule="ore_input_critical",
+                message=self._ore_critical_prefix + str(au_ppm) + " ppm - verify immediately",
+                data={"sample_code": sample_code, "au_ppm": au_ppm}
+            ))
+        elif au_ppm > self.ore_warn:
+            alerts.append(ValidationAlert(
+                level=AlertLevel.WARNING,
+                rule="ore_input_warning",
+                message=self._ore_warning_prefix + str(au_ppm) + " ppm - high grade, verify",
+                data={"sample_code": sample_code, "au_ppm": au_ppm}
+            ))
+    
+    def _check_tailings(self, au_ppm: float, sample_code: str, alerts: List[ValidationAlert]):
+        """Check tailings (T) threshold."""
+        if au_ppm > self.tail_crit:
+            alerts.append(ValidationAlert(
+                level=AlertLevel.CRITICAL,
+                rule="tailings_loss",
+                message=self._tailings_prefix + str(au_ppm) + " ppm - gold loss too high",
+                data={"sample_code": sample_code, "au_ppm": au_ppm}
+            ))
+    
+    def _check_return_water(self, au_ppm: float, sample_code: str, alerts: List[ValidationAlert]):
+        """Check return water (RC) threshold."""
+        if au_ppm > self.rc_crit:
+            alerts.append(ValidationAlert(
+                level=AlertLevel.CRITICAL,
+                rule="return_water_leak",
+                message=self._return_water_prefix + str(au_ppm) + " ppm - circuit leak",
+                data={"sample_code": sample_code, "au_ppm": au_ppm}
+            ))
+    
+    def _check_carbon(self, au_ppm: float, sample_code: str, alerts: List[ValidationAlert]):
+        """Check carbon (CR) threshold (below threshold is a warning)."""
+        if au_ppm < self.carbon_warn:
+            alerts.append(ValidationAlert(
+                level=AlertLevel.WARNING,
+                rule="carbon_exhausted",
+                message=self._carbon_prefix + str(au_ppm) + " ppm - carbon may be exhausted",
+                data={"sample_code": sample_code, "au_ppm": au_ppm}
+            ))
     
     def validate_tonnage(self, tonnage_kg: float, context: Dict[str, Any]) -> List[ValidationAlert]:
         """
@@ -154,15 +302,11 @@ class DataValidator:
         """
         alerts = []
         
-        tonnage_rules = self.rules.get("tonnage", {})
-        min_kg = tonnage_rules.get("min_warning_kg", 15000)
-        max_kg = tonnage_rules.get("max_warning_kg", 32000)
-        
-        if tonnage_kg < min_kg or tonnage_kg > max_kg:
+        if tonnage_kg < self.tonnage_min or tonnage_kg > self.tonnage_max:
             alerts.append(ValidationAlert(
                 level=AlertLevel.WARNING,
                 rule="unusual_tonnage",
-                message=f"Tonnage {tonnage_kg} kg outside normal range [{min_kg}, {max_kg}]",
+                message="Tonnage " + str(tonnage_kg) + self._tonnage_suffix,
                 data={"tonnage_kg": tonnage_kg, **context}
             ))
         
@@ -210,29 +354,3 @@ class DataValidator:
             alerts.extend(tonnage_alerts)
         
         return alerts
-    
-    @staticmethod
-    def _is_valid_sample_code(sample_code: str) -> bool:
-        """
-        Check if sample code matches expected pattern.
-        Pattern: C 1404 10 14 K2 (facility year month day type+number)
-        
-        Args:
-            sample_code: Sample code string
-            
-        Returns:
-            True if valid format
-        """
-        if not sample_code:
-            return False
-        
-        # Special codes that don't follow the pattern
-        special_codes = ["F2(T3)", "SR2"]
-        if sample_code in special_codes:
-            return True
-        
-        # Standard pattern: Letter Space Year Space Month Space Day Space Type+Number
-        # Example: C 1404 10 14 K2
-        import re
-        pattern = r'^[A-C]\s+\d{4}\s+\d{1,2}\s+\d{1,2}\s+[A-Z]{1,2}\d*$'
-        return bool(re.match(pattern, sample_code))
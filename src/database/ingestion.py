@@ -2,7 +2,14 @@
 Data ingestion - load validated JSON data into PostgreSQL.
 """
 
-from typing import Any, Dict, List
+import io
+import json
+from contextlib import contextmanager
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Dict, Generator, Iterable, Iterator, List
+from sqlalchemy import JSON, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from src.database.models import (
@@ -12,6 +19,62 @@ from src.database.models import (
 from src.database.connection import get_db
 
 
+# Records per insert batch; each batch is committed separately when the
+# ingest method opens its own session
+INGEST_BATCH_SIZE = 1000
+
+# Natural keys per IN (...) lookup query, well under driver parameter limits
+LOOKUP_CHUNK_SIZE = 1000
+
+# Session-local staging table for lab samples on PostgreSQL
+LAB_SAMPLE_STAGING_TABLE = "tmp_lab_samples"
+
+# Characters escaped in PostgreSQL's COPY text format
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_text_value(value: Any, is_json: bool = False) -> str:
+    """
+    Encode one field for COPY ... FROM STDIN in text format.
+    
+    Args:
+        value: Field value
+        is_json: Whether the column is a JSON column
+        
+    Returns:
+        Escaped field text; \\N for NULL
+    """
+    if value is None:
+        return "\\N"
+    if is_json:
+        text = json.dumps(value, ensure_ascii=False)
+    elif isinstance(value, bool):
+        return "t" if value else "f"
+    elif isinstance(value, (int, float)):
+        return str(value)
+    elif isinstance(value, (datetime, date)):
+        return value.isoformat()
+    else:
+        text = str(value)
+    return text.translate(_COPY_ESCAPES)
+
+
+def _batches(records: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Split records into lists of at most batch_size, consuming lazily.
+    
+    Args:
+        records: Records (any iterable, e.g. a streaming reader)
+        batch_size: Maximum records per batch
+        
+    Yields:
+        Consecutive batches of records
+    """
+    iterator = iter(records)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
 class DataIngestion:
     """Handles data ingestion into PostgreSQL."""
     
@@ -19,6 +82,202 @@ class DataIngestion:
         """Initialize data ingestion."""
         self.db = db_connection or get_db()
     
+    @contextmanager
+    def _session_scope(self, session: Session = None) -> Generator[Session, None, None]:
+        """
+        Yield the caller's session, or open a self-committing one.
+        
+        Passing a session lets several ingest_* calls share one transaction;
+        the caller is then responsible for the commit.
+        
+        Args:
+            session: Optional session owned by the caller
+            
+        Yields:
+            SQLAlchemy Session
+        """
+        if session is not None:
+            yield session
+        else:
+            with self.db.get_session() as own_session:
+                yield own_session
+    
+    @staticmethod
+    def _commit_batch(session: Session, owns_session: bool):
+        """
+        Commit a finished batch if the ingest method opened the session.
+        
+        Per-batch commits keep each transaction short, and clearing the
+        identity map keeps the session's memory bounded by one batch. A
+        caller-supplied session is left alone so shared transactions stay
+        atomic.
+        
+        Args:
+            session: Session the batch was written with
+            owns_session: Whether the ingest method opened the session
+        """
+        if owns_session:
+            session.commit()
+            session.expunge_all()
+    
+    def _insert_rows(self, session: Session, model, rows: List[Dict[str, Any]]):
+        """
+        Insert plain row dicts into model's table.
+        
+        PostgreSQL gets a single COPY FROM STDIN; other databases (or
+        drivers without COPY support) get one Core INSERT executed for all
+        rows, skipping the ORM's per-row unit-of-work bookkeeping.
+        
+        Args:
+            session: Session whose transaction the rows join
+            model: ORM model class of the target table
+            rows: Row dicts with the same keys
+        """
+        if rows and not self._copy_rows(session, model, rows):
+            session.connection().execute(insert(model.__table__), rows)
+    
+    @staticmethod
+    def _copy_supported(connection) -> bool:
+        """
+        Check whether connection's DBAPI cursor supports PostgreSQL COPY.
+        
+        Args:
+            connection: SQLAlchemy connection
+            
+        Returns:
+            True for PostgreSQL through psycopg2 or psycopg 3
+        """
+        if connection.dialect.name != "postgresql":
+            return False
+        
+        cursor = connection.connection.cursor()
+        try:
+            return hasattr(cursor, "copy_expert") or hasattr(cursor, "copy")
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def _copy_rows(session: Session, model, rows: List[Dict[str, Any]],
+                   table_name: str = None) -> bool:
+        """
+        Stream rows into model's table with PostgreSQL COPY (text format).
+        
+        Column defaults missing from the rows (created_at, flags) are filled
+        in here, since COPY bypasses SQLAlchemy's insert defaults.
+        
+        Args:
+            session: Session whose transaction the rows join
+            model: ORM model class of the target table
+            rows: Row dicts with the same keys
+            table_name: Table to copy into instead of model's own (e.g. a
+                TEMP staging table with the same columns)
+            
+        Returns:
+            False if COPY isn't available, in which case nothing was written
+        """
+        connection = session.connection()
+        if connection.dialect.name != "postgresql":
+            return False
+        
+        cursor = connection.connection.cursor()
+        copy_expert = getattr(cursor, "copy_expert", None)  # psycopg2
+        copy = getattr(cursor, "copy", None)  # psycopg 3
+        if copy_expert is None and copy is None:
+            cursor.close()
+            return False
+        
+        table = model.__table__
+        row_columns = list(rows[0])
+        default_columns = []
+        default_values = []
+        for column in table.columns:
+            if column.name in rows[0] or column.default is None or column.primary_key:
+                continue
+            default = column.default
+            default_columns.append(column.name)
+            default_values.append(default.arg(None) if default.is_callable else default.arg)
+        columns = row_columns + default_columns
+        json_columns = [isinstance(table.columns[name].type, JSON) for name in columns]
+        
+        buffer = io.StringIO()
+        for row in rows:
+            values = [row[name] for name in row_columns]
+            values.extend(default_values)
+            buffer.write("\t".join([
+                _copy_text_value(value, is_json)
+                for value, is_json in zip(values, json_columns)
+            ]))
+            buffer.write("\n")
+        
+        quote = connection.dialect.identifier_preparer.quote
+        statement = "COPY {} ({}) FROM STDIN".format(
+            quote(table_name or table.name), ", ".join(quote(name) for name in columns)
+        )
+        buffer.seek(0)
+        if copy_expert is not None:
+            copy_expert(statement, buffer)
+        else:
+            with copy(statement) as copy_stream:
+                copy_stream.write(buffer.getvalue())
+        cursor.close()
+        
+        return True
+    
+    def _insert_lab_samples_on_conflict(self, session: Session, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert lab sample rows on PostgreSQL, skipping stored duplicates.
+        
+        Rows are COPYed into a TEMP table shaped like lab_samples and moved
+        over with one INSERT ... SELECT ... ON CONFLICT DO NOTHING, so the
+        (sample_code, sheet_name) check happens inside the database. Staged
+        rows draw ids from the lab_samples sequence in input order, and the
+        move is ordered by them so the first of several duplicates wins.
+        Without COPY support no staging table is created; the rows go
+        through an executemany INSERT ... ON CONFLICT DO NOTHING instead.
+        
+        Args:
+            session: Session whose transaction the rows join
+            rows: Lab sample row dicts with the same keys
+            
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+        
+        connection = session.connection()
+        table = LabSample.__table__
+        
+        if not self._copy_supported(connection):
+            result = connection.execute(
+                pg_insert(table)
+                .on_conflict_do_nothing(constraint='uq_sample_sheet')
+                .returning(table.c.id),
+                rows
+            )
+            return len(result.all())
+        
+        quote = connection.dialect.identifier_preparer.quote
+        target = quote(table.name)
+        staging = quote(LAB_SAMPLE_STAGING_TABLE)
+        columns = ", ".join(quote(column.name) for column in table.columns)
+        
+        connection.exec_driver_sql(
+            f"CREATE TEMP TABLE {staging} (LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        self._copy_rows(session, LabSample, rows, table_name=LAB_SAMPLE_STAGING_TABLE)
+        result = connection.exec_driver_sql(
+            f"INSERT INTO {target} ({columns}) "
+            f"SELECT {columns} FROM {staging} ORDER BY {quote(table.c.id.name)} "
+            "ON CONFLICT ON CONSTRAINT uq_sample_sheet DO NOTHING"
+        )
+        # Dropped now rather than at commit, since a shared session may
+        # stage several batches in one transaction. If a statement above
+        # fails, the rollback discards the table along with the batch.
+        connection.exec_driver_sql(f"DROP TABLE {staging}")
+        
+        return result.rowcount
+    
     def ingest_facilities(self, facilities: Dict[str, Dict[str, Any]]) -> int:
         """
         Ingest facility data.
@@ -32,9 +291,11 @@ class DataIngestion:
         count = 0
         
         with self.db.get_session() as session:
+            existing_facilities = {facility.code: facility for facility in session.query(Facility)}
+            
             for code, facility_data in facilities.items():
                 # Check if exists
-                existing = session.query(Facility).filter_by(code=code).first()
+                existing = existing_facilities.get(code)
                 
                 if existing:
                     # Update
@@ -71,9 +332,11 @@ class DataIngestion:
         canonical_drivers = drivers_data.get('canonical_drivers', {})
         
         with self.db.get_session() as session:
+            existing_drivers = {driver.canonical_name: driver for driver in session.query(Driver)}
+            
             for canonical_name, driver_info in canonical_drivers.items():
                 # Check if exists
-                existing = session.query(Driver).filter_by(canonical_name=canonical_name).first()
+                existing = existing_drivers.get(canonical_name)
                 
                 if existing:
                     # Update
@@ -92,190 +355,264 @@ class DataIngestion:
         
         return count
     
-    def ingest_shipments(self, shipments: List[Dict[str, Any]]) -> int:
+    def ingest_shipments(self, shipments: Iterable[Dict[str, Any]],
+                         session: Session = None,
+                         batch_size: int = INGEST_BATCH_SIZE) -> int:
         """
         Ingest truck shipment data.
         
         Args:
-            shipments: List of shipment records
+            shipments: Shipment records
+            session: Optional shared session (committed by the caller)
+            batch_size: Shipments per insert batch (and per commit when no
+                session is passed)
             
         Returns:
             Number of shipments created
         """
         count = 0
+        owns_session = session is None
         
-        with self.db.get_session() as session:
-            for shipment_data in shipments:
-                # Get or create facility
-                facility_code = shipment_data.get('facility_code')
-                facility = None
-                if facility_code:
-                    facility = session.query(Facility).filter_by(code=facility_code).first()
+        with self._session_scope(session) as session:
+            # One query per lookup table instead of up to three per shipment
+            facility_ids = dict(session.query(Facility.code, Facility.id).all())
+            driver_ids = dict(session.query(Driver.canonical_name, Driver.id).all())
+            truck_ids = dict(session.query(Truck.number, Truck.id).all())
+            
+            for batch in _batches(shipments, batch_size):
+                rows = []
+                # Drivers and trucks first seen in this batch; flushed together below
+                created = []
                 
-                # Get or create driver
-                driver_info = shipment_data.get('driver_info', {})
-                canonical_name = driver_info.get('canonical')
-                driver = None
-                if canonical_name:
-                    driver = session.query(Driver).filter_by(canonical_name=canonical_name).first()
-                    if not driver and not driver_info.get('is_known'):
-                        # Create pending driver
-                        driver = Driver(
-                            canonical_name=canonical_name,
-                            aliases=[driver_info.get('original', '')],
-                            status='pending_review'
-                        )
-                        session.add(driver)
-                        session.flush()
+                for shipment_data in batch:
+                    # Get facility
+                    facility_code = shipment_data.get('facility_code')
+                    facility_id = facility_ids.get(facility_code) if facility_code else None
+                    
+                    # Get or create driver
+                    driver_info = shipment_data.get('driver_info', {})
+                    canonical_name = driver_info.get('canonical')
+                    driver = None
+                    if canonical_name:
+                        driver = driver_ids.get(canonical_name)
+                        if driver is None and not driver_info.get('is_known'):
+                            # Create pending driver
+                            driver = Driver(
+                                canonical_name=canonical_name,
+                                aliases=[driver_info.get('original', '')],
+                                status='pending_review'
+                            )
+                            driver_ids[canonical_name] = driver
+                            created.append(driver)
+                    
+                    # Get or create truck
+                    truck_number = shipment_data.get('truck_number')
+                    truck = None
+                    if truck_number:
+                        truck = truck_ids.get(truck_number)
+                        if truck is None:
+                            truck = Truck(number=truck_number, status='active')
+                            truck_ids[truck_number] = truck
+                            created.append(truck)
+                    
+                    rows.append(dict(
+                        date=shipment_data.get('date', ''),
+                        receipt_number=shipment_data.get('receipt_number'),
+                        tonnage_kg=shipment_data.get('tonnage_kg', 0),
+                        destination=shipment_data.get('destination', ''),
+                        cost_per_ton_rial=shipment_data.get('cost_per_ton_rial', 0),
+                        total_cost_rial=shipment_data.get('total_cost_rial', 0),
+                        notes=shipment_data.get('notes', ''),
+                        facility_id=facility_id,
+                        driver_id=driver,
+                        truck_id=truck
+                    ))
                 
-                # Get or create truck
-                truck_number = shipment_data.get('truck_number')
-                truck = None
-                if truck_number:
-                    truck = session.query(Truck).filter_by(number=truck_number).first()
-                    if not truck:
-                        truck = Truck(number=truck_number, status='active')
-                        session.add(truck)
-                        session.flush()
+                # Insert the new drivers and trucks in one flush, then swap in
+                # their ids for the objects held by the rows and the lookups
+                if created:
+                    session.add_all(created)
+                    session.flush()
+                    for row in rows:
+                        if isinstance(row['driver_id'], Driver):
+                            row['driver_id'] = row['driver_id'].id
+                        if isinstance(row['truck_id'], Truck):
+                            row['truck_id'] = row['truck_id'].id
+                    for record in created:
+                        if isinstance(record, Driver):
+                            driver_ids[record.canonical_name] = record.id
+                        else:
+                            truck_ids[record.number] = record.id
                 
-                # Create shipment
-                shipment = Shipment(
-                    date=shipment_data.get('date', ''),
-                    receipt_number=shipment_data.get('receipt_number'),
-                    tonnage_kg=shipment_data.get('tonnage_kg', 0),
-                    destination=shipment_data.get('destination', ''),
-                    cost_per_ton_rial=shipment_data.get('cost_per_ton_rial', 0),
-                    total_cost_rial=shipment_data.get('total_cost_rial', 0),
-                    notes=shipment_data.get('notes', ''),
-                    facility_id=facility.id if facility else None,
-                    driver_id=driver.id if driver else None,
-                    truck_id=truck.id if truck else None
-                )
-                session.add(shipment)
-                count += 1
+                self._insert_rows(session, Shipment, rows)
+                count += len(rows)
+                self._commit_batch(session, owns_session)
         
         return count
     
-    def ingest_bunker_loads(self, loads: List[Dict[str, Any]]) -> int:
+    def ingest_bunker_loads(self, loads: Iterable[Dict[str, Any]],
+                            session: Session = None,
+                            batch_size: int = INGEST_BATCH_SIZE) -> int:
         """
         Ingest bunker load data.
         
         Args:
-            loads: List of bunker load records
+            loads: Bunker load records
+            session: Optional shared session (committed by the caller)
+            batch_size: Loads per insert batch (and per commit when no
+                session is passed)
             
         Returns:
             Number of loads created
         """
         count = 0
+        owns_session = session is None
         
-        with self.db.get_session() as session:
-            for load_data in loads:
-                # Get facility
-                facility_code = load_data.get('facility_code')
-                facility = None
-                if facility_code:
-                    facility = session.query(Facility).filter_by(code=facility_code).first()
+        with self._session_scope(session) as session:
+            # One query per lookup table instead of two per load
+            facility_ids = dict(session.query(Facility.code, Facility.id).all())
+            driver_ids = dict(session.query(Driver.canonical_name, Driver.id).all())
+            
+            for batch in _batches(loads, batch_size):
+                rows = []
                 
-                # Get or create driver
-                driver_info = load_data.get('driver_info', {})
-                canonical_name = driver_info.get('canonical')
-                driver = None
-                if canonical_name:
-                    driver = session.query(Driver).filter_by(canonical_name=canonical_name).first()
+                for load_data in batch:
+                    # Get facility
+                    facility_code = load_data.get('facility_code')
+                    facility_id = facility_ids.get(facility_code) if facility_code else None
+                    
+                    # Get driver
+                    driver_info = load_data.get('driver_info', {})
+                    canonical_name = driver_info.get('canonical')
+                    driver_id = driver_ids.get(canonical_name) if canonical_name else None
+                    
+                    rows.append(dict(
+                        date=load_data.get('date', ''),
+                        tonnage_kg=load_data.get('tonnage_kg', 0),
+                        cumulative_tonnage_kg=load_data.get('cumulative_tonnage_kg', 0),
+                        transport_cost_rial=load_data.get('transport_cost_rial', 0),
+                        sheet_name=load_data.get('sheet_name', ''),
+                        facility_id=facility_id,
+                        driver_id=driver_id
+                    ))
                 
-                # Create load
-                load = BunkerLoad(
-                    date=load_data.get('date', ''),
-                    tonnage_kg=load_data.get('tonnage_kg', 0),
-                    cumulative_tonnage_kg=load_data.get('cumulative_tonnage_kg', 0),
-                    transport_cost_rial=load_data.get('transport_cost_rial', 0),
-                    sheet_name=load_data.get('sheet_name', ''),
-                    facility_id=facility.id if facility else None,
-                    driver_id=driver.id if driver else None
-                )
-                session.add(load)
-                count += 1
+                self._insert_rows(session, BunkerLoad, rows)
+                count += len(rows)
+                self._commit_batch(session, owns_session)
         
         return count
     
-    def ingest_lab_samples(self, samples: List[Dict[str, Any]]) -> int:
+    def ingest_lab_samples(self, samples: Iterable[Dict[str, Any]],
+                           session: Session = None,
+                           batch_size: int = INGEST_BATCH_SIZE) -> int:
         """
         Ingest lab sample data.
         
         Args:
-            samples: List of lab sample records
+            samples: Lab sample records
+            session: Optional shared session (committed by the caller)
+            batch_size: Samples per insert batch (and per commit when no
+                session is passed)
             
         Returns:
             Number of samples created
         """
         count = 0
+        owns_session = session is None
+        seen = set()
         
-        with self.db.get_session() as session:
-            for sample_data in samples:
-                sample_code = sample_data.get('sample_code', '')
-                sheet_name = sample_data.get('sheet_name', '')
-                
-                # Check if sample already exists with the same code and sheet
-                # This checks both existing DB records and pending inserts in the current session
-                existing = session.query(LabSample).filter_by(
-                    sample_code=sample_code,
-                    sheet_name=sheet_name
-                ).first()
+        with self._session_scope(session) as session:
+            facility_ids = dict(session.query(Facility.code, Facility.id).all())
+            # PostgreSQL skips duplicates itself via ON CONFLICT on uq_sample_sheet
+            on_conflict = session.connection().dialect.name == "postgresql"
+            
+            for batch in _batches(samples, batch_size):
+                rows = []
                 
-                if existing:
-                    # Skip duplicate (same sample code in the same sheet)
-                    continue
+                if not on_conflict:
+                    # (sample_code, sheet_name) pairs already stored, fetched for
+                    # this batch's codes in a few IN queries instead of one per sample
+                    sample_codes = list({sample_data.get('sample_code', '') for sample_data in batch})
+                    for start in range(0, len(sample_codes), LOOKUP_CHUNK_SIZE):
+                        seen.update(
+                            tuple(row) for row in
+                            session.query(LabSample.sample_code, LabSample.sheet_name)
+                            .filter(LabSample.sample_code.in_(sample_codes[start:start + LOOKUP_CHUNK_SIZE]))
+                        )
                 
-                # Get facility
-                facility_code = sample_data.get('facility_code')
-                facility = None
-                if facility_code:
-                    facility = session.query(Facility).filter_by(code=facility_code).first()
+                for sample_data in batch:
+                    sample_code = sample_data.get('sample_code', '')
+                    sheet_name = sample_data.get('sheet_name', '')
+                    
+                    if not on_conflict:
+                        # Skip duplicates (same sample code in the same sheet), both
+                        # within this call and against records already in the DB
+                        key = (sample_code, sheet_name)
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                    
+                    # Get facility
+                    facility_code = sample_data.get('facility_code')
+                    facility_id = facility_ids.get(facility_code) if facility_code else None
+                    
+                    rows.append(dict(
+                        sample_code=sample_code,
+                        sheet_name=sheet_name,
+                        au_ppm=sample_data.get('au_ppm'),
+                        au_detected=sample_data.get('au_detected', True),
+                        below_detection_limit=sample_data.get('below_detection_limit', False),
+                        sample_type=sample_data.get('sample_type', ''),
+                        date=sample_data.get('date', ''),
+                        year=sample_data.get('year', ''),
+                        month=sample_data.get('month', ''),
+                        day=sample_data.get('day', ''),
+                        sample_number=sample_data.get('sample_number', ''),
+                        is_special=sample_data.get('is_special', False),
+                        facility_id=facility_id
+                    ))
                 
-                # Create sample
-                sample = LabSample(
-                    sample_code=sample_code,
-                    sheet_name=sheet_name,
-                    au_ppm=sample_data.get('au_ppm'),
-                    au_detected=sample_data.get('au_detected', True),
-                    below_detection_limit=sample_data.get('below_detection_limit', False),
-                    sample_type=sample_data.get('sample_type', ''),
-                    date=sample_data.get('date', ''),
-                    year=sample_data.get('year', ''),
-                    month=sample_data.get('month', ''),
-                    day=sample_data.get('day', ''),
-                    sample_number=sample_data.get('sample_number', ''),
-                    is_special=sample_data.get('is_special', False),
-                    facility_id=facility.id if facility else None
-                )
-                session.add(sample)
-                # Flush to make this sample visible to subsequent queries in the same transaction
-                session.flush()
-                count += 1
+                if on_conflict:
+                    count += self._insert_lab_samples_on_conflict(session, rows)
+                else:
+                    self._insert_rows(session, LabSample, rows)
+                    count += len(rows)
+                self._commit_batch(session, owns_session)
         
         return count
     
-    def ingest_alerts(self, alerts: List[Dict[str, Any]]) -> int:
+    def ingest_alerts(self, alerts: Iterable[Dict[str, Any]],
+                      session: Session = None,
+                      batch_size: int = INGEST_BATCH_SIZE) -> int:
         """
         Ingest validation alerts.
         
         Args:
-            alerts: List of alert dictionaries
+            alerts: Alert dictionaries
+            session: Optional shared session (committed by the caller)
+            batch_size: Alerts per insert batch (and per commit when no
+                session is passed)
             
         Returns:
             Number of alerts created
         """
         count = 0
+        owns_session = session is None
         
-        with self.db.get_session() as session:
-            for alert_data in alerts:
-                alert = Alert(
-                    level=alert_data.get('level', 'info'),
-                    rule=alert_data.get('rule', ''),
-                    message=alert_data.get('message', ''),
-                    data=alert_data.get('data', {})
-                )
-                session.add(alert)
-                count += 1
+        with self._session_scope(session) as session:
+            for batch in _batches(alerts, batch_size):
+                rows = [
+                    dict(
+                        level=alert_data.get('level', 'info'),
+                        rule=alert_data.get('rule', ''),
+                        message=alert_data.get('message', ''),
+                        data=alert_data.get('data', {})
+                    )
+                    for alert_data in batch
+                ]
+                
+                self._insert_rows(session, Alert, rows)
+                count += len(rows)
+                self._commit_batch(session, owns_session)
         
         return count
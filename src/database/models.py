@@ -74,9 +74,9 @@ class Shipment(Base):
     notes = Column(Text)
     
     # Foreign keys
-    facility_id = Column(Integer, ForeignKey('facilities.id'))
-    driver_id = Column(Integer, ForeignKey('drivers.id'))
-    truck_id = Column(Integer, ForeignKey('trucks.id'))
+    facility_id = Column(Integer, ForeignKey('facilities.id'), index=True)
+    driver_id = Column(Integer, ForeignKey('drivers.id'), index=True)
+    truck_id = Column(Integer, ForeignKey('trucks.id'), index=True)
     
     # Relationships
     facility = relationship("Facility", back_populates="shipments")
@@ -98,8 +98,8 @@ class BunkerLoad(Base):
     sheet_name = Column(String(100))
     
     # Foreign keys
-    facility_id = Column(Integer, ForeignKey('facilities.id'))
-    driver_id = Column(Integer, ForeignKey('drivers.id'))
+    facility_id = Column(Integer, ForeignKey('facilities.id'), index=True)
+    driver_id = Column(Integer, ForeignKey('drivers.id'), index=True)
     
     # Relationships
     facility = relationship("Facility", back_populates="bunker_loads")
@@ -113,7 +113,7 @@ class LabSample(Base):
     __tablename__ = 'lab_samples'
     
     id = Column(Integer, primary_key=True)
-    sample_code = Column(String(50), nullable=False, index=True)
+    sample_code = Column(String(50), nullable=False)
     sheet_name = Column(String(100))
     
     # Gold content
@@ -123,7 +123,7 @@ class LabSample(Base):
     
     # Parsed sample code fields
     sample_type = Column(String(50))  # K, L, T, CR, RC - widened from 10 to 50
-    date = Column(String(10))  # Jalali date YYYY/MM/DD
+    date = Column(String(10), index=True)  # Jalali date YYYY/MM/DD
     year = Column(String(4))
     month = Column(String(2))
     day = Column(String(2))
@@ -131,7 +131,7 @@ class LabSample(Base):
     is_special = Column(Boolean, default=False)
     
     # Foreign key
-    facility_id = Column(Integer, ForeignKey('facilities.id'))
+    facility_id = Column(Integer, ForeignKey('facilities.id'), index=True)
     
     # Relationships
     facility = relationship("Facility", back_populates="lab_samples")
@@ -155,7 +155,7 @@ class TransportCost(Base):
     valid_to = Column(String(10))  # Jalali date
     
     # Optional facility-specific costs
-    facility_id = Column(Integer, ForeignKey('facilities.id'))
+    facility_id = Column(Integer, ForeignKey('facilities.id'), index=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -171,7 +171,7 @@ class Payment(Base):
     notes = Column(Text)
     
     # Foreign key
-    driver_id = Column(Integer, ForeignKey('drivers.id'))
+    driver_id = Column(Integer, ForeignKey('drivers.id'), index=True)
     
     # Relationships
     driver = relationship("Driver", back_populates="payments")
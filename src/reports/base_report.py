@@ -3,8 +3,9 @@ Base report generator - supports both PDF and Markdown output.
 """
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
 from datetime import datetime
 
 try:
@@ -19,6 +20,22 @@ try:
 except ImportError:
     REPORTLAB_AVAILABLE = False
 
+# Records per PDF table; long record lists are split into several tables
+RECORD_TABLE_ROWS = 50
+
+if REPORTLAB_AVAILABLE:
+    # Page width inside SimpleDocTemplate's default one-inch margins
+    RECORD_TABLE_WIDTH = A4[0] - 2 * inch
+    
+    # Bold shaded header and grid shared by the record tables of PDF reports
+    RECORD_TABLE_STYLE = TableStyle([
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
+    ])
+
 
 class BaseReport(ABC):
     """Base class for all report generators."""
@@ -103,6 +120,20 @@ class BaseReport(ABC):
         
         return str(output_path)
     
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _pdf_styles():
+        """
+        Return reportlab's sample stylesheet, built once per process.
+        
+        The stylesheet is shared by every report, so callers must not
+        modify its styles.
+        
+        Returns:
+            reportlab StyleSheet1
+        """
+        return getSampleStyleSheet()
+    
     def _build_pdf_story(self, data: Dict[str, Any]) -> list:
         """
         Build PDF story from data.
@@ -114,7 +145,7 @@ class BaseReport(ABC):
             List of reportlab elements
         """
         story = []
-        styles = getSampleStyleSheet()
+        styles = self._pdf_styles()
         
         # Title
         title = data.get('title', 'Report')
@@ -126,7 +157,27 @@ class BaseReport(ABC):
         story.append(Paragraph(f"Date: {date_str}", styles['Normal']))
         story.append(Spacer(1, 0.3 * inch))
         
-        # Content - subclasses should override this
+        story.extend(self.build_pdf_tables(data))
+        
+        return story
+    
+    def build_pdf_tables(self, data: Dict[str, Any]) -> list:
+        """
+        Build the PDF body below the title and date.
+        
+        The default renders format_markdown() one Paragraph per line;
+        reports with record lists should override this and emit Table
+        flowables built straight from data.
+        
+        Args:
+            data: Report data
+            
+        Returns:
+            List of reportlab elements
+        """
+        styles = self._pdf_styles()
+        story = []
+        
         content = self.format_markdown(data)
         for line in content.split('\n'):
             if line.strip():
@@ -135,6 +186,30 @@ class BaseReport(ABC):
         
         return story
     
+    @staticmethod
+    def _records_tables(header: List[str], rows: List[List[Any]]) -> list:
+        """
+        Build PDF tables for a list of records.
+        
+        Records are split into tables of RECORD_TABLE_ROWS, each with the
+        header, since reportlab re-measures a long table every time it
+        splits it across a page. Columns share the page width equally so
+        the pieces line up.
+        
+        Args:
+            header: Column titles
+            rows: Cell values per record
+            
+        Returns:
+            List of reportlab Tables
+        """
+        col_widths = [RECORD_TABLE_WIDTH / len(header)] * len(header)
+        return [
+            Table([header] + rows[start:start + RECORD_TABLE_ROWS],
+                  colWidths=col_widths, style=RECORD_TABLE_STYLE)
+            for start in range(0, len(rows), RECORD_TABLE_ROWS)
+        ]
+    
     def generate_both(self, base_filename: str, **kwargs) -> Dict[str, str]:
         """
         Generate both PDF and Markdown versions.
@@ -5,7 +5,10 @@ Daily operations report - trucks, bunkers, samples for the day.
 from typing import Any, Dict, List
 from datetime import datetime
 
-from src.reports.base_report import BaseReport
+from src.reports.base_report import REPORTLAB_AVAILABLE, BaseReport
+
+if REPORTLAB_AVAILABLE:
+    from reportlab.platypus import Paragraph
 
 
 class DailyOpsReport(BaseReport):
@@ -34,27 +37,39 @@ class DailyOpsReport(BaseReport):
         bunker_loads = bunker_loads or []
         lab_samples = lab_samples or []
         
-        # Filter to target date
-        day_shipments = [s for s in shipments if s.get('date') == date]
-        day_loads = [b for b in bunker_loads if b.get('date') == date]
-        day_samples = [s for s in lab_samples if s.get('date') == date]
+        # One pass per list: filter to the target date and total by facility
+        by_facility = {
+            code: {'shipments': 0, 'shipped_kg': 0, 'loads': 0, 'loaded_kg': 0}
+            for code in ['A', 'B', 'C']
+        }
         
-        # Calculate statistics
-        total_shipped_kg = sum(s.get('tonnage_kg', 0) for s in day_shipments)
-        total_loaded_kg = sum(b.get('tonnage_kg', 0) for b in day_loads)
+        day_shipments = []
+        total_shipped_kg = 0
+        for shipment in shipments:
+            if shipment.get('date') != date:
+                continue
+            day_shipments.append(shipment)
+            tonnage = shipment.get('tonnage_kg', 0)
+            total_shipped_kg += tonnage
+            facility = by_facility.get(shipment.get('facility_code'))
+            if facility is not None:
+                facility['shipments'] += 1
+                facility['shipped_kg'] += tonnage
         
-        # By facility
-        by_facility = {}
-        for code in ['A', 'B', 'C']:
-            facility_shipments = [s for s in day_shipments if s.get('facility_code') == code]
-            facility_loads = [b for b in day_loads if b.get('facility_code') == code]
-            
-            by_facility[code] = {
-                'shipments': len(facility_shipments),
-                'shipped_kg': sum(s.get('tonnage_kg', 0) for s in facility_shipments),
-                'loads': len(facility_loads),
-                'loaded_kg': sum(b.get('tonnage_kg', 0) for b in facility_loads)
-            }
+        day_loads = []
+        total_loaded_kg = 0
+        for load in bunker_loads:
+            if load.get('date') != date:
+                continue
+            day_loads.append(load)
+            tonnage = load.get('tonnage_kg', 0)
+            total_loaded_kg += tonnage
+            facility = by_facility.get(load.get('facility_code'))
+            if facility is not None:
+                facility['loads'] += 1
+                facility['loaded_kg'] += tonnage
+        
+        day_samples = [s for s in lab_samples if s.get('date') == date]
         
         return {
             'title': f'Daily Operations Report - {date}',
@@ -78,54 +93,138 @@ class DailyOpsReport(BaseReport):
     
     def format_markdown(self, data: Dict[str, Any]) -> str:
         """Format daily operations report as Markdown."""
-        md = f"# {data['title']}\n\n"
-        md += f"**Date:** {data['date']}\n\n"
-        
-        # Summary
-        md += "## Summary\n\n"
-        md += f"- **Truck Shipments:** {data['shipments']['count']} ({data['shipments']['total_kg']:,.0f} kg)\n"
-        md += f"- **Bunker Loads:** {data['bunker_loads']['count']} ({data['bunker_loads']['total_kg']:,.0f} kg)\n"
-        md += f"- **Lab Samples:** {data['lab_samples']['count']}\n\n"
-        
-        # By Facility
-        md += "## By Facility\n\n"
+        # Collected as parts and joined once, so long tables stay linear
+        parts = [
+            f"# {data['title']}\n\n",
+            f"**Date:** {data['date']}\n\n",
+            
+            # Summary
+            "## Summary\n\n",
+            f"- **Truck Shipments:** {data['shipments']['count']} ({data['shipments']['total_kg']:,.0f} kg)\n",
+            f"- **Bunker Loads:** {data['bunker_loads']['count']} ({data['bunker_loads']['total_kg']:,.0f} kg)\n",
+            f"- **Lab Samples:** {data['lab_samples']['count']}\n\n",
+            
+            # By Facility
+            "## By Facility\n\n"
+        ]
         facility_names = {'A': 'Hejazian', 'B': 'Shen Beton', 'C': 'Kavian'}
         
         for code, name in facility_names.items():
             facility_data = data['by_facility'][code]
-            md += f"### {name} (Facility {code})\n\n"
-            md += f"- Shipments: {facility_data['shipments']} ({facility_data['shipped_kg']:,.0f} kg)\n"
-            md += f"- Bunker Loads: {facility_data['loads']} ({facility_data['loaded_kg']:,.0f} kg)\n\n"
+            parts.append(f"### {name} (Facility {code})\n\n")
+            parts.append(f"- Shipments: {facility_data['shipments']} ({facility_data['shipped_kg']:,.0f} kg)\n")
+            parts.append(f"- Bunker Loads: {facility_data['loads']} ({facility_data['loaded_kg']:,.0f} kg)\n\n")
         
         # Detailed Tables
-        md += "## Truck Shipments\n\n"
+        parts.append("## Truck Shipments\n\n")
         if data['shipments']['records']:
-            md += "| Truck | Destination | Tonnage (kg) | Cost (Rial) |\n"
-            md += "|-------|-------------|--------------|-------------|\n"
-            for s in data['shipments']['records']:
-                md += f"| {s.get('truck_number', 'N/A')} | {s.get('destination', 'N/A')} | "
-                md += f"{s.get('tonnage_kg', 0):,.0f} | {s.get('total_cost_rial', 0):,.0f} |\n"
+            parts.append("| Truck | Destination | Tonnage (kg) | Cost (Rial) |\n")
+            parts.append("|-------|-------------|--------------|-------------|\n")
+            parts.extend(
+                f"| {s.get('truck_number', 'N/A')} | {s.get('destination', 'N/A')} | "
+                f"{s.get('tonnage_kg', 0):,.0f} | {s.get('total_cost_rial', 0):,.0f} |\n"
+                for s in data['shipments']['records']
+            )
         else:
-            md += "*No shipments on this date.*\n"
+            parts.append("*No shipments on this date.*\n")
         
-        md += "\n## Bunker Loads\n\n"
+        parts.append("\n## Bunker Loads\n\n")
         if data['bunker_loads']['records']:
-            md += "| Facility | Tonnage (kg) | Driver |\n"
-            md += "|----------|--------------|--------|\n"
+            parts.append("| Facility | Tonnage (kg) | Driver |\n")
+            parts.append("|----------|--------------|--------|\n")
             for b in data['bunker_loads']['records']:
                 driver = b.get('driver_info', {}).get('canonical', 'N/A')
-                md += f"| {b.get('facility_code', 'N/A')} | {b.get('tonnage_kg', 0):,.0f} | {driver} |\n"
+                parts.append(f"| {b.get('facility_code', 'N/A')} | {b.get('tonnage_kg', 0):,.0f} | {driver} |\n")
         else:
-            md += "*No bunker loads on this date.*\n"
+            parts.append("*No bunker loads on this date.*\n")
         
-        md += "\n## Lab Samples\n\n"
+        parts.append("\n## Lab Samples\n\n")
         if data['lab_samples']['records']:
-            md += "| Sample Code | Type | Au (ppm) |\n"
-            md += "|-------------|------|----------|\n"
+            parts.append("| Sample Code | Type | Au (ppm) |\n")
+            parts.append("|-------------|------|----------|\n")
             for s in data['lab_samples']['records']:
                 au_str = f"{s.get('au_ppm', 0):.3f}" if s.get('au_detected') else "< DL"
-                md += f"| {s.get('sample_code', 'N/A')} | {s.get('sample_type', 'N/A')} | {au_str} |\n"
+                parts.append(f"| {s.get('sample_code', 'N/A')} | {s.get('sample_type', 'N/A')} | {au_str} |\n")
+        else:
+            parts.append("*No samples on this date.*\n")
+        
+        return "".join(parts)
+    
+    def build_pdf_tables(self, data: Dict[str, Any]) -> list:
+        """
+        Build the PDF body with tables built from the record lists.
+        
+        Args:
+            data: Report data from generate_data()
+            
+        Returns:
+            List of reportlab elements
+        """
+        styles = self._pdf_styles()
+        heading = styles['Heading2']
+        normal = styles['Normal']
+        facility_names = {'A': 'Hejazian', 'B': 'Shen Beton', 'C': 'Kavian'}
+        
+        facility_rows = []
+        for code, name in facility_names.items():
+            facility_data = data['by_facility'][code]
+            facility_rows.append([
+                f"{name} ({code})",
+                facility_data['shipments'], f"{facility_data['shipped_kg']:,.0f}",
+                facility_data['loads'], f"{facility_data['loaded_kg']:,.0f}"
+            ])
+        
+        story = [
+            Paragraph("Summary", heading),
+            Paragraph(f"Truck Shipments: {data['shipments']['count']} ({data['shipments']['total_kg']:,.0f} kg)", normal),
+            Paragraph(f"Bunker Loads: {data['bunker_loads']['count']} ({data['bunker_loads']['total_kg']:,.0f} kg)", normal),
+            Paragraph(f"Lab Samples: {data['lab_samples']['count']}", normal),
+            
+            Paragraph("By Facility", heading),
+            *self._records_tables(
+                ['Facility', 'Shipments', 'Shipped (kg)', 'Bunker Loads', 'Loaded (kg)'],
+                facility_rows
+            ),
+            
+            Paragraph("Truck Shipments", heading)
+        ]
+        
+        if data['shipments']['records']:
+            story.extend(self._records_tables(
+                ['Truck', 'Destination', 'Tonnage (kg)', 'Cost (Rial)'],
+                [
+                    [s.get('truck_number', 'N/A'), s.get('destination', 'N/A'),
+                     f"{s.get('tonnage_kg', 0):,.0f}", f"{s.get('total_cost_rial', 0):,.0f}"]
+                    for s in data['shipments']['records']
+                ]
+            ))
+        else:
+            story.append(Paragraph("No shipments on this date.", normal))
+        
+        story.append(Paragraph("Bunker Loads", heading))
+        if data['bunker_loads']['records']:
+            story.extend(self._records_tables(
+                ['Facility', 'Tonnage (kg)', 'Driver'],
+                [
+                    [b.get('facility_code', 'N/A'), f"{b.get('tonnage_kg', 0):,.0f}",
+                     b.get('driver_info', {}).get('canonical', 'N/A')]
+                    for b in data['bunker_loads']['records']
+                ]
+            ))
+        else:
+            story.append(Paragraph("No bunker loads on this date.", normal))
+        
+        story.append(Paragraph("Lab Samples", heading))
+        if data['lab_samples']['records']:
+            story.extend(self._records_tables(
+                ['Sample Code', 'Type', 'Au (ppm)'],
+                [
+                    [s.get('sample_code', 'N/A'), s.get('sample_type', 'N/A'),
+                     f"{s.get('au_ppm', 0):.3f}" if s.get('au_detected') else "< DL"]
+                    for s in data['lab_samples']['records']
+                ]
+            ))
         else:
-            md += "*No samples on this date.*\n"
+            story.append(Paragraph("No samples on this date.", normal))
         
-        return md
+        return story
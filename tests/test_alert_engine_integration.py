@@ -18,7 +18,7 @@ from src.core.validator import ValidationAlert, AlertLevel
 class TestAlertEngineIntegration:
     """Test alert engine integration with notifiers."""
     
-    @patch('src.alerts.telegram_notifier.requests.post')
+    @patch('src.alerts.telegram_notifier.requests.Session.post')
     def test_process_and_send_calls_send_summary(self, mock_post):
         """Test that process_and_send calls send_summary on telegram notifier."""
         mock_response = Mock()
@@ -72,3 +72,33 @@ class TestAlertEngineIntegration:
         # but send_summary should not be called (because notifier doesn't have it)
         # This should not raise any errors
         assert summary['total_alerts'] == 0
+    
+    def test_process_and_send_returns_alerts(self):
+        """Test that the summary carries the generated alert objects."""
+        engine = AlertEngine()
+        
+        samples = [
+            {
+                'sample_code': 'A 1404 10 14 K1',
+                'au_ppm': 25.0,
+                'sample_type': 'K'
+            }
+        ]
+        
+        summary = engine.process_and_send(samples=samples)
+        
+        assert len(summary['alerts']) == summary['total_alerts']
+        assert all(isinstance(a, ValidationAlert) for a in summary['alerts'])
+        assert summary['alerts'][0].rule == 'ore_input_critical'
+    
+    def test_process_and_send_skips_summaries_without_input(self):
+        """Test that empty input returns early without notifier summaries."""
+        notifier = Mock()
+        
+        engine = AlertEngine()
+        engine.add_notifier(notifier)
+        
+        summary = engine.process_and_send(shipments=[], samples=None)
+        
+        assert summary == {"total_alerts": 0, "by_level": {}, "by_rule": {}, "alerts": []}
+        notifier.send_summary.assert_not_called()
@@ -2,6 +2,7 @@
 Tests for data converters.
 """
 
+import os
 import pytest
 import sys
 from pathlib import Path
@@ -11,6 +12,9 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from src.core.base_converter import BaseConverter
 from src.converters.assay_converter import AssayConverter
+from src.converters.bunker_converter import BunkerConverter
+from src.converters.finance_converter import FinanceConverter
+from src.converters.trucking_converter import TruckingConverter
 from src.core.linker import SampleCodeParser
 
 
@@ -22,6 +26,14 @@ class TestBaseConverter:
         assert BaseConverter.clean_persian_number("1,234.56") == "1234.56"
         assert BaseConverter.clean_persian_number("1234/56") == "1234.56"
         assert BaseConverter.clean_persian_number("1,234,567") == "1234567"
+        assert BaseConverter.clean_persian_number("۲۴,۵۰۰/۵") == "24500.5"
+    
+    def test_parse_number_column(self):
+        """Test batch number parsing, with 0 for empty or invalid values."""
+        values = [24500, "24,500", "24/5", 27800.5, None, "", "n/a"]
+        assert BaseConverter.parse_number_column(values) == [
+            24500.0, 24500.0, 24.5, 27800.5, 0, 0, 0
+        ]
     
     def test_normalize_date(self):
         """Test date normalization."""
@@ -29,17 +41,171 @@ class TestBaseConverter:
         assert BaseConverter.normalize_date("1404/10/1") == "1404/10/01"
         assert BaseConverter.normalize_date("1404/09/09") == "1404/09/09"
     
+    def test_normalize_date_column(self):
+        """Test column date normalization, with "" for empty values."""
+        values = ["1404/9/09", None, "1404/9/09", "1404/10/1", "", "14041001"]
+        assert BaseConverter.normalize_date_column(values) == [
+            "1404/09/09", "", "1404/09/09", "1404/10/01", "", "14041001"
+        ]
+    
     def test_clean_truck_number(self):
         """Test truck number cleaning."""
         assert BaseConverter.clean_truck_number("14978.0") == "14978"
         assert BaseConverter.clean_truck_number("14978") == "14978"
         assert BaseConverter.clean_truck_number(14978.0) == "14978"
     
+    def test_filter_data_rows(self):
+        """Test that summary and null rows are dropped like the scalar predicates do."""
+        records = [
+            {"row_number": 1, "tonnage_kg": 24500},
+            {"row_number": None, "تاریخ": "جمع", "tonnage_kg": 98000},
+            {"row_number": None, "tonnage_kg": "  "},
+            {"row_number": 0, "driver": None},
+            None
+        ]
+        
+        expected = [
+            r for r in records
+            if not (BaseConverter.is_summary_row(r) or BaseConverter.is_null_row(r))
+        ]
+        assert BaseConverter.filter_data_rows(records) == expected
+        assert [r["row_number"] for r in expected] == [1, 0]
+    
     def test_calculate_cost(self):
         """Test cost calculation (per ton, not per kg)."""
         # 25,000 kg = 25 tons
         # 25 tons * 7,000,000 Rial/ton = 175,000,000 Rial
         assert BaseConverter.calculate_cost(25000, 7000000) == 175000000
+        assert BaseConverter.calculate_cost_column([25000, 0], [7000000, 7000000]).tolist() == [175000000.0, 0.0]
+    
+    def test_canonicalize_driver_name_aliases(self):
+        """Test driver aliases resolve to their canonical name via the registry."""
+        converter = BaseConverter(str(Path(__file__).parent.parent / "config"))
+        
+        result = converter.canonicalize_driver_name(" کریم ابادی ")
+        assert result == {
+            "original": "کریم ابادی",
+            "canonical": "ابوالفضل کریم آبادی",
+            "is_known": True,
+            "status": "active"
+        }
+        
+        unknown = converter.canonicalize_driver_name("راننده جدید")
+        assert unknown["canonical"] == "راننده جدید"
+        assert unknown["is_known"] is False
+        assert unknown["status"] == "pending_review"
+    
+    def test_configs_shared_between_instances(self, tmp_path):
+        """Test config files are parsed once and re-read after an edit."""
+        facilities = tmp_path / "facilities.json"
+        facilities.write_text('{"A": {"name_en": "First"}}', encoding="utf-8")
+        
+        first = BaseConverter(str(tmp_path))
+        second = BaseConverter(str(tmp_path))
+        assert first.facilities is second.facilities
+        assert first.drivers == {}
+        
+        facilities.write_text('{"A": {"name_en": "Second"}}', encoding="utf-8")
+        os.utime(facilities, ns=(0, facilities.stat().st_mtime_ns + 1_000_000))
+        assert BaseConverter(str(tmp_path)).facilities["A"]["name_en"] == "Second"
+
+
+class TestBunkerConverter:
+    """Test bunker converter."""
+    
+    def test_statistics_grouped_by_facility(self):
+        """Test per-facility statistics, including a sheet with no loads."""
+        converter = BunkerConverter(str(Path(__file__).parent.parent / "config"))
+        input_data = {
+            "رباط سفید": [
+                {"row_number": 1, "tonnage_kg": "24,500"},
+                {"row_number": 2, "tonnage_kg": 25000},
+                {"row_number": "جمع", "tonnage_kg": 49500}
+            ],
+            "شن بتن": [{"row_number": None, "tonnage_kg": None}]
+        }
+        
+        statistics = converter.convert(input_data)["statistics"]
+        
+        assert statistics["total_loads"] == 2
+        assert statistics["total_tonnage_kg"] == 49500.0
+        assert statistics["by_facility"]["A"]["load_count"] == 2
+        assert statistics["by_facility"]["A"]["total_tonnage_kg"] == 49500.0
+        assert statistics["by_facility"]["B"]["load_count"] == 0
+        assert statistics["by_facility"]["B"]["total_tonnage_kg"] == 0
+
+
+class TestTruckingConverter:
+    """Test trucking converter."""
+    
+    def test_stream_to_file_matches_convert(self, tmp_path):
+        """Test that streaming a JSON array in small batches matches convert()."""
+        from src.core import fastjson
+        
+        converter = TruckingConverter(str(Path(__file__).parent.parent / "config"))
+        records = [
+            {"row_number": 1, "truck_number": "14978", "tonnage_kg": "25,000",
+             "destination": "رباط سفید", "cost_per_ton": 7000000, "driver_name": "کریم ابادی"},
+            {"row_number": "جمع", "tonnage_kg": 25000},
+            {"row_number": 2, "truck_number": "14979", "tonnage_kg": 28000,
+             "destination": "شن بتن مشهد", "cost_per_ton": 8500000}
+        ]
+        input_file = tmp_path / "trucking.json"
+        fastjson.dump_file(input_file, records)
+        output_file = tmp_path / "shipments.json"
+        
+        streamed = converter.stream_to_file(fastjson.iter_load_array(input_file), str(output_file), chunk_size=1)
+        expected = converter.convert(records)
+        
+        assert streamed["statistics"] == expected["statistics"]
+        assert streamed["statistics"]["total_shipments"] == 2
+        assert fastjson.load_file(output_file) == expected
+
+
+class TestFinanceConverter:
+    """Test finance converter."""
+    
+    def test_aggregate_transport_costs(self):
+        """Test totals include records without a facility, groups skip them."""
+        converter = FinanceConverter(str(Path(__file__).parent.parent / "config"))
+        shipments = [
+            {"facility_code": "A", "total_cost_rial": 100.0},
+            {"facility_code": None, "total_cost_rial": 50.0},
+            {"facility_code": "A", "total_cost_rial": 25.0}
+        ]
+        bunker_loads = [{"facility_code": "C", "transport_cost_rial": 10.0}]
+        
+        result = converter.aggregate_transport_costs(shipments, bunker_loads)
+        
+        assert result["mine_to_grinding"] == {
+            "total_cost_rial": 175.0,
+            "by_facility": {"A": {"shipment_count": 2, "total_cost_rial": 125.0}}
+        }
+        assert result["grinding_to_factory"]["by_facility"] == {"C": {"load_count": 1, "total_cost_rial": 10.0}}
+        assert result["total_transport_cost_rial"] == 185.0
+        assert converter.aggregate_transport_costs([], [])["total_transport_cost_rial"] == 0
+    
+    def test_driver_balances(self):
+        """Test owed/paid pivot per driver, in first-seen order."""
+        converter = FinanceConverter(str(Path(__file__).parent.parent / "config"))
+        result = converter.convert_payment_records([
+            {"driver": "راننده جدید", "amount": "100", "type": "paid"},
+            {"driver": "کریم ابادی", "amount": "1,000", "type": "Owed"},
+            {"driver": "ابوالفضل کریم آبادی", "amount": "250", "type": "paid"},
+            {"driver": "", "amount": 500},
+            {"driver": None, "amount": None}
+        ])
+        
+        assert result["driver_balances"] == {
+            "راننده جدید": {"total_owed": 0.0, "total_paid": 100.0, "balance": -100.0},
+            "ابوالفضل کریم آبادی": {"total_owed": 1000.0, "total_paid": 250.0, "balance": 750.0}
+        }
+        assert list(result["driver_balances"]) == ["راننده جدید", "ابوالفضل کریم آبادی"]
+        assert result["statistics"] == {
+            "total_payments": 4,
+            "total_owed_rial": 1500.0,
+            "total_paid_rial": 350.0
+        }
 
 
 class TestSampleCodeParser:
@@ -60,6 +226,23 @@ class TestSampleCodeParser:
         assert result['sample_number'] == '2'
         assert result['is_special'] is False
     
+    def test_parse_returns_independent_copies(self):
+        """Test that mutating a parse result doesn't leak into the cache."""
+        parser = SampleCodeParser()
+        first = parser.parse("SR2")
+        first["facility"] = "A"
+        
+        assert parser.parse("SR2")["facility"] is None
+        assert parser.parse("C 1404 10 14 K2") is not parser.parse("C 1404 10 14 K2")
+    
+    def test_parse_result_keys(self):
+        """Test parse results keep their per-format keys."""
+        parser = SampleCodeParser()
+        
+        assert list(parser.parse("SR2")) == ['facility', 'date', 'sample_type', 'is_special']
+        assert 'prefix' not in parser.parse("C 1404 10 14 K2")
+        assert list(parser.parse("A1404105L"))[:2] == ['facility', 'prefix']
+    
     def test_sample_code_with_two_letter_type(self):
         """Test parsing sample code with two-letter type (CR, RC)."""
         parser = SampleCodeParser()
@@ -226,6 +409,43 @@ class TestAssayConverter:
         result = AssayConverter._parse_sample_code("SR2")
         assert result['is_special'] is True
         assert result['sample_type'] == 'SR2'
+    
+    def test_parallel_sheet_conversion_matches_serial(self, monkeypatch):
+        """Test that converting sheets in worker processes gives the same result."""
+        from src.converters import assay_converter
+        
+        converter = AssayConverter(str(Path(__file__).parent.parent / "config"))
+        input_data = {
+            "Solutions": [{"sample_code": "A 1404 10 14 K1", "au_ppm": "1.25"}] * 3,
+            "Solids": [{"Samole": "RC14041010", "au_ppm": "<0.05"}] * 2,
+            "Carbon": [{"sample_code": "F2(T3)", "au_ppm": 3}]
+        }
+        serial = converter.convert(input_data)
+        
+        monkeypatch.setattr(assay_converter, "PARALLEL_MIN_RECORDS", 0)
+        monkeypatch.setattr(assay_converter.os, "cpu_count", lambda: 3)
+        parallel = converter.convert(input_data)
+        
+        assert parallel == serial
+    
+    def test_stream_to_file_matches_convert(self, tmp_path):
+        """Test that streamed output and statistics match convert()."""
+        from src.core import fastjson
+        
+        converter = AssayConverter(str(Path(__file__).parent.parent / "config"))
+        input_data = {
+            "Solutions": [{"sample_code": "A 1404 10 14 K1", "au_ppm": "1.25"},
+                          {"sample_code": "A 1404 10 14 K1", "au_ppm": 0.75}],
+            "Solids": [{"sample_code": "RC14041010", "au_ppm": "<0.05"}]
+        }
+        output_file = tmp_path / "lab.json"
+        
+        streamed = converter.stream_to_file(input_data, str(output_file))
+        expected = converter.convert(input_data)
+        
+        assert streamed["statistics"] == expected["statistics"]
+        assert streamed["statistics"]["by_type"]["K"]["average_au_ppm"] == 1.0
+        assert fastjson.load_file(output_file) == expected
 
 
 if __name__ == "__main__":
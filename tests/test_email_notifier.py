@@ -0,0 +1,84 @@
+"""
+Tests for email notification system.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.alerts.email_notifier import EmailNotifier
+from src.core.validator import ValidationAlert, AlertLevel
+
+
+class TestEmailNotifier:
+    """Test email notifier functionality."""
+    
+    @pytest.fixture
+    def notifier(self):
+        """Create a fully configured email notifier."""
+        return EmailNotifier(
+            smtp_host="smtp.test",
+            smtp_port=587,
+            username="user",
+            password="secret",
+            from_addr="ops@test",
+            to_addrs=["team@test"]
+        )
+    
+    @patch('src.alerts.email_notifier.smtplib.SMTP')
+    def test_connection_reused_across_sends(self, mock_smtp, notifier):
+        """Test that several alerts share one SMTP connection and login."""
+        server = mock_smtp.return_value
+        server.noop.return_value = (250, b'OK')
+        
+        alert = ValidationAlert(AlertLevel.CRITICAL, 'ore_input_critical', 'High grade', {'au_ppm': 25.0})
+        with notifier:
+            notifier.send_alert(alert)
+            notifier.send_alert(alert)
+            notifier.send_digest([alert])
+        
+        mock_smtp.assert_called_once_with("smtp.test", 587)
+        server.login.assert_called_once_with("user", "secret")
+        assert server.send_message.call_count == 3
+        server.quit.assert_called_once()
+    
+    @patch('src.alerts.email_notifier.smtplib.SMTP')
+    def test_reconnects_when_connection_dropped(self, mock_smtp, notifier):
+        """Test that a failed NOOP triggers a fresh connection."""
+        server = mock_smtp.return_value
+        server.noop.return_value = (421, b'Closing')
+        
+        alert = ValidationAlert(AlertLevel.CRITICAL, 'ore_input_critical', 'High grade', {})
+        notifier.send_alert(alert)
+        notifier.send_alert(alert)
+        
+        assert mock_smtp.call_count == 2
+        assert server.login.call_count == 2
+    
+    @patch('src.alerts.email_notifier.smtplib.SMTP')
+    def test_digest_skipped_below_min_level(self, mock_smtp, notifier):
+        """Test that a digest of only INFO alerts sends nothing."""
+        notifier.send_digest([ValidationAlert(AlertLevel.INFO, 'note', 'FYI', {})])
+        
+        mock_smtp.assert_not_called()
+    
+    def test_format_digest_escapes_html(self):
+        """Test that alert text is HTML-escaped in the digest."""
+        alerts = [
+            ValidationAlert(AlertLevel.WARNING, 'tonnage', 'Tonnage <500 & rising', {}),
+            ValidationAlert(AlertLevel.CRITICAL, 'ore_input_critical', 'عیار بالا', {})
+        ]
+        
+        html = EmailNotifier._format_digest(alerts)
+        
+        assert 'Tonnage &lt;500 &amp; rising' in html
+        assert '<h2>WARNING (1)</h2>' in html
+        assert 'عیار بالا' in html
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,75 @@
+"""
+Tests for fast JSON helpers.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.core import fastjson
+
+
+class TestFastJson:
+    """Test JSON load/dump helpers."""
+    
+    def test_round_trip_persian_text(self, tmp_path):
+        """Test that Persian text survives a dump/load round trip unescaped."""
+        data = {"رباط سفید": [{"driver": "محمد احمدآبادی", "tonnage_kg": 24500.5}]}
+        output_file = tmp_path / "out.json"
+        
+        fastjson.dump_file(output_file, data)
+        
+        assert fastjson.load_file(output_file) == data
+        assert "محمد احمدآبادی" in output_file.read_text(encoding='utf-8')
+    
+    def test_dumps_is_indented_bytes(self):
+        """Test that dumps returns indented UTF-8 bytes."""
+        result = fastjson.dumps({"a": [1, 2]})
+        
+        assert isinstance(result, bytes)
+        assert b'\n  "a"' in result
+    
+    def test_loads_accepts_str_and_bytes(self):
+        """Test that loads accepts both str and bytes input."""
+        assert fastjson.loads('{"a": 1}') == {"a": 1}
+        assert fastjson.loads(b'{"a": 1}') == {"a": 1}
+    
+    def test_dump_jsonl_file_one_record_per_line(self, tmp_path):
+        """Test that JSON Lines output has one parseable record per line."""
+        records = [{"level": "critical", "message": "عیار بالا"}, {"level": "info", "data": {}}]
+        output_file = tmp_path / "alerts.jsonl"
+        
+        fastjson.dump_jsonl_file(output_file, records)
+        
+        lines = output_file.read_bytes().splitlines()
+        assert [fastjson.loads(line) for line in lines] == records
+    
+    def test_iter_load_prefix_nested_sheets(self, tmp_path):
+        """Test that a dotted prefix reaches into nested arrays."""
+        data = {"metadata": {}, "sheets": [{"sheet_name": "A", "data": [{"x": 1.5}]},
+                                           {"sheet_name": "B", "data": []}]}
+        input_file = tmp_path / "nested.json"
+        fastjson.dump_file(input_file, data)
+        
+        assert list(fastjson.iter_load_prefix(input_file, "sheets.item")) == data["sheets"]
+        assert list(fastjson.iter_load_prefix(input_file, "sheets.item.sheet_name")) == ["A", "B"]
+    
+    def test_has_root_array(self, tmp_path):
+        """Test that only a top-level array under the key is detected."""
+        cases = {
+            "nested.json": ({"metadata": {}, "sheets": []}, True),
+            "flat.json": ({"Sheet1": [{"sheets": []}]}, False),
+            "object.json": ({"sheets": {"A": []}}, False),
+            "array.json": ([{"sheets": []}], False),
+        }
+        for name, (data, expected) in cases.items():
+            input_file = tmp_path / name
+            fastjson.dump_file(input_file, data)
+            assert fastjson.has_root_array(input_file, "sheets") is expected, name
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
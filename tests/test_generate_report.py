@@ -0,0 +1,50 @@
+"""
+Tests for the report script's processed-data cache.
+"""
+
+import pickle
+import pytest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scripts.generate_report import load_cached_json
+
+
+class TestLoadCachedJson:
+    """Test the mtime-keyed pickle sidecar."""
+    
+    @pytest.mark.parametrize('sidecar', [
+        b'not a pickle',
+        pickle.dumps({'mtime_ns': 0})[:5],
+        pickle.dumps(['not', 'a', 'dict']),
+        # References os.Nope, which doesn't exist
+        b'\x80\x04\x8c\x02os\x94\x8c\x04Nope\x94\x93\x94.',
+        # References a module that doesn't exist
+        b'\x80\x04\x8c\x0eno_such_module\x94\x8c\x04Gone\x94\x93\x94.',
+    ])
+    def test_unusable_sidecar_rebuilt_from_json(self, tmp_path, sidecar):
+        """Test that any unusable .pkl falls back to the JSON and is rewritten."""
+        json_file = tmp_path / "data.json"
+        json_file.write_text('{"loads": [1, 2]}', encoding='utf-8')
+        json_file.with_suffix('.pkl').write_bytes(sidecar)
+        
+        assert load_cached_json(json_file) == {'loads': [1, 2]}
+        
+        with open(json_file.with_suffix('.pkl'), 'rb') as f:
+            assert pickle.load(f)['data'] == {'loads': [1, 2]}
+    
+    def test_dict_without_data_rebuilt(self, tmp_path):
+        """Test that a current-mtime sidecar missing its data is a cache miss."""
+        json_file = tmp_path / "data.json"
+        json_file.write_text('[3]', encoding='utf-8')
+        with open(json_file.with_suffix('.pkl'), 'wb') as f:
+            pickle.dump({'mtime_ns': json_file.stat().st_mtime_ns}, f)
+        
+        assert load_cached_json(json_file) == [3]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -9,7 +9,8 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from scripts.ingest import extract_sheets
+from scripts.ingest import extract_sheets, iter_input_records, iter_input_sheets
+from src.core import fastjson
 from src.core.base_converter import BaseConverter
 
 
@@ -77,6 +78,38 @@ class TestExtractSheets:
         assert result == flat_data
 
 
+class TestIterInputSheets:
+    """Test streaming reads of incoming files."""
+    
+    def test_matches_extract_sheets(self, tmp_path):
+        """Test that both input formats stream the sheets extract_sheets returns."""
+        nested = {
+            "metadata": {"source": "test.xlsx"},
+            "sheets": [
+                {"sheet_name": "Sheet1", "data": [{"a": 1}, {"a": 2}]},
+                {"sheet_name": "", "data": [{"a": 3}]},
+                {"sheet_name": "Sheet2", "data": [{"b": 4}]}
+            ]
+        }
+        flat = {"Sheet1": [{"a": 1}], "Sheet2": [{"b": 2}]}
+        for name, raw_data in (("nested.json", nested), ("flat.json", flat)):
+            input_file = tmp_path / name
+            fastjson.dump_file(input_file, raw_data)
+            assert dict(iter_input_sheets(input_file)) == extract_sheets(raw_data)
+    
+    def test_records_from_nested_and_array_files(self, tmp_path):
+        """Test that single-table records stream from either format."""
+        records = [{"truck": "11"}, {"truck": "12"}, {"truck": "13"}]
+        nested_file = tmp_path / "nested.json"
+        array_file = tmp_path / "array.json"
+        fastjson.dump_file(nested_file, {"sheets": [{"sheet_name": "Trucks", "data": records[:2]},
+                                                    {"sheet_name": "More", "data": records[2:]}]})
+        fastjson.dump_file(array_file, records)
+        
+        assert list(iter_input_records(nested_file)) == records
+        assert list(iter_input_records(array_file)) == records
+
+
 class TestBaseConverterTypeSafety:
     """Test type safety fixes in BaseConverter."""
     
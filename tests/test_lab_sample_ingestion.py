@@ -9,9 +9,9 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.database.models import LabSample, Facility
+from src.database.models import LabSample, Facility, Driver, Truck, Shipment
 from src.database.connection import DatabaseConnection
-from src.database.ingestion import DataIngestion
+from src.database.ingestion import DataIngestion, _copy_text_value
 
 
 class TestLabSampleDuplicateHandling:
@@ -174,6 +174,134 @@ class TestLabSampleDuplicateHandling:
         with test_db.get_session() as session:
             all_samples = session.query(LabSample).all()
             assert len(all_samples) == 3
+    
+    def test_shared_session_rolls_back_together(self, test_db, test_facility):
+        """Test that ingest calls sharing a session commit or roll back as one."""
+        ingestion = DataIngestion(test_db)
+        
+        samples = [
+            {'sample_code': 'A1404101L', 'sheet_name': 'Solutions', 'au_ppm': 0.5, 'facility_code': 'A'}
+        ]
+        alerts = [{'level': 'info', 'rule': 'test', 'message': 'test alert'}]
+        
+        with pytest.raises(RuntimeError):
+            with test_db.get_session() as session:
+                assert ingestion.ingest_lab_samples(samples, session=session) == 1
+                assert ingestion.ingest_alerts(alerts, session=session) == 1
+                raise RuntimeError("abort pipeline")
+        
+        with test_db.get_session() as session:
+            assert session.query(LabSample).count() == 0
+        
+        with test_db.get_session() as session:
+            ingestion.ingest_lab_samples(samples, session=session)
+            ingestion.ingest_alerts(alerts, session=session)
+        
+        with test_db.get_session() as session:
+            assert session.query(LabSample).count() == 1
+    
+    def test_batched_ingestion_skips_duplicates_across_batches(self, test_db, test_facility):
+        """Test that streamed samples committed per batch are still deduplicated."""
+        ingestion = DataIngestion(test_db)
+        
+        codes = ['A1404101K', 'A1404102K', 'A1404101K', 'A1404103K', 'A1404102K']
+        samples = (
+            {'sample_code': code, 'sheet_name': 'Solids', 'au_ppm': 0.5, 'facility_code': 'A'}
+            for code in codes
+        )
+        
+        assert ingestion.ingest_lab_samples(samples, batch_size=2) == 3
+        assert ingestion.ingest_lab_samples(
+            [{'sample_code': 'A1404103K', 'sheet_name': 'Solids', 'facility_code': 'A'}],
+            batch_size=2
+        ) == 0
+        
+        with test_db.get_session() as session:
+            assert session.query(LabSample).count() == 3
+
+
+
+class TestShipmentIngestion:
+    """Test shipment ingestion with driver and truck lookups."""
+    
+    @pytest.mark.parametrize('batch_size', [1000, 1])
+    def test_new_drivers_and_trucks_created_once(self, batch_size):
+        """Test unseen drivers/trucks are created once and shared by later rows."""
+        db = DatabaseConnection(db_url='sqlite:///:memory:')
+        db.create_tables()
+        ingestion = DataIngestion(db)
+        ingestion.ingest_facilities({'A': {'name_fa': 'الف', 'name_en': 'A'}})
+        ingestion.ingest_drivers({'canonical_drivers': {'علی': {'aliases': []}}})
+        
+        def shipment(driver, truck, is_known=False):
+            return {
+                'date': '1404/10/14',
+                'tonnage_kg': 25000,
+                'destination': 'رباط سفید',
+                'facility_code': 'A',
+                'driver_info': {'canonical': driver, 'original': driver, 'is_known': is_known},
+                'truck_number': truck
+            }
+        
+        shipments = [
+            shipment('علی', '11', is_known=True),
+            shipment('رضا', '12'),
+            shipment('رضا', '11'),
+            shipment('حسن', '', is_known=True)
+        ]
+        assert ingestion.ingest_shipments(shipments, batch_size=batch_size) == 4
+        
+        with db.get_session() as session:
+            assert session.query(Truck).count() == 2
+            pending = session.query(Driver).filter_by(status='pending_review').all()
+            assert [driver.canonical_name for driver in pending] == ['رضا']
+            
+            rows = session.query(Shipment).order_by(Shipment.id).all()
+            assert rows[1].driver_id == rows[2].driver_id == pending[0].id
+            assert rows[0].truck_id == rows[2].truck_id
+            assert rows[3].driver_id is None and rows[3].truck_id is None
+            assert all(row.facility_id is not None for row in rows)
+
+
+class TestCopyEncoding:
+    """Test field encoding for PostgreSQL COPY."""
+    
+    def test_copy_text_values(self):
+        """Test NULLs, booleans, escapes and JSON in COPY text format."""
+        assert _copy_text_value(None) == '\\N'
+        assert _copy_text_value('') == ''
+        assert _copy_text_value(True) == 't'
+        assert _copy_text_value(25000.5) == '25000.5'
+        assert _copy_text_value('a\tb\\c\nd') == 'a\\tb\\\\c\\nd'
+        # JSON's own backslash escape is escaped again for COPY
+        assert _copy_text_value(['علی\t'], is_json=True) == '["علی\\\\t"]'
+        assert _copy_text_value(None, is_json=True) == '\\N'
+    
+    def test_copy_unsupported_off_postgresql(self):
+        """Test that non-PostgreSQL connections never take the COPY path."""
+        db = DatabaseConnection(db_url='sqlite:///:memory:')
+        with db.engine.connect() as connection:
+            assert DataIngestion._copy_supported(connection) is False
+
+
+class TestDatabaseConnection:
+    """Test engine configuration."""
+    
+    def test_server_database_pool_options(self):
+        """Test that server databases get a tuned, pre-pinged pool."""
+        pytest.importorskip("psycopg2")
+        db = DatabaseConnection(db_url='postgresql+psycopg2://user:pw@localhost:5432/test')
+        
+        assert db.engine.pool.size() == DatabaseConnection.POOL_SIZE
+        assert db.engine.pool._pre_ping is True
+        assert db.engine.pool._recycle == DatabaseConnection.POOL_RECYCLE_SECONDS
+        assert db.engine.dialect.insertmanyvalues_page_size == DatabaseConnection.INSERT_PAGE_SIZE
+        assert db.engine.dialect.executemany_batch_page_size == DatabaseConnection.BATCH_PAGE_SIZE
+        db.engine.dispose()
+    
+    def test_sqlite_keeps_default_pool(self):
+        """Test that SQLite URLs get no pool options."""
+        assert DatabaseConnection._engine_options('sqlite:///:memory:') == {}
 
 
 if __name__ == "__main__":
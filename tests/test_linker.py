@@ -9,6 +9,7 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from src.core import linker
 from src.core.linker import DataLinker, SampleCodeParser
 
 
@@ -84,6 +85,93 @@ class TestDataLinker:
         assert trace['bunker_load'] is not None
         assert len(trace['shipments']) > 0
         assert trace['trace_complete'] is True
+    
+    def test_trace_report_matches_per_sample_linking(self):
+        """Test the indexed trace report against link_sample_to_source()."""
+        samples = [
+            {'sample_code': 'A 1404 10 14 K1'},
+            {'sample_code': 'B 1404 10 15 K2'},
+            {'sample_code': 'C 1404 10 14 K1'},
+            {'sample_code': 'SR2'},
+            {'sample_code': ''}
+        ]
+        bunker_loads = [
+            {'facility_code': 'A', 'date': '1404/10/14', 'tonnage_kg': 25000},
+            {'facility_code': 'A', 'date': '1404/10/14', 'tonnage_kg': 24000},
+            {'facility_code': 'B', 'date': '1404/10/15', 'tonnage_kg': 22000}
+        ]
+        shipments = [
+            {'destination': 'رباط سفید', 'date': '1404/10/14', 'tonnage_kg': 28000},
+            {'destination': 'رباط سفید', 'date': '1404/10/15', 'tonnage_kg': 27000},
+            {'destination': 'رباط سفید', 'date': '1404/10/12', 'tonnage_kg': 30000},
+            {'destination': 'شن بتن مشهد', 'date': '1404/10/13', 'tonnage_kg': 25000},
+            {'destination': 'شن بتن مشهد', 'date': '1404/10/15', 'tonnage_kg': 26000},
+            {'destination': 'شن بتن مشهد', 'date': None, 'tonnage_kg': 1000},
+            # Not YYYY/MM/DD: this destination falls back to string comparison
+            {'destination': 'شن بتن مشهد', 'date': '', 'tonnage_kg': 2000}
+        ]
+        
+        report = self.linker.generate_trace_report(samples, bunker_loads, shipments)
+        expected = [self.linker.link_sample_to_source(s, bunker_loads, shipments) for s in samples]
+        
+        assert report['linked_samples'] + report['unlinked_samples'] == (
+            [t for t in expected if t['trace_complete']] + [t for t in expected if not t['trace_complete']]
+        )
+        assert report['linked_count'] == 2
+        # Unsorted shipments keep their input order
+        assert [s['tonnage_kg'] for s in report['linked_samples'][0]['shipments']] == [28000, 30000]
+    
+    def test_indexed_bunker_linking_matches_scan(self):
+        """Test link_bunker_to_shipment_fast() against the full scan."""
+        shipments = [
+            {'destination': 'رباط سفید', 'date': '1404/10/12', 'tonnage_kg': 30000},
+            {'destination': 'رباط سفید', 'date': '1404/10/14', 'tonnage_kg': 28000},
+            {'destination': 'رباط سفید', 'date': '1404/10/15', 'tonnage_kg': 27000},
+            {'destination': 'شن بتن مشهد', 'date': '1404/10/15', 'tonnage_kg': 26000},
+            {'destination': 'شن بتن مشهد', 'date': '1404/10/13', 'tonnage_kg': 25000}
+        ]
+        bunker_loads = [
+            {'facility_code': 'A', 'date': '1404/10/14'},
+            {'facility_code': 'A', 'date': '1404/10/11'},
+            {'facility_code': 'B', 'date': '1404/10/14'},
+            {'facility_code': 'C', 'date': '1404/10/14'},
+            {'facility_code': 'A', 'date': None}
+        ]
+        _, shipment_idx = DataLinker.build_indices([], shipments)
+        
+        for load in bunker_loads:
+            assert self.linker.link_bunker_to_shipment_fast(load, shipment_idx) == (
+                self.linker.link_bunker_to_shipment(load, shipments)
+            )
+        assert len(self.linker.link_bunker_to_shipment_fast(bunker_loads[0], shipment_idx)) == 2
+    
+    def test_parallel_trace_report_matches_serial(self, monkeypatch):
+        """Test codes parsed in worker processes give the same report."""
+        samples = [
+            {'sample_code': 'A 1404 10 14 K1'},
+            {'sample_code': 'A14041014K'},
+            {'sample_code': 'B 1404 10 15 K2'},
+            {'sample_code': 'A 1404 10 14 K1'},
+            {'sample_code': 'SR2'},
+            {'sample_code': 'bad code'},
+            {}
+        ]
+        bunker_loads = [
+            {'facility_code': 'A', 'date': '1404/10/14', 'tonnage_kg': 25000},
+            {'facility_code': 'B', 'date': '1404/10/15', 'tonnage_kg': 22000}
+        ]
+        shipments = [
+            {'destination': 'رباط سفید', 'date': '1404/10/14', 'tonnage_kg': 28000},
+            {'destination': 'شن بتن مشهد', 'date': '1404/10/13', 'tonnage_kg': 25000}
+        ]
+        serial = self.linker.generate_trace_report(samples, bunker_loads, shipments)
+        
+        monkeypatch.setattr(linker, "PARALLEL_MIN_CODES", 0)
+        monkeypatch.setattr(linker.os, "cpu_count", lambda: 2)
+        parallel = self.linker.generate_trace_report(samples, bunker_loads, shipments)
+        
+        assert parallel == serial
+        assert parallel['linked_count'] == 4
 
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+"""
+Tests for log file notifier.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.alerts.log_notifier import LogNotifier
+from src.core import fastjson
+from src.core.validator import ValidationAlert, AlertLevel
+
+
+class TestLogNotifier:
+    """Test buffered alert logging."""
+    
+    def test_entries_buffered_until_flush(self, tmp_path):
+        """Test that entries are buffered and written on flush/close."""
+        log_file = tmp_path / "alerts.log"
+        notifier = LogNotifier(str(log_file), flush_interval=3600)
+        
+        notifier.send_alert(ValidationAlert(AlertLevel.WARNING, 'unknown_driver', 'راننده ناشناس', {}))
+        assert log_file.read_text(encoding='utf-8') == ""
+        
+        notifier.close()
+        assert 'راننده ناشناس' in log_file.read_text(encoding='utf-8')
+    
+    def test_read_alerts_sees_buffered_entries(self, tmp_path):
+        """Test that read_alerts includes entries still in the write buffer."""
+        notifier = LogNotifier(str(tmp_path / "alerts.log"), flush_interval=3600)
+        
+        for i in range(3):
+            notifier.send_alert(ValidationAlert(AlertLevel.INFO, f'rule_{i}', 'message', {'i': i}))
+        
+        alerts = notifier.read_alerts(limit=2)
+        assert [a['rule'] for a in alerts] == ['rule_1', 'rule_2']
+        notifier.close()
+    
+    def test_read_alerts_limit_skips_corrupt_lines(self, tmp_path):
+        """Test that the limit counts valid alerts, not raw tail lines."""
+        log_file = tmp_path / "alerts.log"
+        notifier = LogNotifier(str(log_file), flush_interval=3600)
+        
+        for i in range(3):
+            notifier.send_alert(ValidationAlert(AlertLevel.INFO, f'rule_{i}', 'message', {'i': i}))
+        notifier.close()
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.write('{"truncated": \n\n')
+        
+        alerts = notifier.read_alerts(limit=2)
+        assert [a['rule'] for a in alerts] == ['rule_1', 'rule_2']
+    
+    def test_read_alerts_limit_parses_only_tail(self, tmp_path, monkeypatch):
+        """Test that a limited read parses a tail window, not the whole log."""
+        log_file = tmp_path / "alerts.log"
+        notifier = LogNotifier(str(log_file), flush_interval=3600)
+        
+        for i in range(500):
+            notifier.send_alert(ValidationAlert(AlertLevel.INFO, f'rule_{i}', 'message', {'i': i}))
+        notifier.close()
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.write('\n{"truncated": \n')
+        
+        calls = []
+        loads = fastjson.loads
+        monkeypatch.setattr(fastjson, 'loads', lambda line: calls.append(line) or loads(line))
+        
+        alerts = notifier.read_alerts(limit=3)
+        assert [a['rule'] for a in alerts] == ['rule_497', 'rule_498', 'rule_499']
+        assert len(calls) < 20
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,52 @@
+"""
+Tests for report generation.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.reports.base_report import REPORTLAB_AVAILABLE
+from src.reports.daily_ops import DailyOpsReport
+
+
+class TestDailyOpsReport:
+    """Test daily operations report output."""
+    
+    def test_generate_both(self, tmp_path):
+        """Test that Markdown and PDF files are both written."""
+        report = DailyOpsReport(output_dir=str(tmp_path))
+        shipments = [
+            {'date': '1404/10/14', 'facility_code': 'A', 'tonnage_kg': 25000,
+             'truck_number': '11', 'destination': 'Factory', 'total_cost_rial': 1000000}
+        ]
+        bunker_loads = [
+            {'date': '1404/10/14', 'facility_code': 'B', 'tonnage_kg': 12000,
+             'driver_info': {'canonical': 'Ali'}}
+        ]
+        lab_samples = [
+            {'date': '1404/10/14', 'sample_code': 'A-1404-10-14-K-1', 'sample_type': 'K',
+             'au_ppm': 1.25, 'au_detected': True}
+        ]
+        
+        paths = report.generate_both(
+            'daily_ops_test',
+            date='1404/10/14',
+            shipments=shipments,
+            bunker_loads=bunker_loads,
+            lab_samples=lab_samples
+        )
+        
+        markdown = Path(paths['markdown']).read_text(encoding='utf-8')
+        assert '| 11 | Factory | 25,000 | 1,000,000 |' in markdown
+        if REPORTLAB_AVAILABLE:
+            assert Path(paths['pdf']).read_bytes().startswith(b'%PDF')
+        else:
+            assert paths['pdf'] == ""
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -57,7 +57,7 @@ class TestTelegramNotifier:
         notifier.send_alert(alert)
         assert len(notifier.alerts_buffer) == 0
     
-    @patch('src.alerts.telegram_notifier.requests.post')
+    @patch('src.alerts.telegram_notifier.requests.Session.post')
     def test_send_summary_sends_message(self, mock_post):
         """Test that send_summary sends a message via HTTP."""
         mock_response = Mock()
@@ -108,7 +108,7 @@ class TestTelegramNotifier:
         # Verify buffer was cleared
         assert len(notifier.alerts_buffer) == 0
     
-    @patch('src.alerts.telegram_notifier.requests.post')
+    @patch('src.alerts.telegram_notifier.requests.Session.post')
     def test_send_summary_limits_critical_alerts(self, mock_post):
         """Test that send_summary limits critical alerts to top 5."""
         mock_response = Mock()
@@ -134,6 +134,17 @@ class TestTelegramNotifier:
         message_text = json_data['text']
         assert "_...and 5 more_" in message_text
     
+    @patch('src.alerts.telegram_notifier.requests.Session.post')
+    def test_send_summary_skips_info_only(self, mock_post):
+        """Test that a buffer of only INFO alerts sends no message."""
+        notifier = TelegramNotifier(bot_token="test_token", chat_id="test_chat_id")
+        notifier.send_alert(ValidationAlert(AlertLevel.INFO, "note", "FYI", {}))
+        
+        notifier.send_summary()
+        
+        mock_post.assert_not_called()
+        assert len(notifier.alerts_buffer) == 0
+    
     def test_send_summary_does_nothing_when_disabled(self):
         """Test that send_summary does nothing when notifier is disabled."""
         notifier = TelegramNotifier(bot_token=None, chat_id=None)
@@ -144,7 +155,7 @@ class TestTelegramNotifier:
         notifier = TelegramNotifier(bot_token="test_token", chat_id="test_chat_id")
         notifier.send_summary()  # Should not raise any exceptions
     
-    @patch('src.alerts.telegram_notifier.requests.post')
+    @patch('src.alerts.telegram_notifier.requests.Session.post')
     def test_send_summary_handles_request_errors(self, mock_post):
         """Test that send_summary handles request errors gracefully."""
         mock_post.side_effect = Exception("Network error")
@@ -163,7 +174,7 @@ class TestTelegramNotifier:
         # Buffer should still be cleared
         assert len(notifier.alerts_buffer) == 0
     
-    @patch('src.alerts.telegram_notifier.requests.post')
+    @patch('src.alerts.telegram_notifier.requests.Session.post')
     def test_send_summary_handles_http_errors(self, mock_post):
         """Test that send_summary handles HTTP-level errors (non-200 status codes)."""
         mock_response = Mock()
@@ -187,3 +198,24 @@ class TestTelegramNotifier:
         
         # Buffer should still be cleared even with error
         assert len(notifier.alerts_buffer) == 0
+    
+    def test_session_retries_transient_errors(self):
+        """Test that the HTTPS adapter retries POSTs on transient statuses."""
+        notifier = TelegramNotifier(bot_token="test_token", chat_id="test_chat_id")
+        
+        retry = notifier._session.get_adapter(notifier.api_url).max_retries
+        assert retry.total == 3
+        assert "POST" in retry.allowed_methods
+        assert set(retry.status_forcelist) == {429, 500, 502, 503, 504}
+    
+    def test_split_message_respects_length_limit(self):
+        """Test that long messages are split on line boundaries within the limit."""
+        line = "• " + "ع" * 98 + "\n"
+        text = line * 100
+        
+        chunks = TelegramNotifier._split_message(text)
+        
+        assert len(chunks) > 1
+        assert all(len(chunk) <= TelegramNotifier.MAX_MESSAGE_LENGTH for chunk in chunks)
+        assert "".join(chunks) == text
+        assert all(chunk.endswith("\n") for chunk in chunks)
@@ -2,6 +2,7 @@
 Tests for data validation.
 """
 
+import os
 import pytest
 import sys
 from pathlib import Path
@@ -9,7 +10,7 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.core.validator import DataValidator, AlertLevel
+from src.core.validator import DataValidator, AlertLevel, ValidationAlert
 
 
 class TestDataValidator:
@@ -101,6 +102,57 @@ class TestDataValidator:
         # Normal range
         alerts = self.validator.validate_tonnage(20000, {'record_type': 'test'})
         assert len(alerts) == 0
+    
+    def test_alert_uses_slots(self):
+        """Test alerts carry no per-instance __dict__ and still serialize."""
+        alert = ValidationAlert(AlertLevel.WARNING, 'tonnage', 'Low tonnage', {'tonnage_kg': 10000})
+        
+        assert not hasattr(alert, '__dict__')
+        with pytest.raises(AttributeError):
+            alert.extra = 1
+        assert alert.to_dict() == {
+            'level': 'warning',
+            'rule': 'tonnage',
+            'message': 'Low tonnage',
+            'data': {'tonnage_kg': 10000}
+        }
+    
+    def test_rules_shared_between_instances(self, tmp_path):
+        """Test the rules file is parsed once and re-read after an edit."""
+        rules = tmp_path / "validation_rules.json"
+        rules.write_text('{"ore_input": {"critical_threshold_ppm": 30.0}}', encoding="utf-8")
+        
+        first = DataValidator(str(tmp_path))
+        second = DataValidator(str(tmp_path))
+        assert first.rules is second.rules
+        assert first.ore_crit == 30.0
+        
+        rules.write_text('{"ore_input": {"critical_threshold_ppm": 40.0}}', encoding="utf-8")
+        os.utime(rules, ns=(0, rules.stat().st_mtime_ns + 1_000_000))
+        assert DataValidator(str(tmp_path)).ore_crit == 40.0
+        assert DataValidator(str(tmp_path / "missing")).rules == {}
+    
+    def test_batch_matches_per_sample(self):
+        """Test batch validation gives the same alerts as one at a time."""
+        samples = [
+            {'sample_code': 'A 1404 10 14 K1', 'au_ppm': 25, 'sample_type': 'K'},
+            {'sample_code': 'A 1404 10 14 K2', 'au_ppm': 7.5, 'sample_type': 'K'},
+            {'sample_code': 'A1404105L', 'au_ppm': 0.5, 'sample_type': 'T'},
+            {'sample_code': 'B 1404 10 14 RC', 'au_ppm': 0.01, 'sample_type': 'RC'},
+            {'sample_code': 'SR2', 'au_ppm': 150.0, 'sample_type': 'CR'},
+            {'sample_code': 'C 1404 10 14 K3', 'au_ppm': 'n/a', 'sample_type': 'K'},
+            {'sample_code': None, 'au_ppm': float('nan'), 'sample_type': 'T'},
+            {}
+        ]
+        
+        batch = self.validator.validate_lab_samples_batch(samples)
+        
+        expected = [
+            [alert.to_dict() for alert in self.validator.validate_lab_sample(sample)]
+            for sample in samples
+        ]
+        assert [[alert.to_dict() for alert in alerts] for alerts in batch] == expected
+        assert [alert['rule'] for alert in expected[2]] == ['invalid_sample_code', 'tailings_loss']
 
 
 if __name__ == "__main__":